@@ -0,0 +1,190 @@
+import datetime as dt
+import json
+import os
+from contextlib import contextmanager
+from helper.manifestAPI import file_checksum
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; writes are then unlocked
+    fcntl = None
+
+CATALOG_FILE = "catalog.json"
+
+# catalog path -> (mtime_ns, catalog) so repeated lookups in one run read the file once
+_catalog_cache = {}
+
+def catalog_path(dirs):
+    """Path of the holdings catalog of the data root that dirs belongs to"""
+    return os.path.join(os.path.dirname(os.path.normpath(dirs["holdings"])), CATALOG_FILE)
+
+@contextmanager
+def _catalog_lock(path):
+    """Exclusive lock around a catalog read-modify-write"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.lock', 'w') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _read_catalog(path):
+    with open(path, 'r') as f:
+        catalog = json.load(f)
+    catalog.setdefault('funds', {})
+    return catalog
+
+def _write_catalog(catalog, path):
+    """Write the catalog atomically (tmp file + rename)"""
+    catalog['updated_at'] = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(catalog, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    _catalog_cache[path] = (os.stat(path).st_mtime_ns, catalog)
+
+def month_entry(file_path, rows=None, collected_at=None):
+    """Catalog entry (rows, size, checksum, collected time) for one stored holdings file"""
+    if rows is None:
+        with open(file_path, 'r') as f:
+            rows = max(sum(1 for _ in f) - 1, 0)
+    if collected_at is None:
+        collected_at = dt.datetime.fromtimestamp(os.path.getmtime(file_path)).strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        'rows': int(rows),
+        'size': os.path.getsize(file_path),
+        'checksum': file_checksum(file_path),
+        'collected_at': collected_at
+    }
+
+def scan_catalog(dirs):
+    """Build the catalog from one scan of the holdings store, in memory only"""
+    catalog = {'version': 1, 'funds': {}}
+    holdings_root = dirs["holdings"]
+    if os.path.isdir(holdings_root):
+        for fund_id in sorted(os.listdir(holdings_root)):
+            fund_dir = os.path.join(holdings_root, fund_id)
+            if not os.path.isdir(fund_dir):
+                continue
+            months = {}
+            for file in sorted(f for f in os.listdir(fund_dir) if f.startswith('holdings_') and f.endswith('.csv')):
+                months[file[len('holdings_'):-len('.csv')]] = month_entry(os.path.join(fund_dir, file))
+            catalog['funds'][fund_id] = {'months': months}
+    return catalog
+
+def rebuild_catalog(dirs):
+    """Scan the holdings store once and write a fresh catalog"""
+    path = catalog_path(dirs)
+    catalog = scan_catalog(dirs)
+    with _catalog_lock(path):
+        _write_catalog(catalog, path)
+    return catalog
+
+def load_catalog(dirs, persist=None):
+    """
+    Load the holdings catalog, building it from the store on first use
+    Args:
+        persist: write a missing or unreadable catalog back to disk; defaults
+            to False for read-only dirs (create_directory_structure(create=False)),
+            which then get an in-memory scan and leave the store untouched
+    Returns:
+        dict with 'funds': fund_id -> {'months': month -> entry}
+    """
+    if persist is None:
+        persist = not dirs.get("read_only")
+    path = catalog_path(dirs)
+    if not os.path.exists(path):
+        return rebuild_catalog(dirs) if persist else _scanned_catalog(dirs, path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _catalog_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        catalog = _read_catalog(path)
+    except Exception as e:
+        if not persist:
+            return _scanned_catalog(dirs, path)
+        print(f"⚠️  Rebuilding unreadable catalog {path}: {str(e)}")
+        return rebuild_catalog(dirs)
+    _catalog_cache[path] = (mtime, catalog)
+    return catalog
+
+def _scanned_catalog(dirs, path):
+    """In-memory catalog for read-only use, scanned once per process (cached without an mtime)"""
+    cached = _catalog_cache.get(path)
+    if cached and cached[0] is None:
+        return cached[1]
+    catalog = scan_catalog(dirs)
+    _catalog_cache[path] = (None, catalog)
+    return catalog
+
+def record_catalog_month(dirs, fund_id, month, file_path, rows=None):
+    """Add or replace one fund-month in the catalog under the catalog lock"""
+    return record_catalog_months(dirs, [(fund_id, month, file_path, rows)])[0]
+
+def record_catalog_months(dirs, entries):
+    """
+    Add or replace many fund-months with a single catalog write (backfill, migrate, watch)
+    Args:
+        entries: (fund_id, month, file_path, rows) tuples; rows may be None to count them
+    Returns:
+        list of the catalog entries, in the order given
+    """
+    path = catalog_path(dirs)
+    collected_at = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    entries = [(fund_id, month, month_entry(file_path, rows=rows, collected_at=collected_at))
+               for fund_id, month, file_path, rows in entries]
+    if not entries:
+        return []
+    if not os.path.exists(path):
+        # the first build already scans the files that were just written
+        rebuild_catalog(dirs)
+        return [entry for _, _, entry in entries]
+    with _catalog_lock(path):
+        try:
+            catalog = _read_catalog(path)
+        except Exception:
+            catalog = {'version': 1, 'funds': {}}
+        for fund_id, month, entry in entries:
+            catalog['funds'].setdefault(fund_id, {'months': {}})['months'][month] = entry
+        _write_catalog(catalog, path)
+    return [entry for _, _, entry in entries]
+
+def drop_catalog_month(dirs, fund_id, month):
+    """Remove one fund-month from the catalog under the catalog lock"""
+    path = catalog_path(dirs)
+    with _catalog_lock(path):
+        catalog = _read_catalog(path) if os.path.exists(path) else {'version': 1, 'funds': {}}
+        catalog['funds'].get(fund_id, {}).get('months', {}).pop(month, None)
+        _write_catalog(catalog, path)
+
+def catalog_funds(dirs):
+    """Fund ids that have stored holdings"""
+    return sorted(fund_id for fund_id, fund in load_catalog(dirs)['funds'].items() if fund.get('months'))
+
+def fund_months(fund_id, dirs):
+    """Stored months ('YYYY-MM') of a fund, oldest first"""
+    fund = load_catalog(dirs)['funds'].get(fund_id)
+    return sorted(fund['months']) if fund else []
+
+def has_month(fund_id, month, dirs):
+    """Whether holdings for a fund-month are stored"""
+    fund = load_catalog(dirs)['funds'].get(fund_id)
+    return bool(fund) and month in fund['months']
+
+def previous_month(month):
+    """The calendar month before a 'YYYY-MM'"""
+    year, month = map(int, month.split('-'))
+    return f"{year - 1}-12" if month == 1 else f"{year}-{month - 1:02d}"
+
+def month_range(first, last):
+    """Every 'YYYY-MM' from first to last inclusive"""
+    year, month = map(int, first.split('-'))
+    months = []
+    while f"{year}-{month:02d}" <= last:
+        months.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
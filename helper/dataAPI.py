@@ -2,6 +2,10 @@ import mstarpy as ms
 import pandas as pd
 import os
 import datetime as dt
+from helper.filterAPI import *
+from helper.catalogAPI import *
+from helper.indexAPI import *
+from helper.validateAPI import *
 
 def get_fund_holdings(fund_ids):
     """
@@ -44,18 +48,36 @@ def get_fund_holdings(fund_ids):
     
     return df
 
-def store_fund_holdings(fund_id, holdings_df, dirs):
+def read_holdings_file(file_path, filters=None):
+    """
+    Read a stored holdings CSV, dropping rows that do not match the sector/ISIN filters
+    Args:
+        file_path: Path to a holdings_YYYY-MM.csv file
+        filters: Optional filters dict from parse_filter_args
+    Returns:
+        DataFrame with the matching holdings rows
+    """
+    df = pd.read_csv(file_path)
+    return apply_holdings_filters(df, filters)
+
+def store_fund_holdings(fund_id, holdings_df, dirs, month=None, issues=None, batch=None):
     """
     Store holdings data for a specific fund
     Args:
         fund_id: Fund identifier
         holdings_df: DataFrame containing holdings data
         dirs: Directory structure dictionary
+        month: 'YYYY-MM' the holdings belong to (defaults to the current month)
+        issues: validation issues of this fund-month from a batch (validate_batch),
+            whose caller writes the report once; validated and reported here when None
+        batch: list collecting the fund-months written by a batch (backfill); their
+            catalog entries, index postings and deltas are then left to
+            record_stored_batch, which writes the catalog once
     Returns:
         str: Path to saved file
     """
     try:
-        date_str = dt.datetime.now().strftime("%Y-%m")
+        date_str = month or dt.datetime.now().strftime("%Y-%m")
         fund_dir = os.path.join(dirs["holdings"], fund_id)
         os.makedirs(fund_dir, exist_ok=True)
         
@@ -70,11 +92,278 @@ def store_fund_holdings(fund_id, holdings_df, dirs):
         for col in required_columns:
             if col not in holdings_df.columns:
                 holdings_df[col] = None
-        
-        holdings_df.to_csv(file_path, index=False)
+
+        # partial or inconsistent payloads are kept out of the store so analysis can trust it
+        if issues is None:
+            issues = validate_fund_month(fund_id, date_str, holdings_df, dirs)
+            save_validation_report(issues, dirs, [(fund_id, date_str)])
+        errors = issues[issues['severity'] == ERROR]
+        if not errors.empty:
+            quarantined = quarantine_path(dirs, fund_id, date_str)
+            os.makedirs(os.path.dirname(quarantined), exist_ok=True)
+            holdings_df.to_csv(quarantined, index=False)
+            print(f"❌ Quarantined holdings for {fund_id} ({date_str}) to {quarantined}: {'; '.join(errors['detail'])}")
+            return None
+        for detail in issues['detail']:
+            print(f"⚠️  {fund_id} ({date_str}): {detail}")
+
+        # write-then-rename so readers never see a partial file, then record it in the catalog
+        tmp_path = file_path + '.tmp'
+        holdings_df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+        if batch is not None:
+            batch.append((fund_id, date_str, file_path, holdings_df))
+            print(f"✅ Saved holdings for {fund_id} to {file_path}")
+            return file_path
+        record_catalog_month(dirs, fund_id, date_str, file_path, rows=len(holdings_df))
+        update_index(dirs, fund_id, date_str, holdings_df)
         print(f"✅ Saved holdings for {fund_id} to {file_path}")
+
+        # Persist the delta against the previous stored month so later analysis
+        # does not need to diff both full snapshots again
+        if dirs.get("deltas"):
+            store_fund_delta(fund_id, date_str, dirs)
+            # a month stored out of order (backfill) becomes the base of the next stored month
+            months = fund_months(fund_id, dirs)
+            if months[-1] != date_str:
+                store_fund_delta(fund_id, months[months.index(date_str) + 1], dirs)
+
         return file_path
         
     except Exception as e:
         print(f"❌ Error saving holdings for {fund_id}: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+def record_stored_batch(batch, dirs):
+    """
+    Catalog (one write), index and delta upkeep for fund-months written with store_fund_holdings(batch=...)
+    Args:
+        batch: (fund_id, month, file_path, holdings_df) tuples
+    """
+    record_catalog_months(dirs, [(fund_id, month, file_path, len(df)) for fund_id, month, file_path, df in batch])
+    for fund_id, month, _, df in batch:
+        update_index(dirs, fund_id, month, df)
+    if not dirs.get("deltas"):
+        return
+    # each new month gets its delta, and so does the stored month that follows it (it may be out of order)
+    for fund_id in sorted({fund_id for fund_id, _, _, _ in batch}):
+        months = fund_months(fund_id, dirs)
+        stale = set()
+        for _, month, _, _ in (b for b in batch if b[0] == fund_id):
+            idx = months.index(month)
+            stale.update(months[idx:idx + 2])
+        for month in sorted(stale):
+            store_fund_delta(fund_id, month, dirs)
+
+DELTA_COLUMNS = [
+    'key', 'isin', 'security_name', 'prev_security_name', 'sector', 'prev_month', 'month',
+    'prev_shares', 'curr_shares', 'share_change',
+    'prev_weight_pct', 'curr_weight_pct', 'weight_change', 'action'
+]
+
+def holdings_month(file_name):
+    """Extract 'YYYY-MM' from a holdings_YYYY-MM.csv file name"""
+    return file_name.split('_')[1].split('.')[0]
+
+def compute_holdings_delta(prev_df, curr_df, prev_month=None, month=None):
+    """
+    Compute the month-over-month delta between two holdings snapshots
+    Args:
+        prev_df: Holdings DataFrame for the older month
+        curr_df: Holdings DataFrame for the newer month
+        prev_month: 'YYYY-MM' of the older snapshot
+        month: 'YYYY-MM' of the newer snapshot
+    Returns:
+        DataFrame with one row per security keyed by ISIN (security name when
+        the ISIN is missing) holding share and weight changes and an action of
+        entered / exited / increased / decreased / unchanged. Duplicate rows for
+        one ISIN within a month are summed.
+    """
+    def _prepare(df):
+        df = df.copy()
+        isin = df['isin'].fillna('').astype(str).str.strip() if 'isin' in df.columns else pd.Series('', index=df.index)
+        df['isin'] = isin
+        df['key'] = isin.where(isin != '', df['security_name'].astype(str))
+        df['number_of_shares'] = pd.to_numeric(df['number_of_shares'], errors='coerce').fillna(0.0)
+        df['weight_pct'] = pd.to_numeric(df['weight_pct'], errors='coerce').fillna(0.0)
+        if 'sector' not in df.columns:
+            df['sector'] = ''
+        # fold duplicate rows of one ISIN (e.g. zero-share placeholders under an old
+        # name) into a single position named after its largest row
+        df = df.sort_values('number_of_shares', kind='stable')
+        return df.groupby('key', sort=False).agg({
+            'isin': 'last',
+            'security_name': 'last',
+            'sector': 'last',
+            'number_of_shares': 'sum',
+            'weight_pct': 'sum'
+        })
+
+    prev = _prepare(prev_df)
+    curr = _prepare(curr_df)
+    delta = curr.join(prev, how='outer', lsuffix='_curr', rsuffix='_prev')
+
+    in_prev = delta['number_of_shares_prev'].notna()
+    in_curr = delta['number_of_shares_curr'].notna()
+
+    result = pd.DataFrame(index=delta.index)
+    result['isin'] = delta['isin_curr'].fillna(delta['isin_prev'])
+    result['security_name'] = delta['security_name_curr'].fillna(delta['security_name_prev'])
+    # names can change under the same ISIN, so keep the older month's name too
+    result['prev_security_name'] = delta['security_name_prev']
+    result['sector'] = delta['sector_curr'].fillna(delta['sector_prev'])
+    result['prev_month'] = prev_month
+    result['month'] = month
+    result['prev_shares'] = delta['number_of_shares_prev'].fillna(0.0)
+    result['curr_shares'] = delta['number_of_shares_curr'].fillna(0.0)
+    result['share_change'] = result['curr_shares'] - result['prev_shares']
+    result['prev_weight_pct'] = delta['weight_pct_prev'].fillna(0.0)
+    result['curr_weight_pct'] = delta['weight_pct_curr'].fillna(0.0)
+    result['weight_change'] = result['curr_weight_pct'] - result['prev_weight_pct']
+
+    result['action'] = 'unchanged'
+    result.loc[result['share_change'] > 0, 'action'] = 'increased'
+    result.loc[result['share_change'] < 0, 'action'] = 'decreased'
+    result.loc[~in_prev, 'action'] = 'entered'
+    result.loc[~in_curr, 'action'] = 'exited'
+
+    result.index.name = 'key'
+    return result.reset_index()[DELTA_COLUMNS]
+
+def store_fund_delta(fund_id, month, dirs):
+    """
+    Compute and store the delta of a stored month against the previous stored month
+    Args:
+        fund_id: Fund identifier
+        month: 'YYYY-MM' of the newer snapshot
+        dirs: Directory structure dictionary
+    Returns:
+        str: Path to saved delta file, or None when there is no earlier month
+    """
+    try:
+        fund_dir = os.path.join(dirs["holdings"], fund_id)
+        months = fund_months(fund_id, dirs)
+        if month not in months:
+            return None
+        idx = months.index(month)
+        if idx == 0:
+            return None
+        prev_month = months[idx - 1]
+
+        prev_df = pd.read_csv(os.path.join(fund_dir, f"holdings_{prev_month}.csv"))
+        curr_df = pd.read_csv(os.path.join(fund_dir, f"holdings_{month}.csv"))
+        delta = compute_holdings_delta(prev_df, curr_df, prev_month=prev_month, month=month)
+
+        delta_dir = os.path.join(dirs["deltas"], fund_id)
+        os.makedirs(delta_dir, exist_ok=True)
+        file_path = os.path.join(delta_dir, f"delta_{month}.csv")
+        delta.to_csv(file_path, index=False)
+        return file_path
+
+    except Exception as e:
+        print(f"❌ Error saving delta for {fund_id} ({month}): {str(e)}")
+        return None
+
+def build_fund_deltas(fund_ids, dirs):
+    """Compute and store deltas for every stored month pair of the given funds"""
+    for fund_id in fund_ids:
+        months = fund_months(fund_id, dirs)
+        if not months:
+            print(f"⚠️  No data found for fund {fund_id}")
+            continue
+        stored = 0
+        for month in months[1:]:
+            if store_fund_delta(fund_id, month, dirs):
+                stored += 1
+        print(f"✅ Stored {stored} deltas for {fund_id}")
+
+def quarantine_fund_month(fund_id, month, dirs):
+    """
+    Move a stored fund-month out of the store into quarantine
+    The month is dropped from the catalog, its delta is removed and the next
+    stored month's delta is rebuilt against the month before it.
+    Returns:
+        str: Path of the quarantined file
+    """
+    later = [m for m in fund_months(fund_id, dirs) if m > month]
+    target = quarantine_path(dirs, fund_id, month)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv"), target)
+    drop_catalog_month(dirs, fund_id, month)
+
+    if dirs.get("deltas"):
+        stale = [month] + later[:1]
+        for m in stale:
+            delta_file = os.path.join(dirs["deltas"], fund_id, f"delta_{m}.csv")
+            if os.path.exists(delta_file):
+                os.remove(delta_file)
+        if later:
+            store_fund_delta(fund_id, later[0], dirs)
+    return target
+
+def restore_quarantined(fund_id, dirs, month=None):
+    """
+    Store quarantined holdings of a fund again (e.g. after their failures were
+    accepted); each file is re-validated and leaves quarantine once stored
+    Args:
+        month: 'YYYY-MM' to restore; defaults to every quarantined month of the fund
+    Returns:
+        list of restored months
+    """
+    quarantine_dir = os.path.dirname(quarantine_path(dirs, fund_id, month or ''))
+    if not os.path.isdir(quarantine_dir):
+        return []
+    months = [holdings_month(f) for f in sorted(os.listdir(quarantine_dir))
+              if f.startswith('holdings_') and f.endswith('.csv')]
+    restored = []
+    for m in months if month is None else [m for m in months if m == month]:
+        quarantined = quarantine_path(dirs, fund_id, m)
+        if store_fund_holdings(fund_id, pd.read_csv(quarantined), dirs, month=m):
+            os.remove(quarantined)
+            restored.append(m)
+    return restored
+
+def load_fund_deltas(fund_id, months, dirs):
+    """
+    Deltas covering consecutive pairs of the given months
+    Stored deltas are used where they exist and were computed against the
+    expected previous month; any other pair is computed in memory from the two
+    snapshots with compute_holdings_delta, so the result is the same whether
+    or not every delta of the window happens to be stored.
+    Args:
+        fund_id: Fund identifier
+        months: List of 'YYYY-MM' strings (newest to oldest)
+        dirs: Directory structure dictionary
+    Returns:
+        List of delta DataFrames (newest to oldest)
+    """
+    snapshots = {}
+
+    def _snapshot(month):
+        if month not in snapshots:
+            snapshots[month] = pd.read_csv(os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv"))
+        return snapshots[month]
+
+    deltas = []
+    for i in range(len(months) - 1):
+        delta = load_delta(fund_id, months[i], dirs, prev_month=months[i + 1])
+        if delta is None:
+            delta = compute_holdings_delta(_snapshot(months[i + 1]), _snapshot(months[i]),
+                                           prev_month=months[i + 1], month=months[i])
+        deltas.append(delta)
+    return deltas
+
+def load_delta(fund_id, month, dirs, prev_month=None):
+    """Load the stored delta for a month, optionally checking which month it was diffed against"""
+    if not dirs.get("deltas"):
+        return None
+    file_path = os.path.join(dirs["deltas"], fund_id, f"delta_{month}.csv")
+    if not os.path.exists(file_path):
+        return None
+    try:
+        delta = pd.read_csv(file_path, dtype={'prev_month': str, 'month': str})
+    except Exception:
+        return None
+    if prev_month is not None and (delta.empty or str(delta['prev_month'].iloc[0]) != prev_month):
+        return None
+    return delta
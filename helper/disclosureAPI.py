@@ -0,0 +1,191 @@
+import csv
+import datetime as dt
+import os
+import re
+import pandas as pd
+
+HOLDINGS_COLUMNS = [
+    'fund_id', 'fund_name', 'security_name', 'isin',
+    'number_of_shares', 'share_change', 'weight_pct', 'sector'
+]
+
+# header spellings seen in AMC portfolio disclosures, compared after normalize_header
+COLUMN_ALIASES = {
+    'security_name': ['security_name', 'security name', 'name of the instrument', 'name of instrument',
+                      'instrument name', 'company name', 'name of the company', 'issuer name', 'scrip name',
+                      'security', 'instrument', 'company'],
+    'isin': ['isin', 'isin code', 'isin no', 'isin number'],
+    'number_of_shares': ['number_of_shares', 'quantity', 'qty', 'no of shares', 'number of shares', 'shares',
+                         'no of units', 'units'],
+    'share_change': ['share_change', 'share change', 'change in shares', 'change in quantity'],
+    'weight_pct': ['weight_pct', '% to nav', '% of nav', '% to net assets', '% of net assets', 'percentage to nav',
+                   'percent to nav', '% to aum', 'weight', 'weightage', 'weight %', 'holding %'],
+    'sector': ['sector', 'industry', 'industry / rating', 'industry/rating', 'rating / industry', 'rating/industry'],
+    'fund_name': ['fund_name', 'scheme name', 'fund name', 'scheme'],
+    'fund_id': ['fund_id', 'fund id'],
+    'date': ['date', 'portfolio date', 'as on date', 'as on', 'month', 'as of date'],
+}
+
+# cells read as missing, like pandas' default NA values
+MISSING_VALUES = {'', 'na', 'n/a', 'nan', 'null', 'none'}
+
+MONTH_NAMES = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+FUND_ID_PATTERN = re.compile(r'INF[0-9A-Z]{9}')
+YEAR_MONTH_PATTERN = re.compile(r'(?<!\d)(20\d{2}|19\d{2})[-_ .]?(0[1-9]|1[0-2])(?!\d)')
+# 31.08.2025, 31/08/2025 or 31-08-2025 (day first, as Indian AMCs write dates)
+DAY_MONTH_YEAR_PATTERN = re.compile(r'(?<!\d)\d{1,2}([./-])(\d{1,2})\1(\d{4})(?!\d)')
+# 'Aug 2025', 'August-25' or 'Aug 31, 2025' (an optional day between month and year)
+MONTH_YEAR_PATTERN = re.compile(r'(?<![a-z])(' + '|'.join(MONTH_NAMES) + r')[a-z]*[-_ .,\']*'
+                                r'(?:\d{1,2}(?:st|nd|rd|th)?[-_ .,\']+)?(\d{4}|\d{2})(?!\d)')
+# disclosures older than this, or more than a year ahead, are a misread date
+FIRST_DISCLOSURE_YEAR = 1990
+
+def normalize_header(value):
+    """Lowercase a header cell and reduce it to letters, digits, '%' and '/'"""
+    text = str(value).strip().lower().replace('_', ' ')
+    text = re.sub(r'[^a-z0-9%/ ]', ' ', text)
+    text = re.sub(r'\s*/\s*', '/', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+_ALIAS_LOOKUP = {normalize_header(alias): column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+def map_columns(headers):
+    """
+    Map disclosure headers onto the holdings schema
+    Returns:
+        dict of column position -> schema column (first match wins)
+    """
+    mapping = {}
+    for pos, header in enumerate(headers):
+        column = _ALIAS_LOOKUP.get(normalize_header(header))
+        if column and column not in mapping.values():
+            mapping[pos] = column
+    return mapping
+
+def month_from_text(text):
+    """
+    Extract 'YYYY-MM' from text such as holdings_2023-04, 202304, 'April 2023',
+    'Aug 31, 2025' or 31.08.2025; None when absent or the year is implausible
+    """
+    text = str(text).lower()
+    last_year = dt.date.today().year + 1
+    candidates = [(m.group(1), m.group(2)) for m in YEAR_MONTH_PATTERN.finditer(text)]
+    candidates += [(m.group(3), m.group(2)) for m in DAY_MONTH_YEAR_PATTERN.finditer(text)]
+    for m in MONTH_YEAR_PATTERN.finditer(text):
+        year = m.group(2)
+        candidates.append((f"20{year}" if len(year) == 2 else year, MONTH_NAMES.index(m.group(1)[:3]) + 1))
+    # numeric patterns first (they are unambiguous), then month names, each left to right
+    for year, month in candidates:
+        if FIRST_DISCLOSURE_YEAR <= int(year) <= last_year and 1 <= int(month) <= 12:
+            return f"{year}-{int(month):02d}"
+    return None
+
+def read_disclosure_table(file_path):
+    """Read a CSV/XLSX disclosure without assuming where its header row is"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in ('.xlsx', '.xls'):
+        # first sheet only; needs openpyxl (xlsx) or xlrd (xls)
+        return pd.read_excel(file_path, header=None, dtype=object)
+    # title rows above the header are usually narrower than the table, so read rows
+    # of any width and pad them rather than letting the first line fix the field count
+    with open(file_path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        rows = [[None if v.strip().lower() in MISSING_VALUES else v for v in row] for row in csv.reader(f)]
+    width = max((len(row) for row in rows), default=0)
+    return pd.DataFrame([row + [None] * (width - len(row)) for row in rows], dtype=object)
+
+def _to_number(series):
+    cleaned = series.astype(str).str.replace(r'[,%\s]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce')
+
+def parse_disclosure_file(file_path, source_dir=None):
+    """
+    Parse one AMC portfolio disclosure into the holdings_YYYY-MM.csv schema
+    The fund id is taken from a fund_id column or an INF... id in the file path,
+    the month from the file path, a date column or the title rows above the header.
+    Args:
+        file_path: Path to a .csv/.xlsx/.xls disclosure
+        source_dir: Root of the backfill directory (only the relative path is searched for ids/months)
+    Returns:
+        tuple (fund_id, month, holdings DataFrame)
+    Raises:
+        ValueError when the header, fund id or month cannot be determined
+    """
+    raw = read_disclosure_table(file_path)
+    rel_path = os.path.relpath(file_path, source_dir) if source_dir else os.path.basename(file_path)
+
+    header_row, mapping = None, {}
+    for i in range(min(len(raw), 50)):
+        mapping = map_columns(raw.iloc[i].tolist())
+        columns = set(mapping.values())
+        if 'security_name' in columns and ('isin' in columns or 'number_of_shares' in columns):
+            header_row = i
+            break
+    if header_row is None:
+        raise ValueError("no header row with a security name and ISIN/quantity column")
+
+    df = raw.iloc[header_row + 1:, list(mapping)].copy()
+    df.columns = [mapping[pos] for pos in mapping]
+
+    fund_id = None
+    if 'fund_id' in df.columns and df['fund_id'].notna().any():
+        fund_id = str(df['fund_id'].dropna().iloc[0]).strip()
+    if not fund_id:
+        match = FUND_ID_PATTERN.search(rel_path.upper())
+        fund_id = match.group(0) if match else None
+    if not fund_id:
+        raise ValueError("cannot determine fund id (add a fund_id column or put the file under a <fund_id>/ folder)")
+
+    month = month_from_text(FUND_ID_PATTERN.sub('', rel_path.upper()))
+    if month is None and 'date' in df.columns:
+        dates = pd.to_datetime(df['date'], errors='coerce', dayfirst=True).dropna()
+        month = dates.max().strftime("%Y-%m") if not dates.empty else None
+    if month is None:
+        title = ' '.join(str(v) for v in raw.iloc[:header_row].values.ravel() if pd.notna(v))
+        month = month_from_text(title)
+    if month is None:
+        raise ValueError("cannot determine the disclosure month")
+
+    df['security_name'] = df['security_name'].astype(str).str.strip()
+    df['number_of_shares'] = _to_number(df['number_of_shares']) if 'number_of_shares' in df.columns else float('nan')
+    # keep instrument rows: named, holding a quantity, and not a (sub/grand) total line
+    names = df['security_name'].str.lower()
+    df = df[df['security_name'].ne('') & names.ne('nan')
+            & ~names.str.match(r'^(sub\s*-?\s*total|grand\s+total|total)\b')
+            & (df['number_of_shares'] > 0)].copy()
+
+    df['weight_pct'] = _to_number(df['weight_pct']).fillna(0.0) if 'weight_pct' in df.columns else 0.0
+    # some AMCs publish weights as fractions of NAV rather than percentages
+    if len(df) and df['weight_pct'].max() <= 1 and df['weight_pct'].sum() <= 1.5:
+        df['weight_pct'] = df['weight_pct'] * 100
+    df['share_change'] = _to_number(df['share_change']) if 'share_change' in df.columns else float('nan')
+    df['isin'] = df['isin'].fillna('').astype(str).str.strip().str.upper() if 'isin' in df.columns else ''
+    df['sector'] = df['sector'].fillna('').astype(str).str.strip() if 'sector' in df.columns else ''
+    df['fund_id'] = fund_id
+    if 'fund_name' not in df.columns or df['fund_name'].isna().all():
+        df['fund_name'] = fund_id
+
+    return fund_id, month, df[HOLDINGS_COLUMNS].reset_index(drop=True)
+
+def fill_share_change(curr_df, prev_df):
+    """
+    Fill missing share_change values as the change in shares against the previous month
+    (matched by ISIN, falling back to the security name); 0 when there is no previous month
+    """
+    curr_df = curr_df.copy()
+    missing = curr_df['share_change'].isna()
+    if not missing.any():
+        return curr_df
+    if prev_df is None or prev_df.empty:
+        curr_df.loc[missing, 'share_change'] = 0.0
+        return curr_df
+
+    def _keys(df):
+        isin = df['isin'].fillna('').astype(str).str.strip()
+        return isin.where(isin != '', df['security_name'].astype(str))
+
+    prev_shares = pd.to_numeric(prev_df['number_of_shares'], errors='coerce').fillna(0.0)
+    prev_shares = prev_shares.groupby(_keys(prev_df)).sum()
+    previous = _keys(curr_df).map(prev_shares).fillna(0.0)
+    curr_df.loc[missing, 'share_change'] = (curr_df['number_of_shares'] - previous)[missing]
+    return curr_df
@@ -0,0 +1,98 @@
+import os
+
+FILTER_FLAGS = ('--sector', '--isin', '--watchlist', '--min-weight', '--top')
+
+def parse_filter_args(args):
+    """
+    Split row filter flags out of command arguments
+    Supported flags (values may be repeated or comma separated):
+        --sector NAME, --isin ISIN, --watchlist FILE, --min-weight PCT, --top N
+    Returns:
+        tuple (filters dict or None, remaining args)
+    """
+    filters = {'sectors': None, 'isins': None, 'min_weight': None, 'top': None}
+    remaining = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in FILTER_FLAGS:
+            if i + 1 >= len(args):
+                raise ValueError(f"Missing value for {arg}")
+            value = args[i + 1]
+            i += 2
+            if arg == '--sector':
+                filters['sectors'] = (filters['sectors'] or set()) | _split_values(value, lower=True)
+            elif arg == '--isin':
+                filters['isins'] = (filters['isins'] or set()) | _split_values(value)
+            elif arg == '--watchlist':
+                filters['isins'] = (filters['isins'] or set()) | load_watchlist(value)
+            elif arg == '--min-weight':
+                filters['min_weight'] = float(value)
+            elif arg == '--top':
+                filters['top'] = int(value)
+        else:
+            remaining.append(arg)
+            i += 1
+
+    if all(v is None for v in filters.values()):
+        return None, remaining
+    return filters, remaining
+
+def _split_values(value, lower=False):
+    values = {v.strip() for v in value.split(',') if v.strip()}
+    return {v.lower() for v in values} if lower else {v.upper() for v in values}
+
+def load_watchlist(file_path):
+    """Read ISINs from a watchlist file (one per line or comma separated, '#' starts a comment)"""
+    if not os.path.exists(file_path):
+        raise ValueError(f"Watchlist file not found: {file_path}")
+    isins = set()
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            for value in line.split(','):
+                value = value.strip().upper()
+                # tolerate a CSV header row
+                if value and value != 'ISIN':
+                    isins.add(value)
+    return isins
+
+def apply_holdings_filters(df, filters, sector_col='sector', isin_col='isin'):
+    """Keep only rows matching the sector and ISIN filters"""
+    if not filters or df.empty:
+        return df
+    mask = None
+    if filters.get('sectors'):
+        m = df[sector_col].fillna('').astype(str).str.strip().str.lower().isin(filters['sectors'])
+        mask = m if mask is None else mask & m
+    if filters.get('isins'):
+        m = df[isin_col].fillna('').astype(str).str.strip().str.upper().isin(filters['isins'])
+        mask = m if mask is None else mask & m
+    return df if mask is None else df[mask]
+
+def apply_min_weight(frames, filters, key_col='security_name', weight_cols=('weight_pct',)):
+    """
+    Apply the --min-weight filter across several months of one fund
+    A security is kept in every frame when it meets the threshold in any of
+    them, so a position falling below the threshold is not reported as an exit.
+    """
+    if not filters or filters.get('min_weight') is None:
+        return frames
+    keep = min_weight_keys(frames, filters, key_col=key_col, weight_cols=weight_cols)
+    return [df[df[key_col].isin(keep)] for df in frames]
+
+def min_weight_keys(frames, filters, key_col='security_name', weight_cols=('weight_pct',)):
+    """Keys that meet the --min-weight threshold in any of the frames (the rows apply_min_weight keeps)"""
+    keep = set()
+    for df in frames:
+        weights = df[list(weight_cols)].max(axis=1)
+        keep.update(df.loc[weights >= filters['min_weight'], key_col])
+    return keep
+
+def select_top(df, filters, column, by_abs=False):
+    """Return the top-N rows by column using partial selection (nlargest) instead of a full sort"""
+    if not filters or not filters.get('top') or df.empty:
+        return df
+    if by_abs:
+        return df.loc[df[column].abs().nlargest(filters['top']).index]
+    return df.nlargest(filters['top'], column)
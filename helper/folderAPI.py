@@ -1,21 +1,31 @@
 import os
 
-def create_directory_structure(base_dir="fund_data", group=None):
+def create_directory_structure(base_dir="fund_data", group=None, create=True):
     """Create directory structure for storing fund data.
 
-    If `group` is provided, directories will be created under base_dir/group/...
-    Returns a dict with 'holdings' and 'analysis' paths.
+    Holdings, their deltas and collection manifests live in one fund-level
+    store directly under base_dir, so a fund that belongs to several groups is
+    collected and stored once. Groups are views over that store: if `group` is
+    provided, only analysis outputs are written under base_dir/group/analysis.
+    Pass create=False to only resolve the paths (e.g. for read-only library use);
+    the result is then marked 'read_only' so readers never write into the store.
+    Returns a dict with 'holdings', 'deltas', 'manifests' and 'analysis' paths.
     """
     root = base_dir
     if group:
         root = os.path.join(base_dir, str(group))
 
     directories = {
-        "holdings": os.path.join(root, "holdings"),
+        "holdings": os.path.join(base_dir, "holdings"),
+        "deltas": os.path.join(base_dir, "deltas"),
+        "manifests": os.path.join(base_dir, "manifests"),
         "analysis": os.path.join(root, "analysis")
     }
 
-    for dir_path in directories.values():
-        os.makedirs(dir_path, exist_ok=True)
+    if create:
+        for dir_path in directories.values():
+            os.makedirs(dir_path, exist_ok=True)
+    else:
+        directories["read_only"] = True
 
     return directories
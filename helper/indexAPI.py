@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import pandas as pd
+from helper.catalogAPI import *
+
+INDEX_FILE = "holdings_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    security_key TEXT NOT NULL,
+    isin TEXT NOT NULL,
+    security_name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    sector TEXT,
+    fund_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    shares REAL,
+    weight_pct REAL
+);
+CREATE INDEX IF NOT EXISTS postings_security ON postings (security_key, month);
+CREATE INDEX IF NOT EXISTS postings_name ON postings (name_lower);
+CREATE INDEX IF NOT EXISTS postings_fund_month ON postings (fund_id, month);
+CREATE TABLE IF NOT EXISTS securities (
+    security_key TEXT PRIMARY KEY,
+    isin TEXT NOT NULL,
+    security_name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    last_month TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS securities_isin ON securities (isin);
+CREATE TABLE IF NOT EXISTS indexed_months (
+    fund_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    PRIMARY KEY (fund_id, month)
+);
+"""
+
+def index_path(dirs):
+    """Path of the security -> funds index of the data root that dirs belongs to"""
+    return os.path.join(os.path.dirname(os.path.normpath(dirs["holdings"])), INDEX_FILE)
+
+def open_index(dirs):
+    """Open (creating if needed) the postings index"""
+    conn = sqlite3.connect(index_path(dirs))
+    conn.executescript(SCHEMA)
+    return conn
+
+def _postings(fund_id, month, holdings_df):
+    isin = holdings_df['isin'].fillna('').astype(str).str.strip() if 'isin' in holdings_df.columns else pd.Series('', index=holdings_df.index)
+    names = holdings_df['security_name'].fillna('').astype(str).str.strip()
+    sector = holdings_df['sector'].fillna('').astype(str) if 'sector' in holdings_df.columns else ''
+    return pd.DataFrame({
+        'security_key': isin.where(isin != '', names),
+        'isin': isin,
+        'security_name': names,
+        'name_lower': names.str.lower(),
+        'sector': sector,
+        'fund_id': fund_id,
+        'month': month,
+        'shares': pd.to_numeric(holdings_df['number_of_shares'], errors='coerce').fillna(0.0),
+        'weight_pct': pd.to_numeric(holdings_df['weight_pct'], errors='coerce').fillna(0.0)
+    })
+
+def index_fund_month(conn, fund_id, month, holdings_df, checksum):
+    """Replace the postings of one fund-month (one transaction)"""
+    postings = _postings(fund_id, month, holdings_df)
+    with conn:
+        conn.execute("DELETE FROM postings WHERE fund_id = ? AND month = ?", (fund_id, month))
+        postings.to_sql('postings', conn, if_exists='append', index=False)
+        # one row per security (name as of its latest month) keeps name lookups small
+        conn.executemany(
+            """INSERT INTO securities (security_key, isin, security_name, name_lower, last_month)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (security_key) DO UPDATE SET
+                   isin = excluded.isin, security_name = excluded.security_name,
+                   name_lower = excluded.name_lower, last_month = excluded.last_month
+               WHERE excluded.last_month >= securities.last_month""",
+            postings[['security_key', 'isin', 'security_name', 'name_lower', 'month']]
+            .drop_duplicates('security_key').itertuples(index=False, name=None))
+        conn.execute("INSERT OR REPLACE INTO indexed_months (fund_id, month, checksum) VALUES (?, ?, ?)",
+                     (fund_id, month, checksum))
+
+def update_index(dirs, fund_id, month, holdings_df):
+    """Index a newly stored fund-month when the index already exists (it is built lazily otherwise)"""
+    if not os.path.exists(index_path(dirs)):
+        return
+    entry = load_catalog(dirs)['funds'].get(fund_id, {}).get('months', {}).get(month)
+    if not entry:
+        return
+    conn = open_index(dirs)
+    try:
+        index_fund_month(conn, fund_id, month, holdings_df, entry['checksum'])
+    finally:
+        conn.close()
+
+def sync_index(dirs, log=print):
+    """
+    Bring the index in line with the holdings catalog
+    Only fund-months whose checksum is new or changed are (re)read, and
+    postings of months no longer stored are dropped.
+    Returns:
+        number of fund-months (re)indexed
+    """
+    catalog = load_catalog(dirs)
+    conn = open_index(dirs)
+    try:
+        indexed = {(f, m): c for f, m, c in conn.execute("SELECT fund_id, month, checksum FROM indexed_months")}
+        wanted = {(fund_id, month): entry['checksum']
+                  for fund_id, fund in catalog['funds'].items()
+                  for month, entry in fund.get('months', {}).items()}
+
+        stale = [key for key in indexed if key not in wanted]
+        if stale:
+            with conn:
+                conn.executemany("DELETE FROM postings WHERE fund_id = ? AND month = ?", stale)
+                conn.executemany("DELETE FROM indexed_months WHERE fund_id = ? AND month = ?", stale)
+
+        todo = sorted(key for key, checksum in wanted.items() if indexed.get(key) != checksum)
+        if todo and log:
+            log(f"🔄 Indexing {len(todo)} fund-months")
+        for fund_id, month in todo:
+            file_path = os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv")
+            try:
+                index_fund_month(conn, fund_id, month, pd.read_csv(file_path), wanted[(fund_id, month)])
+            except Exception as e:
+                if log:
+                    log(f"⚠️  Could not index {file_path}: {str(e)}")
+        return len(todo)
+    finally:
+        conn.close()
+
+def isin_family(isin):
+    """
+    Issuer and security type part of an Indian ISIN (INE745G01043 -> INE745G01)
+    It stays the same across a face value split but tells e.g. the equity and
+    the NCDs of one issuer apart. Other ISINs are their own family; a missing
+    ISIN gives ''.
+    """
+    isin = str(isin or '').strip().upper()
+    return isin[:9] if len(isin) == 12 and isin.startswith('IN') else isin
+
+def find_securities(conn, query):
+    """
+    Securities matching an ISIN or a (partial, case-insensitive) name
+    An ISIN also matches the other ISINs of the same issuer and security type
+    listed under the same security name (e.g. a new ISIN after a face value
+    split), but not e.g. the issuer's NCDs sharing its name.
+    Returns:
+        DataFrame of security_key, isin, latest security_name and last_month
+    """
+    query = query.strip()
+    sql = "SELECT security_key, isin, security_name, last_month FROM securities WHERE {} ORDER BY security_name"
+    matches = pd.read_sql_query(
+        sql.format("name_lower IN (SELECT name_lower FROM securities WHERE isin = ?)"), conn, params=(query.upper(),))
+    if not matches.empty:
+        families = matches['isin'].map(isin_family)
+        return matches[families.isin([isin_family(query), ''])].reset_index(drop=True)
+    # % and _ in the query are matched literally
+    pattern = query.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return pd.read_sql_query(sql.format("name_lower LIKE ? ESCAPE '\\'"), conn, params=(f"%{pattern}%",))
+
+def security_postings(conn, security_keys, months, fund_ids=None):
+    """
+    Postings of the given security keys in the given months, optionally limited to some funds
+    Returns:
+        DataFrame of security_key, fund_id, month, shares, weight_pct
+    """
+    keys = ','.join('?' * len(security_keys))
+    placeholders = ','.join('?' * len(months))
+    postings = pd.read_sql_query(
+        f"SELECT security_key, fund_id, month, shares, weight_pct FROM postings "
+        f"WHERE security_key IN ({keys}) AND month IN ({placeholders}) ORDER BY month, fund_id",
+        conn, params=(*security_keys, *months))
+    if fund_ids is not None:
+        postings = postings[postings['fund_id'].isin(fund_ids)]
+    return postings
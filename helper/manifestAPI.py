@@ -0,0 +1,75 @@
+import datetime as dt
+import hashlib
+import json
+import os
+
+def file_checksum(file_path):
+    """Return the sha256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_path(dirs, month):
+    """Path of the collection manifest for a month ('YYYY-MM')"""
+    return os.path.join(dirs["manifests"], f"collect_{month}.json")
+
+def load_manifest(dirs, month):
+    """
+    Load the collection manifest for a month
+    Returns:
+        dict with 'month' and 'funds' (fund_id -> status entry); a fresh
+        manifest when none exists or the file is unreadable
+    """
+    path = manifest_path(dirs, month)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+            manifest.setdefault('funds', {})
+            return manifest
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable manifest {path}: {str(e)}")
+    return {'month': month, 'funds': {}}
+
+def save_manifest(manifest, dirs):
+    """Write the manifest atomically so an interrupted run never leaves it half written"""
+    path = manifest_path(dirs, manifest['month'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def record_fund_status(manifest, fund_id, status, file_path=None, rows=None, error=None):
+    """Record the outcome of collecting one fund in the manifest"""
+    entry = {
+        'status': status,
+        'updated_at': dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    if file_path:
+        entry['file'] = file_path
+        entry['checksum'] = file_checksum(file_path)
+    if rows is not None:
+        entry['rows'] = int(rows)
+    if error:
+        entry['error'] = error
+    manifest['funds'][fund_id] = entry
+    return entry
+
+def is_fund_complete(manifest, fund_id, file_path):
+    """
+    Check whether a fund was already collected for the manifest's month
+    A fund counts as complete only when it is marked done and the stored file
+    still exists with the recorded checksum.
+    """
+    entry = manifest['funds'].get(fund_id)
+    if not entry or entry.get('status') != 'done':
+        return False
+    if not os.path.exists(file_path):
+        return False
+    try:
+        return file_checksum(file_path) == entry.get('checksum')
+    except OSError:
+        return False
@@ -0,0 +1,88 @@
+import os
+import shutil
+from helper.dataAPI import *
+from helper.folderAPI import *
+from helper.manifestAPI import *
+
+# top-level folders of the shared store that are not group folders
+STORE_FOLDERS = ('holdings', 'deltas', 'manifests', 'analysis')
+
+def migrate_to_shared_store(base_dir="fund_data", dry_run=False):
+    """
+    Move group-scoped holdings (base_dir/<group>/holdings/<fund_id>) into the
+    shared fund-level store (base_dir/holdings/<fund_id>)
+
+    Identical copies of a fund-month are deduplicated. When two copies differ
+    the most recently written one is kept and the conflict is reported. Group
+    deltas and manifests are dropped and deltas are rebuilt for every migrated
+    fund, since merging groups can change which month precedes which.
+    Args:
+        base_dir: Data root containing the group folders
+        dry_run: Only report what would be done
+    Returns:
+        dict with counts of moved, duplicate and conflicting files
+    """
+    dirs = create_directory_structure(base_dir=base_dir)
+    stats = {'moved': 0, 'duplicates': 0, 'conflicts': 0}
+    migrated_funds = set()
+    # files that land in the shared store, recorded in the catalog with one write
+    landed = []
+
+    groups = sorted(d for d in os.listdir(base_dir)
+                    if d not in STORE_FOLDERS and os.path.isdir(os.path.join(base_dir, d, 'holdings')))
+    for group in groups:
+        group_holdings = os.path.join(base_dir, group, 'holdings')
+        for fund_id in sorted(os.listdir(group_holdings)):
+            fund_dir = os.path.join(group_holdings, fund_id)
+            if not os.path.isdir(fund_dir):
+                continue
+            target_dir = os.path.join(dirs['holdings'], fund_id)
+            for file in sorted(f for f in os.listdir(fund_dir) if f.endswith('.csv')):
+                source = os.path.join(fund_dir, file)
+                target = os.path.join(target_dir, file)
+                migrated_funds.add(fund_id)
+
+                if not os.path.exists(target):
+                    stats['moved'] += 1
+                    if not dry_run:
+                        os.makedirs(target_dir, exist_ok=True)
+                        shutil.move(source, target)
+                        landed.append(target)
+                elif file_checksum(source) == file_checksum(target):
+                    stats['duplicates'] += 1
+                    if not dry_run:
+                        os.remove(source)
+                else:
+                    stats['conflicts'] += 1
+                    keep_source = os.path.getmtime(source) > os.path.getmtime(target)
+                    print(f"⚠️  {fund_id}/{file} differs between '{group}' and the shared store; "
+                          f"keeping the {'group' if keep_source else 'shared'} copy (newer)")
+                    if not dry_run:
+                        if keep_source:
+                            shutil.move(source, target)
+                            landed.append(target)
+                        else:
+                            os.remove(source)
+
+        if not dry_run:
+            for folder in ('holdings', 'deltas', 'manifests'):
+                path = os.path.join(base_dir, group, folder)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+            group_dir = os.path.join(base_dir, group)
+            if not os.listdir(group_dir):
+                os.rmdir(group_dir)
+
+    action = "Would migrate" if dry_run else "Migrated"
+    print(f"✅ {action} {len(migrated_funds)} funds from {len(groups)} groups: "
+          f"{stats['moved']} files moved, {stats['duplicates']} duplicates removed, "
+          f"{stats['conflicts']} conflicts resolved")
+
+    if migrated_funds and not dry_run:
+        # record the moved files once before deriving deltas
+        record_catalog_months(dirs, [(os.path.basename(os.path.dirname(path)), holdings_month(os.path.basename(path)),
+                                      path, None) for path in landed
+                                     if os.path.basename(path).startswith('holdings_')])
+        build_fund_deltas(sorted(migrated_funds), dirs)
+
+    return stats
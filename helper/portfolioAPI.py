@@ -0,0 +1,56 @@
+import datetime as dt
+import json
+import pandas as pd
+
+def load_portfolio(path):
+    """
+    Load a personal portfolio of fund positions
+    Supported formats:
+        CSV: a fund_id column plus amount (₹), or units with an optional nav column
+        JSON: {"INF...": 250000, ...} (amounts) or {"INF...": {"units": 1200.5, "nav": 180.2}, ...}
+    Units without a NAV are valued at the latest NAV from Morningstar.
+    Returns:
+        DataFrame with fund_id and amount (₹), one row per fund
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r') as f:
+            raw = json.load(f)
+        rows = []
+        for fund_id, value in raw.items():
+            if isinstance(value, dict):
+                rows.append({'fund_id': fund_id, 'amount': value.get('amount'),
+                             'units': value.get('units'), 'nav': value.get('nav')})
+            else:
+                rows.append({'fund_id': fund_id, 'amount': value, 'units': None, 'nav': None})
+        df = pd.DataFrame(rows, columns=['fund_id', 'amount', 'units', 'nav'])
+    else:
+        df = pd.read_csv(path)
+        if 'fund_id' not in df.columns or not {'amount', 'units'} & set(df.columns):
+            raise ValueError(f"{path} needs a fund_id column and an amount or units column")
+        for col in ('amount', 'units', 'nav'):
+            if col not in df.columns:
+                df[col] = None
+
+    df['fund_id'] = df['fund_id'].astype(str).str.strip()
+    for col in ('amount', 'units', 'nav'):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    needs_nav = df['amount'].isna() & df['units'].notna() & df['nav'].isna()
+    for idx in df.index[needs_nav]:
+        df.at[idx, 'nav'] = fetch_latest_nav(df.at[idx, 'fund_id'])
+    df['amount'] = df['amount'].fillna(df['units'] * df['nav'])
+
+    missing = df.loc[df['amount'].isna(), 'fund_id'].tolist()
+    if missing:
+        raise ValueError(f"No amount (or units and NAV) for: {', '.join(missing)}")
+    return df.groupby('fund_id', sort=False, as_index=False)['amount'].sum()
+
+def fetch_latest_nav(fund_id):
+    """Latest NAV of a fund from Morningstar (last value of the past two weeks)"""
+    import mstarpy as ms
+
+    end = dt.datetime.today()
+    history = ms.Funds(fund_id).nav(end - dt.timedelta(days=14), end)
+    if not history:
+        raise ValueError(f"No NAV available for {fund_id}")
+    return float(history[-1]['nav'])
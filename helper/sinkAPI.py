@@ -0,0 +1,56 @@
+import datetime as dt
+import os
+
+def csv_sink(directory, timestamp=None):
+    """
+    Sink that writes each result to <directory>/<name>_<timestamp>.csv
+    Returns:
+        callable(name, frame) usable in the sinks list of the library functions
+    """
+    timestamp = timestamp or dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def sink(name, frame):
+        os.makedirs(directory, exist_ok=True)
+        output_file = os.path.join(directory, f"{name}_{timestamp}.csv")
+        frame.to_csv(output_file)
+        return output_file
+    return sink
+
+def print_sink(rows=10):
+    """Sink that prints the first rows of each result"""
+    def sink(name, frame):
+        print(f"\n{name}:")
+        print(frame.head(rows).to_string())
+    return sink
+
+def feather_sink(directory, timestamp=None):
+    """
+    Sink that writes each result as an Arrow IPC file (Feather v2) to
+    <directory>/<name>_<timestamp>.feather; requires pyarrow
+    """
+    timestamp = timestamp or dt.datetime.now().strftime("%Y-%m-%d_%H%M%S")
+
+    def sink(name, frame):
+        from pyarrow import feather
+        os.makedirs(directory, exist_ok=True)
+        output_file = os.path.join(directory, f"{name}_{timestamp}.feather")
+        feather.write_feather(to_arrow(frame), output_file)
+        return output_file
+    return sink
+
+def to_arrow(frame):
+    """Convert a result DataFrame to a pyarrow Table (the index is kept as a column)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("pyarrow is required for Arrow output: pip install pyarrow")
+    if hasattr(frame, 'schema'):
+        # already an Arrow table
+        return frame
+    return pa.Table.from_pandas(frame, preserve_index=True)
+
+def emit(results, sinks):
+    """Send every named result frame to every sink"""
+    for sink in sinks or []:
+        for name, frame in results.items():
+            sink(name, frame)
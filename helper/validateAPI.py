@@ -0,0 +1,248 @@
+import datetime as dt
+import json
+import os
+import pandas as pd
+from helper.catalogAPI import *
+
+VALIDATION_COLUMNS = ['fund_id', 'month', 'check', 'severity', 'count', 'detail', 'checked_at']
+VALIDATION_DIR = "validation"
+QUARANTINE_DIR = "quarantine"
+
+# a fund-month with an 'error' is quarantined, 'warning's are only reported
+ERROR = 'error'
+WARNING = 'warning'
+
+# listed holdings usually cover 75-100% of a fund (the rest is cash and derivatives)
+WEIGHT_SUM_RANGE = (60.0, 105.0)
+# a payload with less than half the rows of the previous month is treated as partial
+MIN_ROW_RATIO = 0.5
+# heuristics a fund can fail legitimately (hybrid and arbitrage funds hold little listed
+# equity, a merged or consolidated portfolio shrinks); accepted fund-months only get a warning
+ACCEPTABLE_CHECKS = ('weight_sum', 'row_drop')
+ALL_MONTHS = '*'
+# shares multiplied (or divided) by at least this much while the weight barely moved looks like a split or bonus
+SPLIT_SHARE_RATIO = 1.5
+SPLIT_WEIGHT_TOLERANCE = 0.2
+
+def validation_report_path(dirs):
+    """Path of the validation report of the data root that dirs belongs to"""
+    root = os.path.dirname(os.path.normpath(dirs["holdings"]))
+    return os.path.join(root, VALIDATION_DIR, "validation_report.csv")
+
+def quarantine_path(dirs, fund_id, month):
+    """Where a rejected holdings file of a fund-month is kept"""
+    root = os.path.dirname(os.path.normpath(dirs["holdings"]))
+    return os.path.join(root, QUARANTINE_DIR, fund_id, f"holdings_{month}.csv")
+
+def accepted_path(dirs):
+    """Path of the fund-months whose weight_sum/row_drop failures are accepted"""
+    root = os.path.dirname(os.path.normpath(dirs["holdings"]))
+    return os.path.join(root, VALIDATION_DIR, "accepted.json")
+
+def load_accepted(dirs):
+    """Accepted fund-months as fund_id -> set of months ('*' accepts every month)"""
+    path = accepted_path(dirs)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return {fund_id: set(months) for fund_id, months in json.load(f).items()}
+
+def accept_fund_months(specs, dirs):
+    """
+    Accept the weight_sum and row_drop failures of some funds or fund-months
+    Args:
+        specs: 'FUND' (every month) or 'FUND:YYYY-MM' strings
+    Returns:
+        list of the (fund_id, month) pairs added, month '*' for a whole fund
+    """
+    accepted = load_accepted(dirs)
+    added = []
+    for spec in specs:
+        fund_id, _, month = spec.strip().partition(':')
+        if not fund_id:
+            continue
+        month = month or ALL_MONTHS
+        accepted.setdefault(fund_id, set()).add(month)
+        added.append((fund_id, month))
+    path = accepted_path(dirs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({fund_id: sorted(months) for fund_id, months in sorted(accepted.items())}, f, indent=2)
+    os.replace(tmp_path, path)
+    return added
+
+def apply_accepted(issues, accepted):
+    """Demote accepted weight_sum/row_drop errors to warnings (see accept_fund_months)"""
+    if issues.empty or not accepted:
+        return issues
+    is_accepted = [check in ACCEPTABLE_CHECKS and bool(accepted.get(fund_id, set()) & {month, ALL_MONTHS})
+                   for fund_id, month, check in zip(issues['fund_id'], issues['month'], issues['check'])]
+    issues = issues.copy()
+    issues.loc[is_accepted, 'severity'] = WARNING
+    issues.loc[is_accepted, 'detail'] = issues.loc[is_accepted, 'detail'] + ' (accepted)'
+    return issues
+
+def _row_issues(df, mask, check, severity, label):
+    """One issue per fund-month with flagged rows, naming the first few securities"""
+    flagged = df[mask]
+    if flagged.empty:
+        return pd.DataFrame(columns=VALIDATION_COLUMNS[:-1])
+    grouped = flagged.groupby(['fund_id', 'month'])
+    issues = grouped.size().rename('count').reset_index()
+    names = grouped['security_name'].agg(lambda s: ', '.join(s.unique()[:3]) + (', ...' if s.nunique() > 3 else ''))
+    issues['detail'] = (label + ': ' + names).to_numpy()
+    issues['check'] = check
+    issues['severity'] = severity
+    return issues
+
+def validate_holdings(holdings):
+    """
+    Run every ingest check over stacked fund-months at once
+    Args:
+        holdings: holdings rows with fund_id and month columns. Month-over-month
+            checks compare each fund-month with the fund's previous month in the
+            frame, so include it when validating a single new month.
+    Checks (error = quarantine, warning = report only):
+        zero_shares_weight (error): rows with zero shares but a non-zero weight
+        missing_values (error): rows without shares or weight, or with negative shares
+        duplicate_isin (error): an ISIN listed twice among held rows
+        duplicate_isin_exit (warning): a zero-share exit row next to the same ISIN
+            (usually a renamed security, reported as a spurious exit)
+        weight_sum (error): held weights summing outside WEIGHT_SUM_RANGE
+        row_drop (error): fewer than MIN_ROW_RATIO of the previous month's rows
+            (both can be accepted per fund or fund-month, see apply_accepted)
+        split_like (warning): shares jumped by SPLIT_SHARE_RATIO or more while the
+            weight stayed within SPLIT_WEIGHT_TOLERANCE
+    Returns:
+        DataFrame of fund_id, month, check, severity, count and detail, one row
+        per failed check and fund-month
+    """
+    keys = ['fund_id', 'month']
+    df = pd.DataFrame({
+        'fund_id': holdings['fund_id'].astype(str).to_numpy(),
+        'month': holdings['month'].astype(str).to_numpy(),
+        'security_name': holdings['security_name'].fillna('').astype(str).to_numpy(),
+        'isin': holdings['isin'].fillna('').astype(str).str.strip().to_numpy(),
+        'shares': pd.to_numeric(holdings['number_of_shares'], errors='coerce').to_numpy(),
+        'weight': pd.to_numeric(holdings['weight_pct'], errors='coerce').to_numpy()
+    })
+    held = df['shares'] > 0
+    has_isin = df['isin'] != ''
+    issues = []
+
+    issues.append(_row_issues(df, (df['shares'] == 0) & (df['weight'].abs() > 0), 'zero_shares_weight', ERROR,
+                              'weight without shares'))
+    issues.append(_row_issues(df, df['shares'].isna() | df['weight'].isna() | (df['shares'] < 0), 'missing_values',
+                              ERROR, 'missing or negative values'))
+
+    duplicated = has_isin & df.duplicated(keys + ['isin'], keep=False)
+    held_duplicated = pd.Series(False, index=df.index)
+    held_duplicated[held & has_isin] = df[held & has_isin].duplicated(keys + ['isin'], keep=False)
+    issues.append(_row_issues(df, held_duplicated, 'duplicate_isin', ERROR, 'ISIN held twice'))
+    issues.append(_row_issues(df, duplicated & (df['shares'] == 0), 'duplicate_isin_exit', WARNING,
+                              'exit row next to the same ISIN'))
+
+    # per fund-month totals
+    months = (df.assign(held_weight=df['weight'].where(held, 0.0))
+              .groupby(keys).agg(rows=('security_name', 'size'), weight_sum=('held_weight', 'sum'))
+              .reset_index().sort_values(keys))
+    low, high = WEIGHT_SUM_RANGE
+    bad_sum = months[(months['weight_sum'] < low) | (months['weight_sum'] > high)]
+    issues.append(pd.DataFrame({
+        'fund_id': bad_sum['fund_id'], 'month': bad_sum['month'], 'count': bad_sum['rows'],
+        'detail': [f"weights sum to {w:.1f}%" for w in bad_sum['weight_sum']],
+        'check': 'weight_sum', 'severity': ERROR}))
+
+    months['prev_month'] = months.groupby('fund_id')['month'].shift(1)
+    months['prev_rows'] = months.groupby('fund_id')['rows'].shift(1)
+    dropped = months[months['rows'] < months['prev_rows'] * MIN_ROW_RATIO]
+    issues.append(pd.DataFrame({
+        'fund_id': dropped['fund_id'], 'month': dropped['month'], 'count': dropped['rows'],
+        'detail': [f"{r} rows vs {int(p)} in {m}" for r, p, m in
+                   zip(dropped['rows'], dropped['prev_rows'], dropped['prev_month'])],
+        'check': 'row_drop', 'severity': ERROR}))
+
+    # month-over-month share jumps: join each held row to the fund's previous month by ISIN
+    current = df[held & has_isin].merge(months[keys + ['prev_month']], on=keys)
+    previous = (df[held & has_isin].drop_duplicates(keys + ['isin'])
+                .rename(columns={'month': 'prev_month', 'shares': 'prev_shares', 'weight': 'prev_weight'})
+                [['fund_id', 'prev_month', 'isin', 'prev_shares', 'prev_weight']])
+    joined = current.merge(previous, on=['fund_id', 'prev_month', 'isin'])
+    share_ratio = joined['shares'] / joined['prev_shares']
+    weight_ratio = joined['weight'] / joined['prev_weight']
+    split_like = (((share_ratio >= SPLIT_SHARE_RATIO) | (share_ratio <= 1 / SPLIT_SHARE_RATIO))
+                  & (joined['prev_weight'] > 0) & ((weight_ratio - 1).abs() <= SPLIT_WEIGHT_TOLERANCE))
+    issues.append(_row_issues(joined, split_like, 'split_like', WARNING, 'shares jumped at an unchanged weight'))
+
+    issues = [i for i in issues if not i.empty]
+    if not issues:
+        return pd.DataFrame(columns=VALIDATION_COLUMNS[:-1])
+    result = pd.concat(issues, ignore_index=True)[VALIDATION_COLUMNS[:-1]]
+    result['count'] = result['count'].astype(int)
+    return result.sort_values(['fund_id', 'month', 'severity', 'check']).reset_index(drop=True)
+
+def validate_fund_month(fund_id, month, holdings_df, dirs):
+    """
+    Validate one fund-month before it is stored, against the latest stored month before it
+    Returns:
+        issues of this fund-month (see validate_holdings), accepted failures demoted
+    """
+    return validate_batch({(fund_id, month): holdings_df}, dirs)
+
+def validate_batch(payloads, dirs):
+    """
+    Validate a batch of fund-months before they are stored, in one validate_holdings pass
+    Each payload is compared with the fund's month before it, taken from the
+    batch itself or else from the store (only those stored months are read).
+    Args:
+        payloads: dict (fund_id, month) -> holdings DataFrame
+    Returns:
+        issues of the payload fund-months (see validate_holdings), accepted failures demoted
+    """
+    if not payloads:
+        return pd.DataFrame(columns=VALIDATION_COLUMNS[:-1])
+    frames = [df.assign(fund_id=fund_id, month=month) for (fund_id, month), df in payloads.items()]
+    for fund_id in sorted({fund_id for fund_id, _ in payloads}):
+        batch = {m for f, m in payloads if f == fund_id}
+        stored = [m for m in fund_months(fund_id, dirs) if m not in batch]
+        previous = set()
+        for month in batch:
+            earlier = max((m for m in stored + list(batch) if m < month), default=None)
+            if earlier in stored:
+                previous.add(earlier)
+        for month in sorted(previous):
+            previous_df = pd.read_csv(os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv"))
+            frames.append(previous_df.assign(fund_id=fund_id, month=month))
+    issues = validate_holdings(pd.concat(frames, ignore_index=True))
+    in_batch = pd.MultiIndex.from_frame(issues[['fund_id', 'month']]).isin(list(payloads))
+    return apply_accepted(issues[in_batch].reset_index(drop=True), load_accepted(dirs))
+
+def fund_month_issues(issues, fund_id, month):
+    """The issues of one fund-month out of a batch result"""
+    return issues[(issues['fund_id'] == fund_id) & (issues['month'] == month)].reset_index(drop=True)
+
+def save_validation_report(issues, dirs, validated):
+    """
+    Replace the report rows of the validated fund-months with their new issues
+    Args:
+        issues: result of validate_holdings
+        validated: (fund_id, month) pairs that were checked; their old rows are
+            dropped even when they no longer have issues
+    Returns:
+        path of the report
+    """
+    path = validation_report_path(dirs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    issues = issues.assign(checked_at=dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    if os.path.exists(path):
+        report = pd.read_csv(path, dtype={'month': str})
+        checked = pd.MultiIndex.from_tuples(list(validated), names=['fund_id', 'month']) if validated else None
+        if checked is not None:
+            report = report[~pd.MultiIndex.from_frame(report[['fund_id', 'month']]).isin(checked)]
+        issues = pd.concat([report, issues], ignore_index=True)
+    issues = issues[VALIDATION_COLUMNS].sort_values(['fund_id', 'month', 'severity', 'check'])
+    tmp_path = path + '.tmp'
+    issues.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
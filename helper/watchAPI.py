@@ -0,0 +1,151 @@
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import time
+
+HOLDINGS_FILE = re.compile(r'^holdings_\d{4}-\d{2}\.csv$')
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT = struct.Struct('iIII')
+
+def holdings_files(root):
+    """(mtime_ns, size) of every holdings_YYYY-MM.csv under root/<fund_id>/"""
+    snapshot = {}
+    if not os.path.isdir(root):
+        return snapshot
+    for fund in os.scandir(root):
+        if not fund.is_dir():
+            continue
+        for entry in os.scandir(fund.path):
+            if HOLDINGS_FILE.match(entry.name):
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+class PollingWatcher:
+    """Detect new or rewritten holdings files by rescanning the tree every interval seconds"""
+
+    def __init__(self, root, interval=5.0):
+        self.root = root
+        self.interval = interval
+        self.snapshot = holdings_files(root)
+
+    def changes(self, timeout=None):
+        """Changed holdings file paths, waiting up to timeout seconds (one poll interval when None)"""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = holdings_files(self.root)
+        changed = {path for path, state in current.items() if self.snapshot.get(path) != state}
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """
+    Linux inotify watch on the holdings tree (through libc, no extra dependency)
+    Reports holdings files that were closed after writing or renamed into
+    place (store_fund_holdings writes a tmp file and renames it). Fund
+    directories created later are watched as they appear.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self.watches = {}
+        os.makedirs(root, exist_ok=True)
+        self._add_watch(root)
+        for fund in os.scandir(root):
+            if fund.is_dir():
+                self._add_watch(fund.path)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch({path}) failed: {os.strerror(errno)}")
+        self.watches[wd] = path
+
+    def changes(self, timeout=None):
+        """Changed holdings file paths, blocking until an event arrives or timeout seconds pass"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # events were dropped: fall back to every file currently in the tree
+                changed |= set(holdings_files(self.root))
+                continue
+            path = os.path.join(self.watches.get(wd, self.root), name)
+            if mask & IN_ISDIR:
+                if self.watches.get(wd) == self.root and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_watch(path)
+                    # files may have landed before the watch was added
+                    changed |= {os.path.join(path, f) for f in os.listdir(path) if HOLDINGS_FILE.match(f)}
+            elif HOLDINGS_FILE.match(name) and mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+def open_watcher(root, polling=False, interval=5.0):
+    """inotify watcher on Linux, polling watcher when forced or inotify is unavailable"""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({str(e)}), polling every {interval:g}s")
+    return PollingWatcher(root, interval=interval)
+
+def debounced_changes(watcher, debounce=2.0, max_delay=10.0):
+    """
+    Yield batches of changed holdings files
+    A batch is released once no new change arrived for debounce seconds, or
+    max_delay seconds after its first change so a steady stream of writes
+    (a long collect or backfill) still publishes regularly.
+    """
+    pending = set()
+    first = last = None
+    while True:
+        if pending:
+            now = time.monotonic()
+            deadline = min(last + debounce, first + max_delay)
+            if now >= deadline:
+                yield pending
+                pending = set()
+                continue
+            changed = watcher.changes(timeout=deadline - now)
+        else:
+            changed = watcher.changes()
+        if changed:
+            now = time.monotonic()
+            if not pending:
+                first = now
+            last = now
+            pending |= changed
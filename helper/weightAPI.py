@@ -0,0 +1,136 @@
+import datetime as dt
+import json
+import os
+import numpy as np
+import pandas as pd
+
+AUM_CACHE_FILE = os.path.join("fund_data", "metadata", "fund_aum.json")
+
+# fields that carry a fund's net assets in Morningstar quote/snapshot payloads
+AUM_FIELDS = ('fundSize', 'tNAInShareClassCurrency', 'totalNetAssets', 'FundTNAV', 'fundNetAssets', 'TotalNetAssets')
+
+def load_fund_weights(path):
+    """
+    Load per-fund weights (AUM in ₹ crore, or any relative weight) from a local file
+    Supported formats:
+        JSON: {"INF...": 52000, ...} or {"INF...": {"aum_cr": 52000}, ...}
+        CSV: a fund_id column plus one of aum_cr / aum / weight
+    Returns:
+        dict fund_id -> float
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r') as f:
+            raw = json.load(f)
+        weights = {}
+        for fund_id, value in raw.items():
+            if isinstance(value, dict):
+                value = value.get('aum_cr', value.get('aum', value.get('weight')))
+            weights[fund_id] = float(value)
+        return weights
+
+    df = pd.read_csv(path)
+    column = next((c for c in ('aum_cr', 'aum', 'weight') if c in df.columns), None)
+    if 'fund_id' not in df.columns or column is None:
+        raise ValueError(f"{path} needs a fund_id column and one of aum_cr, aum, weight")
+    values = pd.to_numeric(df[column], errors='coerce')
+    return dict(zip(df['fund_id'].astype(str), values.fillna(0.0).astype(float)))
+
+def _find_number(data, fields):
+    """Depth-first search of a JSON payload for the first numeric value under one of fields"""
+    if isinstance(data, dict):
+        for field in fields:
+            value = data.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+                return float(value)
+        children = data.values()
+    elif isinstance(data, list):
+        children = data
+    else:
+        return None
+    for child in children:
+        value = _find_number(child, fields)
+        if value is not None:
+            return value
+    return None
+
+def fetch_fund_aum(fund_ids, cache_file=AUM_CACHE_FILE, max_age_days=30):
+    """
+    Fund AUM in ₹ crore from Morningstar, cached on disk
+    Cached values younger than max_age_days are reused, so repeated runs do not
+    hit the API; the cache file can also be edited by hand.
+    Returns:
+        dict fund_id -> AUM in ₹ crore for the funds that could be resolved
+    """
+    import mstarpy as ms
+
+    cache = {}
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+        except Exception:
+            cache = {}
+
+    now = dt.datetime.now()
+    changed = False
+    for fund_id in fund_ids:
+        entry = cache.get(fund_id)
+        if entry:
+            fetched = dt.datetime.fromisoformat(entry.get('fetched', '1970-01-01T00:00:00'))
+            if (now - fetched).days < max_age_days:
+                continue
+        try:
+            fund = ms.Funds(fund_id)
+            aum = _find_number(fund.quote(), AUM_FIELDS)
+            if aum is None:
+                aum = _find_number(fund.snapshot(currency="INR"), AUM_FIELDS)
+            if aum is None:
+                raise ValueError("no net assets field in the Morningstar response")
+            cache[fund_id] = {'aum_cr': round(aum / 1e7, 2), 'fetched': now.isoformat(timespec='seconds')}
+            changed = True
+        except Exception as e:
+            print(f"⚠️  Could not fetch AUM for {fund_id}: {str(e)}")
+
+    if changed:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_path = cache_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, cache_file)
+
+    return {fund_id: float(cache[fund_id]['aum_cr']) for fund_id in fund_ids if fund_id in cache}
+
+def resolve_fund_weights(source, fund_ids):
+    """
+    Per-fund weights for the weighted aggregation modes
+    Args:
+        source: 'aum' to use cached Morningstar AUM, otherwise a weights file path
+        fund_ids: Funds that will be aggregated
+    Returns:
+        dict fund_id -> weight; funds without a weight are reported and get weight 0
+    """
+    weights = fetch_fund_aum(fund_ids) if source == 'aum' else load_fund_weights(source)
+    missing = [f for f in fund_ids if weights.get(f, 0.0) <= 0]
+    if missing:
+        print(f"⚠️  No weight for {len(missing)} funds (excluded from weighted averages): {', '.join(missing)}")
+    return {f: weights.get(f, 0.0) for f in fund_ids}
+
+def weighted_totals(fund_codes, security_codes, values, fund_weights, num_securities):
+    """
+    Weighted per-security totals as one matrix-vector product
+    The fund x security matrix W (W[f, s] = value of security s in fund f) is
+    multiplied by the fund weight vector a, giving W.T @ a; the holder matrix
+    (1 where a fund holds the security) gives the total weight of the holders.
+    Args:
+        fund_codes: row index of each record into fund_weights
+        security_codes: column index of each record (0..num_securities-1)
+        values: value of each record (e.g. weight_pct)
+        fund_weights: numpy vector of fund weights
+    Returns:
+        tuple (W.T @ a, holders.T @ a) as numpy vectors of length num_securities
+    """
+    matrix = np.zeros((len(fund_weights), num_securities))
+    np.add.at(matrix, (fund_codes, security_codes), values)
+    holders = np.zeros((len(fund_weights), num_securities))
+    holders[fund_codes, security_codes] = 1.0
+    return matrix.T @ fund_weights, holders.T @ fund_weights
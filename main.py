@@ -1,6 +1,14 @@
 from mf.mfAnalyse import *
 from mf.mfCollect import *
 from mf.mfAverage import *
+from mf.mfBackfill import *
+from mf.mfStatus import *
+from mf.mfIndex import *
+from mf.mfDistribution import *
+from mf.mfExposure import *
+from mf.mfWatch import *
+from mf.mfValidate import *
+from helper.migrateAPI import *
 import datetime as _dt
 import os
 
@@ -53,29 +61,196 @@ if __name__ == "__main__":
         cmd = args[0]
         # remaining args for command handlers
         cmd_args = args[1:]
+        # row filters (--sector, --isin, --watchlist, --min-weight, --top) shared by the analysis commands
+        filters = None
+        if cmd in ("analyze", "average", "average_non_zero", "avg_compare", "distribution", "watch"):
+            try:
+                filters, cmd_args = parse_filter_args(cmd_args)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        # streaming mode (--stream, --chunk-size N) folds funds in chunks to bound memory
+        chunk_size = None
+        if cmd in ("average", "average_non_zero", "avg_compare"):
+            if '--chunk-size' in cmd_args:
+                pos = cmd_args.index('--chunk-size')
+                try:
+                    chunk_size = int(cmd_args[pos + 1]) if pos + 1 < len(cmd_args) else 0
+                except ValueError:
+                    chunk_size = 0
+                if chunk_size <= 0:
+                    print(f"Usage: python main.py [group] {cmd} --stream [--chunk-size N] (N is a number of funds, at least 1)")
+                    sys.exit(1)
+                cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
+            if '--stream' in cmd_args:
+                chunk_size = chunk_size or 100
+                cmd_args = [a for a in cmd_args if a != '--stream']
+        # fund weights (--weights FILE|aum) switch on the AUM-weighted averages and rupee exposure
+        fund_weights = None
+        if cmd in ("average", "average_non_zero", "avg_compare") and '--weights' in cmd_args:
+            pos = cmd_args.index('--weights')
+            if pos + 1 >= len(cmd_args):
+                print("Error: --weights needs a weights file or 'aum'")
+                sys.exit(1)
+            fund_weights = resolve_fund_weights(cmd_args[pos + 1], fund_ids)
+            cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
+        # --accept FUND[:YYYY-MM] (repeatable, comma-separated) accepts weight_sum/row_drop failures
+        accept = []
+        while cmd in ("collect", "validate") and '--accept' in cmd_args:
+            pos = cmd_args.index('--accept')
+            if pos + 1 >= len(cmd_args):
+                print("Error: --accept needs a fund id or FUND:YYYY-MM")
+                sys.exit(1)
+            accept += [a for a in cmd_args[pos + 1].split(',') if a]
+            cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
         if cmd == "collect":
-            collect_fund_data(fund_ids, group=selected_group)
+            if '--all-groups' in cmd_args:
+                # every distinct fund across fund_groups.json, fetched once
+                fund_ids = [f for funds in group_map.values() for f in funds]
+            # --force re-fetches funds already collected this month
+            collect_fund_data(fund_ids, group=selected_group, force='--force' in cmd_args, accept=accept)
+        elif cmd == "backfill":
+            # import a directory of historical AMC disclosures (CSV/XLSX) month by month
+            workers = None
+            if '--workers' in cmd_args:
+                pos = cmd_args.index('--workers')
+                try:
+                    workers = int(cmd_args[pos + 1]) if pos + 1 < len(cmd_args) else 0
+                except ValueError:
+                    workers = 0
+                if workers <= 0:
+                    print("Usage: python main.py [group] backfill <directory> [--workers N] (N processes, at least 1)")
+                    sys.exit(1)
+                cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
+            if not cmd_args:
+                print("Usage: python main.py [group] backfill <directory> [--workers N]")
+                sys.exit(1)
+            backfill_holdings(cmd_args[0], fund_ids=fund_ids if selected_group else None,
+                              group=selected_group, workers=workers)
+        elif cmd == "status":
+            # stored months and gaps per group, read from the holdings catalog
+            status_groups = group_map if group_map else {'default': default_fund_ids}
+            show_status(status_groups, fund_name_map=fund_name_map,
+                        groups=[selected_group] if selected_group else None,
+                        rebuild='--rebuild' in cmd_args)
+        elif cmd == "who_holds":
+            # which funds held a security (ISIN or name) over the last N months, from the postings index
+            months = 6
+            if '--months' in cmd_args:
+                pos = cmd_args.index('--months')
+                try:
+                    months = int(cmd_args[pos + 1]) if pos + 1 < len(cmd_args) else 0
+                except ValueError:
+                    months = 0
+                if months <= 0:
+                    print("Usage: python main.py [group] who_holds <isin|name> [--months N] (N at least 1)")
+                    sys.exit(1)
+                cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
+            if not cmd_args:
+                print("Usage: python main.py [group] who_holds <isin|name> [--months N]")
+                sys.exit(1)
+            who_holds(' '.join(cmd_args), fund_ids=fund_ids if selected_group else None, months=months,
+                      fund_name_map=fund_name_map)
+        elif cmd == "validate":
+            # vectorized checks over every stored fund-month; --quarantine moves failing months out of the store
+            validate_store(fund_ids=fund_ids if selected_group else None, quarantine='--quarantine' in cmd_args,
+                           fund_name_map=fund_name_map, accept=accept)
+        elif cmd == "migrate_store":
+            # move fund_data/<group>/holdings into the shared fund-level store
+            migrate_to_shared_store(dry_run='--dry-run' in cmd_args)
+        elif cmd == "build_deltas":
+            # compute month-over-month deltas for already stored holdings
+            build_fund_deltas(fund_ids, create_directory_structure(group=selected_group))
         elif cmd == "analyze":
+            if '--windows' in cmd_args:
+                # score several windows (e.g. --windows 2,3,6,12) from one load of the longest window
+                windows_arg = cmd_args[cmd_args.index('--windows') + 1] if cmd_args.index('--windows') + 1 < len(cmd_args) else ''
+                try:
+                    windows = [int(w) for w in windows_arg.split(',') if w.strip()]
+                except ValueError:
+                    windows = []
+                if not windows or min(windows) < 2:
+                    print("Usage: python main.py analyze --windows 2,3,6,12 (each window needs at least 2 months)")
+                    sys.exit(1)
+                analyze_multi_window(fund_ids, windows, group=selected_group, fund_name_map=fund_name_map, filters=filters)
+                sys.exit(0)
+            # --workers N analyzes funds on a process pool (same output as a sequential run)
+            workers = None
+            if '--workers' in cmd_args:
+                pos = cmd_args.index('--workers')
+                try:
+                    workers = int(cmd_args[pos + 1]) if pos + 1 < len(cmd_args) else 0
+                except ValueError:
+                    workers = 0
+                if workers <= 0:
+                    print("Usage: python main.py [group] analyze [months] [--workers N] (N processes, at least 1)")
+                    sys.exit(1)
+                cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
             considered_months = int(cmd_args[0]) if len(cmd_args) > 0 else 2
-            analyze_all_funds(fund_ids, considered_months, group=selected_group, fund_name_map=fund_name_map)
+            analyze_all_funds(fund_ids, considered_months, group=selected_group, fund_name_map=fund_name_map, filters=filters,
+                              workers=workers)
         elif cmd == "average":
             # average across all funds including zeros
-            calculate_fund_averages(fund_ids, average_by_holders=False, group=selected_group)
+            calculate_fund_averages(fund_ids, average_by_holders=False, group=selected_group, filters=filters, chunk_size=chunk_size,
+                                    fund_weights=fund_weights)
             # run comparison using same averaging mode (defaults to prev->curr months)
             try:
-                df = compare_months(None, None, fund_ids, average_by_holders=False, group=selected_group)
+                df = compare_months(None, None, fund_ids, average_by_holders=False, group=selected_group, filters=filters,
+                                    chunk_size=chunk_size, fund_weights=fund_weights)
                 print(df.head(10).to_string(index=False))
             except Exception as e:
                 print(f"Comparison failed: {e}")
         elif cmd == "average_non_zero":
             # average only across funds that hold the stock
-            calculate_fund_averages(fund_ids, average_by_holders=True, group=selected_group)
+            calculate_fund_averages(fund_ids, average_by_holders=True, group=selected_group, filters=filters, chunk_size=chunk_size,
+                                    fund_weights=fund_weights)
             # run comparison using same averaging mode
             try:
-                df = compare_months(None, None, fund_ids, average_by_holders=True, group=selected_group)
+                df = compare_months(None, None, fund_ids, average_by_holders=True, group=selected_group, filters=filters,
+                                    chunk_size=chunk_size, fund_weights=fund_weights)
                 print(df.head(10).to_string(index=False))
             except Exception as e:
                 print(f"Comparison failed: {e}")
+        elif cmd == "distribution":
+            # cross-fund median/p25/p75/dispersion of each security's weight (holders-only and zero-inclusive)
+            weight_distribution(fund_ids, group=selected_group, filters=filters, fund_name_map=fund_name_map)
+        elif cmd == "exposure":
+            # look-through stock/sector exposure of a personal portfolio file (fund amounts or units)
+            if not cmd_args:
+                print("Usage: python main.py [group] exposure <portfolio.csv|json> [YYYY-MM]")
+                sys.exit(1)
+            calculate_exposure(cmd_args[0], group=selected_group, month=cmd_args[1] if len(cmd_args) > 1 else None,
+                               fund_name_map=fund_name_map)
+        elif cmd == "watch":
+            # re-analyze changed funds and republish group trends/averages as holdings files land
+            debounce, interval = 2.0, 5.0
+            if '--debounce' in cmd_args:
+                pos = cmd_args.index('--debounce')
+                try:
+                    debounce = float(cmd_args[pos + 1]) if pos + 1 < len(cmd_args) else 0.0
+                except ValueError:
+                    debounce = 0.0
+                if not 0 < debounce < float('inf'):
+                    print("Usage: python main.py [group] watch [months] [--debounce SECONDS] [--interval SECONDS] [--poll] "
+                          "(seconds greater than 0)")
+                    sys.exit(1)
+                cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
+            if '--interval' in cmd_args:
+                pos = cmd_args.index('--interval')
+                try:
+                    interval = float(cmd_args[pos + 1]) if pos + 1 < len(cmd_args) else 0.0
+                except ValueError:
+                    interval = 0.0
+                if not 0 < interval < float('inf'):
+                    print("Usage: python main.py [group] watch [months] [--debounce SECONDS] [--interval SECONDS] [--poll] "
+                          "(seconds greater than 0)")
+                    sys.exit(1)
+                cmd_args = cmd_args[:pos] + cmd_args[pos + 2:]
+            polling = '--poll' in cmd_args
+            cmd_args = [a for a in cmd_args if a != '--poll']
+            considered_months = int(cmd_args[0]) if len(cmd_args) > 0 else 2
+            watch_holdings({selected_group: fund_ids}, considered_months, fund_name_map=fund_name_map, filters=filters,
+                           debounce=debounce, polling=polling, interval=interval)
         elif cmd == "avg_compare":
             # support optional mode flag: --by-holders to average only non-zero holders
             prev_arg = None
@@ -91,7 +266,8 @@ if __name__ == "__main__":
             if len(cargs) >= 2:
                 curr_arg = cargs[1]
             try:
-                df = compare_months(prev_arg, curr_arg, fund_ids, average_by_holders=average_by_holders, group=selected_group)
+                df = compare_months(prev_arg, curr_arg, fund_ids, average_by_holders=average_by_holders, group=selected_group, filters=filters,
+                                    chunk_size=chunk_size, fund_weights=fund_weights)
                 print(df.head(10).to_string(index=False))
             except Exception as e:
                 print(f"Error: {e}\nUsage examples:\n  python3 main.py avg_compare\n  python3 main.py avg_compare 9 10\n  python3 main.py avg_compare 2025-09 2025-10\n  python3 main.py avg_compare --by-holders\n  python3 main.py avg_compare 9 10 --by-holders")
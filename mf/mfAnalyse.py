@@ -1,4 +1,6 @@
 import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import os
 from helper.dataAPI import *
@@ -14,6 +16,8 @@ def max_abs_change(row, fund_trend_matrix):
     else:
         return row['share_change']
     
+SELL_COLUMNS = ['date', 'fund_id', 'stock', 'action', 'shares_change']
+
 def record_immediate_sells(fund_id, stock_name, shares_change, action_type, analysis_dir=None):
     """Record immediate sells/exits to a separate file.
 
@@ -21,10 +25,6 @@ def record_immediate_sells(fund_id, stock_name, shares_change, action_type, anal
     to the legacy "fund_data/analysis" path.
     """
     date_str = dt.datetime.now().strftime("%Y-%m-%d")
-    if analysis_dir:
-        immediate_sells_file = os.path.join(analysis_dir, "immediate_sells.csv")
-    else:
-        immediate_sells_file = os.path.join("fund_data", "analysis", "immediate_sells.csv")
 
     # Create DataFrame for new entry
     new_entry = pd.DataFrame({
@@ -35,34 +35,49 @@ def record_immediate_sells(fund_id, stock_name, shares_change, action_type, anal
         'shares_change': [abs(shares_change)]
     })
 
+    append_immediate_sells(new_entry, analysis_dir)
+
+def append_immediate_sells(new_entries, analysis_dir=None):
+    """Append a batch of sell/exit entries to the immediate sells file in one write"""
+    if new_entries.empty:
+        return
+    if analysis_dir:
+        immediate_sells_file = os.path.join(analysis_dir, "immediate_sells.csv")
+    else:
+        immediate_sells_file = os.path.join("fund_data", "analysis", "immediate_sells.csv")
+
     # Append or create file
     if os.path.exists(immediate_sells_file):
         try:
             existing_data = pd.read_csv(immediate_sells_file)
-            updated_data = pd.concat([existing_data, new_entry], ignore_index=True)
+            updated_data = pd.concat([existing_data, new_entries], ignore_index=True)
         except Exception:
             # If file is corrupted or unreadable, overwrite
-            updated_data = new_entry
+            updated_data = new_entries
     else:
-        updated_data = new_entry
+        updated_data = new_entries
 
     updated_data.to_csv(immediate_sells_file, index=False)
   
-def analyze_monthly_trends(holdings_list, analysis_dir=None):
+def analyze_monthly_trends(holdings_list, analysis_dir=None, sells=None):
     """
     Analyze month-to-month trends for each stock using share count
     Args:
         holdings_list: List of monthly holdings DataFrames (newest to oldest)
+        sells: optional list that collects immediate sell entries instead of
+            writing them to the immediate sells file
     Returns:
         DataFrame with trend scores for each stock
     """
     all_stocks = set()
     for holdings in holdings_list:
         all_stocks.update(holdings['security_name'].unique())
+    # sorted so rows (and recorded sells) come out in the same order in every process
+    all_stocks = sorted(all_stocks)
     
     # Initialize trend matrix with explicit dtypes
     trend_matrix = pd.DataFrame(
-        index=list(all_stocks),
+        index=all_stocks,
         columns={
             'trend_score': pd.Series(dtype='float64'),
             'appearances': pd.Series(dtype='int64'),
@@ -83,6 +98,10 @@ def analyze_monthly_trends(holdings_list, analysis_dir=None):
     
     # Track which stocks appear in any month (to count appearances per fund once)
     stocks_in_any_month = set()
+
+    # Months can be empty once load-time filters are applied, so take the fund id from any month
+    fund_id = next((h['fund_id'].iloc[0] for h in holdings_list if not h.empty), None)
+    date_str = dt.datetime.now().strftime("%Y-%m-%d")
     
     # For each consecutive month pair
     for i in range(len(holdings_list) - 1):
@@ -105,15 +124,19 @@ def analyze_monthly_trends(holdings_list, analysis_dir=None):
             if curr_shares < nxt_shares:
                 action_type = 'decrease' if curr_shares > 0 else 'exit'
                 shares_change = nxt_shares - curr_shares
-                # record to the provided analysis_dir when available so group runs don't
-                # write into the global analysis folder
-                record_immediate_sells(
-                    fund_id=holdings_list[i]['fund_id'].iloc[0],
-                    stock_name=stock,
-                    shares_change=shares_change,
-                    action_type=action_type,
-                    analysis_dir=analysis_dir
-                )
+                if sells is not None:
+                    sells.append({'date': date_str, 'fund_id': fund_id, 'stock': stock,
+                                  'action': action_type, 'shares_change': abs(shares_change)})
+                else:
+                    # record to the provided analysis_dir when available so group runs don't
+                    # write into the global analysis folder
+                    record_immediate_sells(
+                        fund_id=fund_id,
+                        stock_name=stock,
+                        shares_change=shares_change,
+                        action_type=action_type,
+                        analysis_dir=analysis_dir
+                    )
             
             # Track if stock is newly entered (held in current month but not in next/older month)
             # newly_entered means curr_shares > 0 but nxt_shares == 0 (came in from older to newer)
@@ -151,51 +174,233 @@ def analyze_monthly_trends(holdings_list, analysis_dir=None):
     
     return trend_matrix
 
-def analyze_all_funds(fund_ids, considered_months, group=None, fund_name_map=None):
-    """Analyze holdings changes for all funds using share-based analysis"""
-    dirs = create_directory_structure(group=group)
-    dateTime = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+def delta_share_pairs(delta_list):
+    """
+    Re-key stored deltas by security name so results match analyze_monthly_trends
+    Returns:
+        List of (newer_shares, older_shares) Series pairs sharing one index
+    """
+    share_pairs = []
+    for delta in delta_list:
+        held_prev = delta[delta['action'] != 'entered']
+        held_curr = delta[delta['action'] != 'exited']
+        nxt = held_prev.groupby('prev_security_name')['prev_shares'].sum()
+        curr = held_curr.groupby('security_name')['curr_shares'].sum()
+        names = curr.index.union(nxt.index)
+        share_pairs.append((curr.reindex(names, fill_value=0.0).astype(float),
+                            nxt.reindex(names, fill_value=0.0).astype(float)))
+    return share_pairs
+
+def month_pair_sells(curr, nxt, fund_id, date_str):
+    """Immediate sell records of one month pair (stocks whose shares fell), or None"""
+    sold = curr < nxt
+    if not sold.any():
+        return None
+    return pd.DataFrame({
+        'date': date_str,
+        'fund_id': fund_id,
+        'stock': curr.index[sold],
+        'action': ['decrease' if c > 0 else 'exit' for c in curr[sold]],
+        'shares_change': (nxt[sold] - curr[sold]).abs().values
+    })
+
+def analyze_delta_trends(delta_list, fund_id, analysis_dir=None, sells=None):
+    """
+    Analyze month-to-month trends for each stock from stored deltas
+    Args:
+        delta_list: List of monthly delta DataFrames (newest to oldest), as
+            produced by compute_holdings_delta
+        fund_id: Fund identifier used when recording sells
+        sells: optional list that collects immediate sell entries instead of
+            writing them to the immediate sells file
+    Returns:
+        DataFrame with the same trend columns as analyze_monthly_trends
+    """
+    share_pairs = delta_share_pairs(delta_list)
+
+    all_stocks = set()
+    for curr, _ in share_pairs:
+        all_stocks.update(curr.index)
+
+    trend_matrix = pd.DataFrame(index=sorted(all_stocks))
+    trend_matrix['trend_score'] = 0.0
+    trend_matrix['appearances'] = 0
+    trend_matrix['current_shares'] = 0.0
+    trend_matrix['share_change'] = 0.0
+    trend_matrix['newly_entered'] = False
+    trend_matrix['exited'] = False
+
+    stocks_in_any_month = set()
+    date_str = dt.datetime.now().strftime("%Y-%m-%d")
+    sell_frames = []
+
+    for i, (curr, nxt) in enumerate(share_pairs):
+        # curr is the newer month, nxt the older one, as in analyze_monthly_trends
+        changed = curr.index[curr != nxt]
+        if len(changed) > 0:
+            trend_matrix.loc[changed, 'has_changes'] = True
+
+        pair_sells = month_pair_sells(curr, nxt, fund_id, date_str)
+        if pair_sells is not None:
+            sell_frames.append(pair_sells)
+
+        trend_matrix.loc[curr.index[(curr > 0) & (nxt == 0)], 'newly_entered'] = True
+        trend_matrix.loc[curr.index[(curr == 0) & (nxt > 0)], 'exited'] = True
+        stocks_in_any_month.update(curr.index[(curr > 0) | (nxt > 0)])
+
+        direction = (curr > nxt).astype(float) - (curr < nxt).astype(float)
+        trend_matrix.loc[curr.index, 'trend_score'] += direction
+
+        if i == 0:
+            trend_matrix.loc[curr.index, 'current_shares'] = curr
+            held = nxt > 0
+            trend_matrix.loc[curr.index[held], 'share_change'] = (curr[held] - nxt[held]) / nxt[held] * 100
+
+    trend_matrix.loc[list(stocks_in_any_month), 'appearances'] = 1
+
+    if sell_frames:
+        new_sells = pd.concat(sell_frames, ignore_index=True)
+        if sells is not None:
+            sells.extend(new_sells.to_dict('records'))
+        else:
+            append_immediate_sells(new_sells, analysis_dir)
+
+    return trend_matrix
+
+def analyze_fund(fund_id, considered_months, dirs, filters=None):
+    """
+    Per-fund stage of compute_fund_trends: load the fund's recent months and analyze them
+    Returns:
+        dict with 'fund_id', 'trends' (trend DataFrame, or None when the fund
+        was skipped or failed), 'sells' (immediate sell records), 'months'
+        (analyzed months, newest first) and 'messages' (progress lines for the caller to log)
+    """
+    result = {'fund_id': fund_id, 'trends': None, 'sells': [], 'months': [], 'messages': []}
+    try:
+        # newest first, planned from the holdings catalog
+        files = [f"holdings_{month}.csv" for month in reversed(fund_months(fund_id, dirs))]
+
+        if len(files) < 2:
+            result['messages'].append(f"⚠️  Skipping fund {fund_id}: Need at least 2 months of data (found {len(files)})")
+            return result
+
+        # Get the required number of files
+        available_months = min(considered_months, len(files))
+        relevant_files = files[:available_months]  # Already in reverse order
+
+        result['messages'].append(f"📊 Analyzing {len(relevant_files)} months of data for fund {fund_id}")
+
+        # stored deltas where available, the others diffed in memory the same way
+        relevant_months = [holdings_month(f) for f in relevant_files]
+        deltas = load_fund_deltas(fund_id, relevant_months, dirs)
+        deltas = [apply_holdings_filters(d, filters) for d in deltas]
+        deltas = apply_min_weight(deltas, filters, key_col='key',
+                                  weight_cols=('prev_weight_pct', 'curr_weight_pct'))
+        result['trends'] = analyze_delta_trends(deltas, fund_id, sells=result['sells'])
+        result['months'] = relevant_months
+    except Exception as e:
+        result['trends'] = None
+        result['messages'].append(f"❌ Error analyzing fund {fund_id}: {str(e)}")
+    return result
+
+def _analyze_fund_job(job):
+    """Process pool entry point for analyze_fund"""
+    return analyze_fund(*job)
+
+def map_fund_analyses(fund_ids, considered_months, dirs, filters=None, workers=None, cache=None):
+    """
+    Yield analyze_fund results in fund_ids order
+    With workers > 1 the funds are analyzed on a process pool; results are
+    still yielded in input order so the reduce step is deterministic.
+    cache: optional dict fund_id -> analyze_fund result. Cached funds are
+    reused (without repeating their messages) and new results are added, so
+    a caller can invalidate single funds and re-run the reduce.
+    """
+    if cache is not None:
+        missing = [fund_id for fund_id in fund_ids if fund_id not in cache]
+        fresh = {r['fund_id']: r for r in map_fund_analyses(missing, considered_months, dirs, filters=filters,
+                                                            workers=workers)}
+        cache.update(fresh)
+        for fund_id in fund_ids:
+            yield fresh.get(fund_id) or {**cache[fund_id], 'messages': []}
+        return
+    jobs = [(fund_id, considered_months, dirs, filters) for fund_id in fund_ids]
+    if not workers or workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _analyze_fund_job(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_analyze_fund_job, jobs)
+
+def compute_fund_trends(fund_ids, considered_months, dirs, fund_name_map=None, filters=None, log=print, workers=None,
+                        cache=None):
+    """
+    Analyze holdings changes for all funds without writing any files
+    Args:
+        fund_ids: list of fund ids
+        considered_months: number of most recent monthly files per fund
+        dirs: Directory structure dictionary (only 'holdings'/'deltas' are read)
+        fund_name_map: optional fund_id -> display name used in the funds columns
+        filters: optional sector/ISIN/min-weight/top filters
+        log: callable for progress messages; pass None to stay silent
+        workers: number of processes for the per-fund analysis (default: in-process)
+        cache: optional dict of per-fund results reused across calls (see map_fund_analyses)
+    Returns:
+        dict with 'fund_trends' (fund_id -> trend DataFrame), 'consolidated'
+        (DataFrame or None), 'immediate_sells' (DataFrame) and 'period'
+        ((oldest, newest) month of the last analyzed fund, or None)
+    """
+    log = log or (lambda *args, **kwargs: None)
+
     # Initialize fund_name_map if not provided
     if fund_name_map is None:
         fund_name_map = {fund_id: fund_id for fund_id in fund_ids}
 
+    # map: per-fund analysis (optionally on a process pool); reduce: consolidate
+    # in fund_ids order so the output does not depend on the number of workers
+    fund_results = map_fund_analyses(fund_ids, considered_months, dirs, filters=filters, workers=workers, cache=cache)
+    fund_trends, consolidated_trends, sells, period = consolidate_fund_trends(fund_results, fund_name_map, log=log)
+
+    if consolidated_trends is not None:
+        consolidated_trends = select_top(consolidated_trends, filters, 'trend_score')
+
+    return {
+        'fund_trends': fund_trends,
+        'consolidated': consolidated_trends,
+        'immediate_sells': pd.DataFrame(sells, columns=SELL_COLUMNS),
+        'period': period
+    }
+
+def consolidate_fund_trends(fund_results, fund_name_map, log=print):
+    """
+    Reduce step of compute_fund_trends: fold per-fund results into the consolidated trends
+    Args:
+        fund_results: analyze_fund results, folded in the given order
+        fund_name_map: fund_id -> display name used in the funds columns
+    Returns:
+        tuple (fund_id -> trend DataFrame, consolidated DataFrame or None,
+        immediate sell records, (oldest, newest) month of the last fund or None)
+    """
+    log = log or (lambda *args, **kwargs: None)
+
     # Store individual fund trends and consolidated trends
     fund_trends = {}
     consolidated_trends = None
-
-    for fund_id in fund_ids:
+    sells = []
+    period = None
+
+    for fund_result in fund_results:
+        fund_id = fund_result['fund_id']
+        for message in fund_result['messages']:
+            log(message)
+        fund_trend_matrix = fund_result['trends']
+        if fund_trend_matrix is None:
+            continue
         try:
-            # Get all available holdings files
-            fund_dir = os.path.join(dirs["holdings"], fund_id)
-            files = sorted([f for f in os.listdir(fund_dir) if f.endswith('.csv')],
-                           reverse=True)
-
-            if len(files) < 2:
-                print(f"⚠️  Skipping fund {fund_id}: Need at least 2 months of data (found {len(files)})")
-                continue
-
-            # Get the required number of files
-            available_months = min(considered_months, len(files))
-            relevant_files = files[:available_months]  # Already in reverse order
-
-            print(f"📊 Analyzing {len(relevant_files)} months of data for fund {fund_id}")
-
-            # Read all relevant holdings
-            holdings_list = []
-            for file in relevant_files:
-                file_path = os.path.join(fund_dir, file)
-                df = pd.read_csv(file_path)
-                # Ensure proper data types for share analysis
-                df['number_of_shares'] = df['number_of_shares'].astype(float)
-                df['share_change'] = df['share_change'].astype(float)
-                df['date'] = file.split('_')[1].split('.')[0]
-                holdings_list.append(df)
-
-            # Calculate trend matrix for this fund (pass analysis dir so temporary logs
-            # like immediate_sells go into the group's analysis folder)
-            fund_trend_matrix = analyze_monthly_trends(holdings_list, analysis_dir=dirs.get('analysis'))
+            sells.extend(fund_result['sells'])
+            relevant_months = fund_result['months']
             fund_trends[fund_id] = fund_trend_matrix
+            period = (relevant_months[-1], relevant_months[0])
 
             # Update consolidated trends
             if consolidated_trends is None:
@@ -265,7 +470,7 @@ def analyze_all_funds(fund_ids, considered_months, group=None, fund_name_map=Non
                     # Create new rows for stocks that exist in this fund but not in consolidated_trends
                     new_rows = pd.DataFrame(
                         0,
-                        index=list(new_stocks),
+                        index=sorted(new_stocks),
                         columns=[c for c in consolidated_trends.columns if c not in ('funds', 'funds_entered', 'funds_exited')]
                     )
                     # add empty funds sets for these new stocks
@@ -289,7 +494,7 @@ def analyze_all_funds(fund_ids, considered_months, group=None, fund_name_map=Non
                     # Add missing stocks into the current fund matrix with zeros and empty funds set
                     missing_rows = pd.DataFrame(
                         0,
-                        index=list(missing_in_fund),
+                        index=sorted(missing_in_fund),
                         columns=[c for c in consolidated_trends.columns if c not in ('funds', 'funds_entered', 'funds_exited')]
                     )
                     missing_rows['funds'] = [set() for _ in range(len(missing_rows))]
@@ -392,7 +597,29 @@ def analyze_all_funds(fund_ids, considered_months, group=None, fund_name_map=Non
                     consolidated_trends['trend_score'] = consolidated_trends['funds_entered_count']
 
         except Exception as e:
-            print(f"❌ Error analyzing fund {fund_id}: {str(e)}")
+            log(f"❌ Error analyzing fund {fund_id}: {str(e)}")
+
+    return fund_trends, consolidated_trends, sells, period
+
+def analyze_all_funds(fund_ids, considered_months, group=None, fund_name_map=None, filters=None, workers=None):
+    """Analyze holdings changes for all funds using share-based analysis
+
+    filters: optional sector/ISIN/min-weight filters applied while loading each
+    fund's months; --top limits the consolidated output to the N highest trend scores.
+    workers: analyze funds on a process pool of this size; output is identical
+    to a sequential run.
+    Writes per-fund and consolidated CSVs, the markdown summary and immediate
+    sells under the group's analysis folder; see compute_fund_trends for the
+    side-effect-free variant.
+    """
+    dirs = create_directory_structure(group=group)
+    dateTime = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    result = compute_fund_trends(fund_ids, considered_months, dirs, fund_name_map=fund_name_map, filters=filters,
+                                 workers=workers)
+    fund_trends = result['fund_trends']
+    consolidated_trends = result['consolidated']
+    append_immediate_sells(result['immediate_sells'], dirs.get('analysis'))
 
     # Save results only if we have data
     if fund_trends:
@@ -408,95 +635,279 @@ def analyze_all_funds(fund_ids, considered_months, group=None, fund_name_map=Non
             # Save consolidated CSV (convert funds sets to CSV-friendly strings)
             output_file = os.path.join(dirs["analysis"],
                                        f"consolidated_trends_{dateTime}.csv")
-            ct_for_save = consolidated_trends.copy()
-            def funds_to_str(x):
-                if isinstance(x, set):
-                    return ",".join(sorted(x)) if x else ""
-                # if it's list-like or already string
-                try:
-                    return ",".join(sorted(x))
-                except Exception:
-                    return str(x)
-            if 'funds' in ct_for_save.columns:
-                ct_for_save['funds'] = ct_for_save['funds'].apply(funds_to_str)
-            if 'funds_entered' in ct_for_save.columns:
-                ct_for_save['funds_entered'] = ct_for_save['funds_entered'].apply(funds_to_str)
-            if 'funds_exited' in ct_for_save.columns:
-                ct_for_save['funds_exited'] = ct_for_save['funds_exited'].apply(funds_to_str)
+            ct_for_save = consolidated_for_export(consolidated_trends)
             ct_for_save.to_csv(output_file)
 
             # Create summary markdown report
             summary_file = os.path.join(dirs["analysis"],
                                         f"trend_summary_{dateTime}.md")
-            with open(summary_file, 'w') as f:
-                f.write("# Holdings Trend Analysis (Share-based)\n\n")
-                f.write(f"Period: {relevant_files[-1].split('_')[1].split('.')[0]} ")
-                f.write(f"to {relevant_files[0].split('_')[1].split('.')[0]}\n\n")
-
-                # Strong positive trends (significant share accumulation)
-                strong_positive = consolidated_trends[
-                    consolidated_trends['trend_score'] > 1].sort_values(
-                    ['trend_score', 'current_shares'], ascending=[False, False])
-                if not strong_positive.empty:
-                    f.write("## 📈 Strong Share Accumulation\n")
-                    for stock in strong_positive.index:
-                        score = strong_positive.loc[stock, 'trend_score']
-                        shares = strong_positive.loc[stock, 'current_shares']
-                        change = strong_positive.loc[stock, 'share_change']
-                        appearances = strong_positive.loc[stock, 'appearances']
-                        funds_set = consolidated_trends.loc[stock, 'funds'] if 'funds' in consolidated_trends.columns else None
-                        funds_list_str = ", ".join(sorted(funds_set)) if isinstance(funds_set, set) and funds_set else (str(funds_set) if funds_set else "")
-                        entered_set = consolidated_trends.loc[stock, 'funds_entered'] if 'funds_entered' in consolidated_trends.columns else None
-                        exited_set = consolidated_trends.loc[stock, 'funds_exited'] if 'funds_exited' in consolidated_trends.columns else None
-                        entered_list = ", ".join(sorted(entered_set)) if isinstance(entered_set, set) and entered_set else ""
-                        exited_list = ", ".join(sorted(exited_set)) if isinstance(exited_set, set) and exited_set else ""
-                        f.write(f"- {stock}:\n")
-                        f.write(f"  * Score: {score:.1f}\n")
-                        f.write(f"  * Current Shares: {shares:,.0f}\n")
-                        f.write(f"  * Found in {appearances:.0f} monthly reports\n")
-                        if funds_list_str:
-                            f.write(f"  * Funds: {funds_list_str}\n")
-                        if entered_list:
-                            f.write(f"  * Funds Entered: {entered_list}\n")
-                        if exited_list:
-                            f.write(f"  * Funds Exited: {exited_list}\n")
-                        if abs(change) > 0:
-                            f.write(f"  * Maximum Change: {change:+.1f}%\n")
-                        f.write("\n")
-
-                # Strong negative trends (significant share reduction)
-                strong_negative = consolidated_trends[
-                    consolidated_trends['trend_score'] < -1].sort_values(
-                    ['trend_score', 'current_shares'])
-                if not strong_negative.empty:
-                    f.write("\n## 📉 Strong Share Reduction\n")
-                    for stock in strong_negative.index:
-                        score = strong_negative.loc[stock, 'trend_score']
-                        shares = strong_negative.loc[stock, 'current_shares']
-                        change = strong_negative.loc[stock, 'share_change']
-                        appearances = strong_negative.loc[stock, 'appearances']
-                        funds_set = consolidated_trends.loc[stock, 'funds'] if 'funds' in consolidated_trends.columns else None
-                        funds_list_str = ", ".join(sorted(funds_set)) if isinstance(funds_set, set) and funds_set else (str(funds_set) if funds_set else "")
-                        entered_set = consolidated_trends.loc[stock, 'funds_entered'] if 'funds_entered' in consolidated_trends.columns else None
-                        exited_set = consolidated_trends.loc[stock, 'funds_exited'] if 'funds_exited' in consolidated_trends.columns else None
-                        entered_list = ", ".join(sorted(entered_set)) if isinstance(entered_set, set) and entered_set else ""
-                        exited_list = ", ".join(sorted(exited_set)) if isinstance(exited_set, set) and exited_set else ""
-                        f.write(f"- {stock}:\n")
-                        f.write(f"  * Score: {score:.1f}\n")
-                        f.write(f"  * Current Shares: {shares:,.0f}\n")
-                        f.write(f"  * Found in {appearances:.0f} monthly reports\n")
-                        if funds_list_str:
-                            f.write(f"  * Funds: {funds_list_str}\n")
-                        if entered_list:
-                            f.write(f"  * Funds Entered: {entered_list}\n")
-                        if exited_list:
-                            f.write(f"  * Funds Exited: {exited_list}\n")
-                        if abs(change) > 0:
-                            f.write(f"  * Maximum Change: {change:+.1f}%\n")
-                        f.write("\n")
+            write_trend_summary(consolidated_trends, result['period'], summary_file)
 
             print(f"✅ Saved consolidated analysis and summary")
     else:
         print("❌ No fund had sufficient data for analysis")
 
-    return fund_trends, consolidated_trends
\ No newline at end of file
+    return fund_trends, consolidated_trends
+
+def consolidated_for_export(consolidated_trends):
+    """Copy of the consolidated trends with the funds sets converted to comma separated strings"""
+    ct_for_save = consolidated_trends.copy()
+    def funds_to_str(x):
+        if isinstance(x, set):
+            return ",".join(sorted(x)) if x else ""
+        # if it's list-like or already string
+        try:
+            return ",".join(sorted(x))
+        except Exception:
+            return str(x)
+    for col in ('funds', 'funds_entered', 'funds_exited'):
+        if col in ct_for_save.columns:
+            ct_for_save[col] = ct_for_save[col].apply(funds_to_str)
+    return ct_for_save
+
+def write_trend_summary(consolidated_trends, period, summary_file):
+    """Write the markdown summary of strong accumulation/reduction trends"""
+    with open(summary_file, 'w') as f:
+        f.write("# Holdings Trend Analysis (Share-based)\n\n")
+        f.write(f"Period: {period[0]} ")
+        f.write(f"to {period[1]}\n\n")
+
+        # Strong positive trends (significant share accumulation)
+        strong_positive = consolidated_trends[
+            consolidated_trends['trend_score'] > 1].sort_values(
+            ['trend_score', 'current_shares'], ascending=[False, False])
+        if not strong_positive.empty:
+            f.write("## 📈 Strong Share Accumulation\n")
+            for stock in strong_positive.index:
+                score = strong_positive.loc[stock, 'trend_score']
+                shares = strong_positive.loc[stock, 'current_shares']
+                change = strong_positive.loc[stock, 'share_change']
+                appearances = strong_positive.loc[stock, 'appearances']
+                funds_set = consolidated_trends.loc[stock, 'funds'] if 'funds' in consolidated_trends.columns else None
+                funds_list_str = ", ".join(sorted(funds_set)) if isinstance(funds_set, set) and funds_set else (str(funds_set) if funds_set else "")
+                entered_set = consolidated_trends.loc[stock, 'funds_entered'] if 'funds_entered' in consolidated_trends.columns else None
+                exited_set = consolidated_trends.loc[stock, 'funds_exited'] if 'funds_exited' in consolidated_trends.columns else None
+                entered_list = ", ".join(sorted(entered_set)) if isinstance(entered_set, set) and entered_set else ""
+                exited_list = ", ".join(sorted(exited_set)) if isinstance(exited_set, set) and exited_set else ""
+                f.write(f"- {stock}:\n")
+                f.write(f"  * Score: {score:.1f}\n")
+                f.write(f"  * Current Shares: {shares:,.0f}\n")
+                f.write(f"  * Found in {appearances:.0f} monthly reports\n")
+                if funds_list_str:
+                    f.write(f"  * Funds: {funds_list_str}\n")
+                if entered_list:
+                    f.write(f"  * Funds Entered: {entered_list}\n")
+                if exited_list:
+                    f.write(f"  * Funds Exited: {exited_list}\n")
+                if abs(change) > 0:
+                    f.write(f"  * Maximum Change: {change:+.1f}%\n")
+                f.write("\n")
+
+        # Strong negative trends (significant share reduction)
+        strong_negative = consolidated_trends[
+            consolidated_trends['trend_score'] < -1].sort_values(
+            ['trend_score', 'current_shares'])
+        if not strong_negative.empty:
+            f.write("\n## 📉 Strong Share Reduction\n")
+            for stock in strong_negative.index:
+                score = strong_negative.loc[stock, 'trend_score']
+                shares = strong_negative.loc[stock, 'current_shares']
+                change = strong_negative.loc[stock, 'share_change']
+                appearances = strong_negative.loc[stock, 'appearances']
+                funds_set = consolidated_trends.loc[stock, 'funds'] if 'funds' in consolidated_trends.columns else None
+                funds_list_str = ", ".join(sorted(funds_set)) if isinstance(funds_set, set) and funds_set else (str(funds_set) if funds_set else "")
+                entered_set = consolidated_trends.loc[stock, 'funds_entered'] if 'funds_entered' in consolidated_trends.columns else None
+                exited_set = consolidated_trends.loc[stock, 'funds_exited'] if 'funds_exited' in consolidated_trends.columns else None
+                entered_list = ", ".join(sorted(entered_set)) if isinstance(entered_set, set) and entered_set else ""
+                exited_list = ", ".join(sorted(exited_set)) if isinstance(exited_set, set) and exited_set else ""
+                f.write(f"- {stock}:\n")
+                f.write(f"  * Score: {score:.1f}\n")
+                f.write(f"  * Current Shares: {shares:,.0f}\n")
+                f.write(f"  * Found in {appearances:.0f} monthly reports\n")
+                if funds_list_str:
+                    f.write(f"  * Funds: {funds_list_str}\n")
+                if entered_list:
+                    f.write(f"  * Funds Entered: {entered_list}\n")
+                if exited_list:
+                    f.write(f"  * Funds Exited: {exited_list}\n")
+                if abs(change) > 0:
+                    f.write(f"  * Maximum Change: {change:+.1f}%\n")
+                f.write("\n")
+
+def window_share_arrays(share_pairs):
+    """
+    One fund's month pairs (newest first, see delta_share_pairs) as stocks x pairs
+    arrays with cumulative sums over the pairs, so the trend columns of the window
+    made of the newest k pairs are read from column k - 1
+    Returns:
+        dict with 'names' (sorted Index), 'share_change' (newest pair, as in
+        analyze_delta_trends) and the cumulative counts 'entered', 'exited',
+        'held' and 'present' (stock listed in the pair)
+    """
+    names = pd.Index(sorted(set().union(*(curr.index for curr, _ in share_pairs))))
+    newer = np.column_stack([curr.reindex(names, fill_value=0.0).to_numpy(dtype=float) for curr, _ in share_pairs])
+    older = np.column_stack([nxt.reindex(names, fill_value=0.0).to_numpy(dtype=float) for _, nxt in share_pairs])
+    share_change = np.zeros(len(names))
+    held = older[:, 0] > 0
+    share_change[held] = (newer[held, 0] - older[held, 0]) / older[held, 0] * 100
+    return {
+        'names': names,
+        'share_change': share_change,
+        'entered': np.cumsum((newer > 0) & (older == 0), axis=1),
+        'exited': np.cumsum((newer == 0) & (older > 0), axis=1),
+        'held': np.cumsum((newer > 0) | (older > 0), axis=1),
+        'present': np.cumsum(np.column_stack([names.isin(curr.index) for curr, _ in share_pairs]), axis=1)
+    }
+
+def compute_multi_window_trends(fund_ids, windows, dirs, fund_name_map=None, filters=None, log=print):
+    """
+    Score several trend windows from one load per fund without writing any files
+    Each fund's deltas are loaded and stacked once for the longest window and
+    every window's per-fund trend columns are read from cumulative sums over
+    the month pairs (see window_share_arrays). The funds are consolidated per
+    window with the rules of consolidate_fund_trends, vectorized over stocks,
+    so each window's columns equal analyze for that many months. With
+    --min-weight the kept securities depend on the window; windows keeping
+    the same securities share one stack.
+    Returns:
+        dict with 'consolidated' (DataFrame with the per-window columns, or None)
+        and 'immediate_sells' (DataFrame, those of the longest window as analyze records them)
+    """
+    log = log or (lambda *args, **kwargs: None)
+    windows = sorted(set(windows))
+    longest = windows[-1]
+    if fund_name_map is None:
+        fund_name_map = {fund_id: fund_id for fund_id in fund_ids}
+    weight_cols = ('prev_weight_pct', 'curr_weight_pct')
+    min_weight = filters is not None and filters.get('min_weight') is not None
+
+    funds = []
+    for fund_id in fund_ids:
+        try:
+            # newest first, planned from the holdings catalog
+            months = list(reversed(fund_months(fund_id, dirs)))
+            if len(months) < 2:
+                log(f"⚠️  Skipping fund {fund_id}: Need at least 2 months of data (found {len(months)})")
+                continue
+            months = months[:min(longest, len(months))]
+            log(f"📊 Analyzing {len(months)} months of data for fund {fund_id}")
+            deltas = [apply_holdings_filters(d, filters) for d in load_fund_deltas(fund_id, months, dirs)]
+            funds.append({'fund_id': fund_id, 'label': fund_name_map.get(fund_id, fund_id), 'deltas': deltas,
+                          'stacks': {}})
+        except Exception as e:
+            log(f"❌ Error analyzing fund {fund_id}: {str(e)}")
+    if not funds:
+        log("❌ No fund had sufficient data for analysis")
+        return {'consolidated': None, 'immediate_sells': pd.DataFrame(columns=SELL_COLUMNS)}
+
+    date_str = dt.datetime.now().strftime("%Y-%m-%d")
+    sells = []
+    per_window = {}
+    # longest first, so a stack shared by several windows is built with all of their pairs
+    for w in reversed(windows):
+        rows = []
+        for fund in funds:
+            num_pairs = min(w, len(fund['deltas']) + 1) - 1
+            deltas = fund['deltas'][:num_pairs]
+            keep = min_weight_keys(deltas, filters, key_col='key', weight_cols=weight_cols) if min_weight else None
+            stack_key = len(keep) if min_weight else None
+            if stack_key not in fund['stacks']:
+                if min_weight:
+                    deltas = [d[d['key'].isin(keep)] for d in deltas]
+                share_pairs = delta_share_pairs(deltas)
+                fund['stacks'][stack_key] = window_share_arrays(share_pairs)
+                if w == longest:
+                    sells += [s for s in (month_pair_sells(curr, nxt, fund['fund_id'], date_str)
+                                          for curr, nxt in share_pairs) if s is not None]
+            stack = fund['stacks'][stack_key]
+            col = num_pairs - 1
+            present = stack['present'][:, col] > 0
+            rows.append({
+                'names': stack['names'][present],
+                'entered': stack['entered'][present, col] > 0,
+                'exited': stack['exited'][present, col] > 0,
+                'held': stack['held'][present, col] > 0,
+                'share_change': stack['share_change'][present]
+            })
+        per_window[w] = _consolidate_window(rows, [fund['label'] for fund in funds], with_funds=w == longest)
+
+    stocks = sorted(set().union(*(c.index for c in per_window.values())))
+    consolidated = pd.DataFrame(index=stocks)
+    for w in windows:
+        window = per_window[w].reindex(stocks)
+        consolidated[f'trend_score_{w}m'] = window['funds_entered_count'].fillna(0).astype(int)
+        consolidated[f'funds_entered_count_{w}m'] = window['funds_entered_count'].fillna(0).astype(int)
+        consolidated[f'funds_exited_count_{w}m'] = window['funds_exited_count'].fillna(0).astype(int)
+        consolidated[f'num_funds_{w}m'] = window['appearances'].fillna(0).astype(int)
+        consolidated[f'share_change_{w}m'] = window['share_change'].fillna(0.0).astype(float)
+    # funds holding the stock at some point in the longest window
+    consolidated['funds'] = per_window[longest]['funds'].reindex(stocks).fillna("")
+
+    consolidated = consolidated.sort_values(f'trend_score_{longest}m', ascending=False, kind='stable')
+    return {
+        'consolidated': select_top(consolidated, filters, f'trend_score_{longest}m'),
+        'immediate_sells': pd.concat(sells, ignore_index=True)[SELL_COLUMNS] if sells
+        else pd.DataFrame(columns=SELL_COLUMNS)
+    }
+
+def _consolidate_window(rows, labels, with_funds=False):
+    """
+    consolidate_fund_trends for one window, vectorized over stocks
+    Counts are summed over funds; share_change follows its running average: the
+    first fund counts where its change is non-zero, later funds wherever they
+    held the stock.
+    """
+    stocks = pd.Index(sorted(set().union(*(row['names'] for row in rows))))
+    entered = np.zeros(len(stocks), dtype=int)
+    exited = np.zeros(len(stocks), dtype=int)
+    appearances = np.zeros(len(stocks), dtype=int)
+    share_change = np.zeros(len(stocks))
+    count = np.zeros(len(stocks))
+    funds = [set() for _ in range(len(stocks))] if with_funds else None
+    for i, (row, label) in enumerate(zip(rows, labels)):
+        pos = stocks.get_indexer(row['names'])
+        entered[pos] += row['entered']
+        exited[pos] += row['exited']
+        appearances[pos] += row['held']
+        if i == 0:
+            share_change[pos] = row['share_change']
+            count[pos] = np.abs(row['share_change']) > 0
+        else:
+            held = pos[row['held']]
+            share_change[held] = (share_change[held] * count[held] + row['share_change'][row['held']]) / (count[held] + 1)
+            count[held] += 1
+        if with_funds:
+            for p in pos[row['held']]:
+                funds[p].add(label)
+    window = pd.DataFrame({'funds_entered_count': entered, 'funds_exited_count': exited,
+                           'appearances': appearances, 'share_change': share_change}, index=stocks)
+    if with_funds:
+        window['funds'] = [",".join(sorted(f)) for f in funds]
+    return window
+
+def analyze_multi_window(fund_ids, windows, group=None, fund_name_map=None, filters=None):
+    """
+    Score several trend windows (e.g. 2, 3, 6 and 12 months) in a single pass
+    See compute_multi_window_trends. Writes multi_window_trends_<timestamp>.csv
+    and appends the immediate sells of the longest window, as analyze does.
+    Returns:
+        Consolidated DataFrame with per-window columns:
+            trend_score_<w>m: funds that newly entered the stock (as in analyze)
+            funds_entered_count_<w>m / funds_exited_count_<w>m: funds that entered / exited
+            num_funds_<w>m: funds holding the stock at some point in the window
+            share_change_<w>m: average latest-month share change across those funds
+        plus a funds column listing the holders over the longest window
+    """
+    dirs = create_directory_structure(group=group)
+    dateTime = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    result = compute_multi_window_trends(fund_ids, windows, dirs, fund_name_map=fund_name_map, filters=filters)
+    consolidated = result['consolidated']
+    if consolidated is None:
+        return None
+    append_immediate_sells(result['immediate_sells'], dirs.get('analysis'))
+
+    output_file = os.path.join(dirs["analysis"], f"multi_window_trends_{dateTime}.csv")
+    consolidated.to_csv(output_file)
+    print(f"✅ Saved multi-window analysis for windows {', '.join(str(w) for w in sorted(set(windows)))} "
+          f"to {output_file}")
+    return consolidated
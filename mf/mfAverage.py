@@ -1,97 +1,250 @@
+from helper.dataAPI import *
 from helper.folderAPI import *
+from helper.weightAPI import *
 import datetime as dt
+import numpy as np
 import pandas as pd
 import os
 
-def calculate_fund_averages(fund_ids, average_by_holders=False, group=None):
+def calculate_fund_averages(fund_ids, average_by_holders=False, group=None, filters=None, chunk_size=None,
+                            fund_weights=None):
     """Calculate average weightage of stocks across all funds
 
     Args:
         fund_ids: list of fund ids
         average_by_holders: if True, average only across funds that hold the stock
             (i.e., divide by num_funds_holding). If False, divide by total number of funds.
+        filters: optional sector/ISIN/min-weight/top filters applied while loading
+        chunk_size: if given, stream funds in chunks of this size into running
+            per-security accumulators instead of concatenating every fund's holdings,
+            so memory stays bounded however many funds are included
+        fund_weights: optional dict fund_id -> AUM in ₹ crore (or any relative weight);
+            adds AUM-weighted average weight and implied rupee exposure columns
+
+    Writes average_holdings_<timestamp>.csv; see compute_fund_averages for the
+    side-effect-free variant.
     """
     dirs = create_directory_structure(group=group)
     dateTime = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+
+    avg_holdings, loaded_funds = compute_fund_averages(fund_ids, dirs, average_by_holders=average_by_holders,
+                                                       filters=filters, chunk_size=chunk_size, fund_weights=fund_weights)
+    if avg_holdings is None:
+        return
+
+    # Save average holdings analysis
+    output_file = os.path.join(dirs["analysis"], 
+                             f"average_holdings_{dateTime}.csv")
+    avg_holdings.to_csv(output_file)
+
+    # Print summary
+    print(f"\n✅ Analyzed holdings across {loaded_funds} funds")
+    print("\nTop 10 holdings by average weight:")
+    summary_columns = ['security_name', 'avg_weight_pct', 'num_funds_holding', 'sector']
+    if fund_weights is not None:
+        summary_columns[2:2] = ['weighted_avg_weight_pct', 'exposure_cr']
+    summary = avg_holdings[summary_columns].head(10)
+    print(summary.to_string(index=False))
+
+def compute_fund_averages(fund_ids, dirs, average_by_holders=False, filters=None, chunk_size=None, log=print,
+                          fund_weights=None):
+    """
+    Average weightage of stocks across funds without writing any files
+    Args:
+        dirs: Directory structure dictionary (only 'holdings' is read)
+        log: callable for progress messages; pass None to stay silent
+        (other arguments as in calculate_fund_averages)
+    Returns:
+        tuple (average holdings DataFrame or None, number of funds loaded)
+    """
+    log = log or (lambda *args, **kwargs: None)
+    total_funds = len(fund_ids)
+    top = filters.get('top') if filters else None
+
+    if chunk_size:
+        avg_holdings, loaded_funds = stream_average_weightage(fund_ids, dirs, chunk_size, average_by_holders, filters, log=log,
+                                                              fund_weights=fund_weights)
+        if avg_holdings is None:
+            log("❌ No holdings data found")
+        return avg_holdings, loaded_funds
+
     # Get latest holdings from all funds
     all_holdings = []
-    total_funds = len(fund_ids)
-    
+    loaded_ids = []
     for fund_id in fund_ids:
-        try:
-            # Get most recent holdings file
-            fund_dir = os.path.join(dirs["holdings"], fund_id)
-            files = sorted([f for f in os.listdir(fund_dir) if f.endswith('.csv')],
-                         reverse=True)
-            
-            if not files:
-                print(f"⚠️  No data found for fund {fund_id}")
-                continue
-                
-            # Read most recent holdings
-            latest_file = os.path.join(fund_dir, files[0])
-            df = pd.read_csv(latest_file)
+        df = load_latest_holdings(fund_id, dirs, filters, log=log)
+        if df is not None:
             all_holdings.append(df)
-            print(f"✅ Loaded latest holdings for {fund_id}")
-            
-        except Exception as e:
-            print(f"❌ Error loading fund {fund_id}: {str(e)}")
-    
-    if all_holdings:
-        try:
-            # Combine all holdings
-            combined_holdings = pd.concat(all_holdings, ignore_index=True)
-            
-            # Calculate average weightage
-            avg_holdings = calculate_average_weightage(combined_holdings, total_funds, average_by_holders=average_by_holders)
-            
-            # Save average holdings analysis
-            output_file = os.path.join(dirs["analysis"], 
-                                     f"average_holdings_{dateTime}.csv")
-            avg_holdings.to_csv(output_file)
-            
-            # Print summary
-            print(f"\n✅ Analyzed holdings across {len(all_holdings)} funds")
-            print("\nTop 10 holdings by average weight:")
-            summary = avg_holdings[['security_name', 'avg_weight_pct', 
-                                  'num_funds_holding', 'sector']].head(10)
-            print(summary.to_string(index=False))
-            
-        except Exception as e:
-            print(f"❌ Error calculating averages: {str(e)}")
-    else:
-        print("❌ No holdings data found")
+            loaded_ids.append(fund_id)
+
+    if not all_holdings:
+        log("❌ No holdings data found")
+        return None, 0
+
+    try:
+        # Combine all holdings
+        combined_holdings = pd.concat(all_holdings, ignore_index=True)
+        if combined_holdings.empty:
+            log("❌ No holdings matched the filters")
+            return None, len(all_holdings)
+
+        # Calculate average weightage
+        avg_holdings = calculate_average_weightage(combined_holdings, total_funds, average_by_holders=average_by_holders,
+                                                   top=top, fund_weights=fund_weights,
+                                                   total_weight=_total_weight(loaded_ids, fund_weights))
+        return avg_holdings, len(all_holdings)
+    except Exception as e:
+        log(f"❌ Error calculating averages: {str(e)}")
+        return None, len(all_holdings)
+
+def load_latest_holdings(fund_id, dirs, filters=None, log=print):
+    """Load a fund's most recent holdings file, or None when it has no data (log=None stays silent)"""
+    log = log or (lambda *args, **kwargs: None)
+    try:
+        # Get most recent holdings file
+        fund_dir = os.path.join(dirs["holdings"], fund_id)
+        months = fund_months(fund_id, dirs)
+
+        if not months:
+            log(f"⚠️  No data found for fund {fund_id}")
+            return None
 
-def calculate_average_weightage(holdings_df, total_funds, average_by_holders=False):
+        # Read most recent holdings
+        latest_file = os.path.join(fund_dir, f"holdings_{months[-1]}.csv")
+        df = read_holdings_file(latest_file, filters)
+        df = apply_min_weight([df], filters)[0]
+        log(f"✅ Loaded latest holdings for {fund_id}")
+        return df
+
+    except Exception as e:
+        log(f"❌ Error loading fund {fund_id}: {str(e)}")
+        return None
+
+def stream_average_weightage(fund_ids, dirs, chunk_size, average_by_holders=False, filters=None, log=print,
+                             fund_weights=None):
+    """
+    Streaming variant of calculate_average_weightage
+    Funds are read chunk_size at a time and folded into running per-security
+    sum / holder count / min / max accumulators, so peak memory depends on the
+    chunk size and the number of distinct securities, not on the number of funds.
+    Returns:
+        tuple (average holdings DataFrame or None, number of funds loaded)
+    """
+    log = log or (lambda *args, **kwargs: None)
+    keys = ['security_name', 'isin', 'sector']
+    # how each per-security column folds across chunks
+    folds = {'total_weight_pct': 'sum', 'num_funds_holding': 'sum', 'min_weight_pct': 'min', 'max_weight_pct': 'max'}
+    if fund_weights is not None:
+        folds.update(weighted_weight_sum='sum', holder_weight='sum')
+    accumulator = None
+    loaded_funds = 0
+    loaded_weight = 0.0
+
+    for start in range(0, len(fund_ids), chunk_size):
+        chunk = []
+        for fund_id in fund_ids[start:start + chunk_size]:
+            df = load_latest_holdings(fund_id, dirs, filters, log=log)
+            if df is not None:
+                chunk.append(df)
+                loaded_weight += fund_weights.get(fund_id, 0.0) if fund_weights is not None else 0.0
+        if not chunk:
+            continue
+        loaded_funds += len(chunk)
+
+        chunk = pd.concat(chunk, ignore_index=True)
+        part = (chunk
+                .groupby(keys)
+                .agg(total_weight_pct=('weight_pct', 'sum'),
+                     num_funds_holding=('fund_id', 'nunique'),
+                     min_weight_pct=('weight_pct', 'min'),
+                     max_weight_pct=('weight_pct', 'max')))
+        if fund_weights is not None:
+            part['weighted_weight_sum'], part['holder_weight'] = security_weighted_totals(chunk, fund_weights)
+        del chunk
+
+        # fund ids are distinct across chunks, so holder counts simply add up
+        if accumulator is None:
+            accumulator = part
+        else:
+            accumulator = (pd.concat([accumulator, part])
+                           .groupby(level=keys)
+                           .agg(folds))
+        log(f"🔄 Folded {min(start + chunk_size, len(fund_ids))}/{len(fund_ids)} funds "
+              f"({len(accumulator)} securities)")
+
+    if accumulator is None or accumulator.empty:
+        return None, loaded_funds
+
+    avg_holdings = finalize_average_weightage(accumulator.reset_index(), len(fund_ids),
+                                              average_by_holders=average_by_holders,
+                                              top=filters.get('top') if filters else None,
+                                              total_weight=loaded_weight)
+    return avg_holdings, loaded_funds
+
+def calculate_average_weightage(holdings_df, total_funds, average_by_holders=False, top=None, fund_weights=None,
+                                total_weight=None):
     """
     Calculate average weightage of each stock across funds
     Args:
         holdings_df: Combined holdings DataFrame
         total_funds: Total number of funds being analyzed
+        top: if given, return only the top N stocks by average weight
+        fund_weights: optional dict fund_id -> AUM in ₹ crore for the weighted columns
+        total_weight: weight the fund-weighted average divides by (defaults to the
+            summed weight of the funds in holdings_df)
     Returns:
         DataFrame with average weightage metrics
     """
-    # Group by security and calculate metrics
+    # Group by security and calculate metrics (same columns as the streaming fold)
     avg_holdings = (holdings_df.groupby(['security_name', 'isin', 'sector'])
-                   .agg({
-                       'weight_pct': 'sum',  # Sum of weights across funds
-                       'fund_id': 'nunique'  # Number of funds holding the stock
-                   })
+                   .agg(total_weight_pct=('weight_pct', 'sum'),  # Sum of weights across funds
+                        num_funds_holding=('fund_id', 'nunique'),  # Number of funds holding the stock
+                        min_weight_pct=('weight_pct', 'min'),
+                        max_weight_pct=('weight_pct', 'max'))
                    .reset_index())
-    
-    # Rename columns
-    avg_holdings.columns = ['security_name', 'isin', 'sector', 
-                          'total_weight_pct', 'num_funds_holding']
-    
+    if fund_weights is not None:
+        avg_holdings['weighted_weight_sum'], avg_holdings['holder_weight'] = security_weighted_totals(holdings_df, fund_weights)
+
+    return finalize_average_weightage(avg_holdings, total_funds, average_by_holders=average_by_holders, top=top,
+                                      total_weight=total_weight if total_weight is not None
+                                      else _total_weight(holdings_df['fund_id'].unique(), fund_weights))
+
+def security_weighted_totals(holdings_df, fund_weights):
+    """
+    Fund-weighted weight sum and total holder weight per security, in the
+    (sorted) order of holdings_df.groupby(['security_name', 'isin', 'sector'])
+    """
+    # rows with a missing key are dropped by the groupby and get no group number
+    security_codes = holdings_df.groupby(['security_name', 'isin', 'sector']).ngroup()
+    valid = security_codes.notna().to_numpy()
+    security_codes = security_codes.fillna(-1).to_numpy(dtype=int)
+    fund_codes, funds = pd.factorize(holdings_df['fund_id'])
+    weights = np.array([fund_weights.get(f, 0.0) for f in funds], dtype=float)
+    return weighted_totals(fund_codes[valid], security_codes[valid],
+                           holdings_df['weight_pct'].to_numpy(dtype=float)[valid],
+                           weights, int(security_codes.max()) + 1 if valid.any() else 0)
+
+def _total_weight(fund_ids, fund_weights):
+    """Summed weight of the funds that contributed holdings"""
+    if fund_weights is None:
+        return None
+    return float(sum(fund_weights.get(f, 0.0) for f in fund_ids))
+
+def finalize_average_weightage(avg_holdings, total_funds, average_by_holders=False, top=None, total_weight=None):
+    """
+    Derive average weight and coverage from per-security totals and holder counts
+    When the weighted_weight_sum / holder_weight totals are present, the
+    fund-weighted average (weighted_avg_weight_pct, over total_weight or the
+    holders' weight) and the implied exposure (exposure_cr, in the units of the
+    fund weights) are added and used for ranking.
+    """
     # Calculate average weight
     if average_by_holders:
         # divide by number of funds holding the stock (coverage-aware)
         # avoid division by zero
-        avg_holdings['avg_weight_pct'] = avg_holdings.apply(
-            lambda r: (r['total_weight_pct'] / r['num_funds_holding']) if r['num_funds_holding'] > 0 else 0.0,
-            axis=1
-        )
+        avg_holdings['avg_weight_pct'] = (avg_holdings['total_weight_pct']
+                                          / avg_holdings['num_funds_holding'].where(avg_holdings['num_funds_holding'] > 0)
+                                          ).fillna(0.0)
     else:
         # divide by total funds (include zeros)
         avg_holdings['avg_weight_pct'] = avg_holdings['total_weight_pct'] / total_funds
@@ -102,11 +255,27 @@ def calculate_average_weightage(holdings_df, total_funds, average_by_holders=Fal
     # Round numeric columns
     avg_holdings['avg_weight_pct'] = avg_holdings['avg_weight_pct'].round(2)
     avg_holdings['coverage_pct'] = avg_holdings['coverage_pct'].round(1)
+
+    sort_column = 'avg_weight_pct'
+    if 'weighted_weight_sum' in avg_holdings.columns:
+        weighted_sum = avg_holdings.pop('weighted_weight_sum')
+        holder_weight = avg_holdings.pop('holder_weight')
+        if average_by_holders:
+            weighted_avg = (weighted_sum / holder_weight.where(holder_weight > 0)).fillna(0.0)
+        else:
+            weighted_avg = weighted_sum / total_weight if total_weight else weighted_sum * 0.0
+        avg_holdings['weighted_avg_weight_pct'] = weighted_avg.round(2)
+        # weight_pct is a percentage of each fund, so weight x AUM / 100 is the rupee amount held
+        avg_holdings['exposure_cr'] = (weighted_sum / 100).round(2)
+        sort_column = 'weighted_avg_weight_pct'
     
-    # Sort by average weight descending
-    return avg_holdings.sort_values('avg_weight_pct', ascending=False)
+    # Sort by average weight descending (partial selection when only the top N are needed)
+    if top:
+        return avg_holdings.nlargest(top, sort_column)
+    return avg_holdings.sort_values(sort_column, ascending=False)
 
-def compare_months(prev_month=None, curr_month=None, fund_ids=None, average_by_holders=False, group=None):
+def compare_months(prev_month=None, curr_month=None, fund_ids=None, average_by_holders=False, group=None, filters=None,
+                   chunk_size=None, fund_weights=None):
     """
     Compare average allocations between two months.
 
@@ -114,10 +283,36 @@ def compare_months(prev_month=None, curr_month=None, fund_ids=None, average_by_h
         prev_month: string like '2025-09' for the older month (files named holdings_2025-09.csv)
         curr_month: string like '2025-10' for the newer month
         fund_ids: optional list of fund ids to include; if None, all folders under holdings/ are used
+        filters: optional sector/ISIN/min-weight/top filters applied while loading
+        chunk_size: if given, stream funds in chunks into running per-stock accumulators
+            instead of holding every fund's weights in memory
+        fund_weights: optional dict fund_id -> AUM in ₹ crore (or any relative weight);
+            adds AUM-weighted averages and implied rupee exposure for both months
 
-    Produces a CSV in analysis/ with per-stock average change and lists of funds that increased/decreased allocation.
+    Produces a CSV in analysis/ with per-stock average change and lists of funds that increased/decreased allocation;
+    see compute_month_comparison for the side-effect-free variant.
     """
     dirs = create_directory_structure(group=group)
+    result_df, prev_month, curr_month = compute_month_comparison(
+        prev_month, curr_month, fund_ids, dirs, average_by_holders=average_by_holders,
+        filters=filters, chunk_size=chunk_size, fund_weights=fund_weights)
+    out_file = os.path.join(dirs['analysis'], f"compare_{prev_month}_vs_{curr_month}_{dt.datetime.now().strftime('%Y-%m-%d_%H%M%S')}.csv")
+    result_df.to_csv(out_file, index=False)
+    print(f"✅ Saved comparison to {out_file}")
+    return result_df
+
+def compute_month_comparison(prev_month, curr_month, fund_ids, dirs, average_by_holders=False, filters=None,
+                             chunk_size=None, log=print, fund_weights=None):
+    """
+    Compare average allocations between two months without writing any files
+    Args:
+        dirs: Directory structure dictionary (only 'holdings'/'deltas' are read)
+        log: callable for progress messages; pass None to stay silent
+        (other arguments as in compare_months)
+    Returns:
+        tuple (comparison DataFrame, resolved prev_month, resolved curr_month)
+    """
+    log = log or (lambda *args, **kwargs: None)
     # helper to parse month input (accept 'YYYY-MM' or numeric month like '9' or 9)
     def _parse_month_arg(a):
         if a is None:
@@ -153,77 +348,230 @@ def compare_months(prev_month=None, curr_month=None, fund_ids=None, average_by_h
         curr_month = _parse_month_arg(curr_month) if curr_month is not None else curr_month
     # discover funds if not provided
     if fund_ids is None:
-        holdings_root = dirs['holdings']
-        fund_ids = [d for d in os.listdir(holdings_root) if os.path.isdir(os.path.join(holdings_root, d))]
+        fund_ids = catalog_funds(dirs)
 
     total_funds = len(fund_ids)
-    # per-fund dictionaries: fund -> {stock: weight_pct}
-    prev_holdings = {}
-    curr_holdings = {}
+    weights = np.array([fund_weights.get(f, 0.0) for f in fund_ids], dtype=float) if fund_weights is not None else None
+    weighted = None
+    if chunk_size:
+        rows, weighted = stream_month_comparison(prev_month, curr_month, fund_ids, dirs, chunk_size,
+                                                 average_by_holders, filters, log=log, weights=weights)
+    else:
+        # per-fund dictionaries: fund -> {stock: weight_pct}
+        prev_holdings = {}
+        curr_holdings = {}
 
-    for fund_id in fund_ids:
-        prev_file = os.path.join(dirs['holdings'], fund_id, f"holdings_{prev_month}.csv")
-        curr_file = os.path.join(dirs['holdings'], fund_id, f"holdings_{curr_month}.csv")
-        try:
-            if os.path.exists(prev_file):
-                dfp = pd.read_csv(prev_file)
-                prev_holdings[fund_id] = dict(zip(dfp['security_name'], dfp['weight_pct'].astype(float)))
-            else:
-                prev_holdings[fund_id] = {}
-        except Exception:
-            prev_holdings[fund_id] = {}
-        try:
-            if os.path.exists(curr_file):
-                dfc = pd.read_csv(curr_file)
-                curr_holdings[fund_id] = dict(zip(dfc['security_name'], dfc['weight_pct'].astype(float)))
+        for fund_id in fund_ids:
+            prev_holdings[fund_id], curr_holdings[fund_id] = load_month_weights(
+                fund_id, prev_month, curr_month, dirs, filters)
+
+        # union of all stocks
+        all_stocks = set()
+        for d in (prev_holdings, curr_holdings):
+            for f in d:
+                all_stocks.update(d[f].keys())
+
+        rows = []
+        for stock in sorted(all_stocks):
+            # compute per-fund weights (0 if missing)
+            prev_weights = {f: prev_holdings.get(f, {}).get(stock, 0.0) for f in fund_ids}
+            curr_weights = {f: curr_holdings.get(f, {}).get(stock, 0.0) for f in fund_ids}
+
+            # average depending on mode
+            if average_by_holders:
+                # average only across funds that hold the stock
+                holders_prev = [w for w in prev_weights.values() if w > 0]
+                holders_curr = [w for w in curr_weights.values() if w > 0]
+                avg_prev = sum(holders_prev) / len(holders_prev) if len(holders_prev) > 0 else 0.0
+                avg_curr = sum(holders_curr) / len(holders_curr) if len(holders_curr) > 0 else 0.0
             else:
-                curr_holdings[fund_id] = {}
-        except Exception:
-            curr_holdings[fund_id] = {}
+                # average across all funds (including zeros)
+                avg_prev = sum(prev_weights.values()) / total_funds if total_funds > 0 else 0.0
+                avg_curr = sum(curr_weights.values()) / total_funds if total_funds > 0 else 0.0
 
-    # union of all stocks
-    all_stocks = set()
-    for d in (prev_holdings, curr_holdings):
-        for f in d:
-            all_stocks.update(d[f].keys())
+            funds_increased = [f for f in fund_ids if curr_weights[f] > prev_weights[f]]
+            funds_decreased = [f for f in fund_ids if curr_weights[f] < prev_weights[f]]
+            rows.append(comparison_row(stock, avg_prev, avg_curr, funds_increased, funds_decreased))
 
-    rows = []
-    for stock in sorted(all_stocks):
-        # compute per-fund weights (0 if missing)
-        prev_weights = {f: prev_holdings.get(f, {}).get(stock, 0.0) for f in fund_ids}
-        curr_weights = {f: curr_holdings.get(f, {}).get(stock, 0.0) for f in fund_ids}
+        if weights is not None:
+            records = [(idx, stock, prev_holdings[f].get(stock, 0.0), curr_holdings[f].get(stock, 0.0))
+                       for idx, f in enumerate(fund_ids)
+                       for stock in prev_holdings[f].keys() | curr_holdings[f].keys()]
+            weighted = month_weighted_totals(pd.DataFrame(records, columns=['fund_idx', 'stock', 'prev', 'curr']), weights)
+
+    result_df = pd.DataFrame(rows, columns=['security_name', 'avg_prev_pct', 'avg_curr_pct', 'delta_pct',
+                                            'pct_change_of_prev', 'funds_increased', 'funds_decreased',
+                                            'num_funds_increased', 'num_funds_decreased'])
+    sort_column = 'delta_pct'
+    if weights is not None:
+        # like average, divide by the weight of the funds loaded for each month
+        total_weights = {month_key: _total_weight([f for f in fund_ids if has_month(f, month, dirs)], fund_weights)
+                         for month_key, month in (('prev', prev_month), ('curr', curr_month))}
+        result_df = add_weighted_comparison(result_df, weighted, total_weights, average_by_holders)
+        sort_column = 'weighted_delta_pct'
+    # keep only the N largest moves (either direction) when --top is given
+    result_df = select_top(result_df, filters, sort_column, by_abs=True)
+    result_df = result_df.sort_values(sort_column, ascending=False)
+    return result_df, prev_month, curr_month
 
-        # average depending on mode
+def month_weighted_totals(records, weights):
+    """
+    Fund-weighted weight sums and holder weights per stock for both months
+    Args:
+        records: DataFrame of fund_idx / stock / prev / curr weight rows
+        weights: numpy vector of fund weights indexed by fund_idx
+    Returns:
+        DataFrame indexed by stock with prev_weighted, curr_weighted,
+        prev_holder_weight and curr_holder_weight
+    """
+    totals = pd.DataFrame(columns=['prev_weighted', 'curr_weighted', 'prev_holder_weight', 'curr_holder_weight'],
+                          dtype=float)
+    if records.empty:
+        return totals
+    stock_codes, stocks = pd.factorize(records['stock'])
+    # only the funds present in these records, so the matrix stays chunk sized
+    fund_codes, funds = pd.factorize(records['fund_idx'])
+    for month in ('prev', 'curr'):
+        values = records[month].to_numpy(dtype=float)
+        held = values > 0
+        totals[f'{month}_weighted'], totals[f'{month}_holder_weight'] = weighted_totals(
+            fund_codes[held], stock_codes[held], values[held], weights[funds], len(stocks))
+    totals.index = stocks
+    return totals
+
+def add_weighted_comparison(result_df, weighted, total_weights, average_by_holders=False):
+    """
+    Add fund-weighted average and implied exposure (in the units of the fund weights) columns
+    total_weights: {'prev': weight, 'curr': weight} of the funds loaded for each month
+    """
+    weighted = weighted.reindex(result_df['security_name']).fillna(0.0)
+    for month in ('prev', 'curr'):
         if average_by_holders:
-            # average only across funds that hold the stock
-            holders_prev = [w for w in prev_weights.values() if w > 0]
-            holders_curr = [w for w in curr_weights.values() if w > 0]
-            avg_prev = sum(holders_prev) / len(holders_prev) if len(holders_prev) > 0 else 0.0
-            avg_curr = sum(holders_curr) / len(holders_curr) if len(holders_curr) > 0 else 0.0
+            holder_weight = weighted[f'{month}_holder_weight']
+            average = (weighted[f'{month}_weighted'] / holder_weight.where(holder_weight > 0)).fillna(0.0)
         else:
-            # average across all funds (including zeros)
-            avg_prev = sum(prev_weights.values()) / total_funds if total_funds > 0 else 0.0
-            avg_curr = sum(curr_weights.values()) / total_funds if total_funds > 0 else 0.0
-        delta = avg_curr - avg_prev
-        pct_delta = (delta / avg_prev * 100) if avg_prev != 0 else (100.0 if delta > 0 else 0.0)
-
-        funds_increased = [f for f in fund_ids if curr_weights[f] > prev_weights[f]]
-        funds_decreased = [f for f in fund_ids if curr_weights[f] < prev_weights[f]]
-
-        rows.append({
-            'security_name': stock,
-            'avg_prev_pct': round(avg_prev, 4),
-            'avg_curr_pct': round(avg_curr, 4),
-            'delta_pct': round(delta, 4),
-            'pct_change_of_prev': round(pct_delta, 2),
-            'funds_increased': ",".join(sorted(funds_increased)),
-            'funds_decreased': ",".join(sorted(funds_decreased)),
-            'num_funds_increased': len(funds_increased),
-            'num_funds_decreased': len(funds_decreased)
-        })
-
-    result_df = pd.DataFrame(rows).sort_values('delta_pct', ascending=False)
-    out_file = os.path.join(dirs['analysis'], f"compare_{prev_month}_vs_{curr_month}_{dt.datetime.now().strftime('%Y-%m-%d_%H%M%S')}.csv")
-    result_df.to_csv(out_file, index=False)
-    print(f"✅ Saved comparison to {out_file}")
-    return result_df
\ No newline at end of file
+            total_weight = total_weights[month]
+            average = weighted[f'{month}_weighted'] / total_weight if total_weight else weighted[f'{month}_weighted'] * 0.0
+        result_df[f'weighted_{month}_pct'] = average.round(4).to_numpy()
+        result_df[f'exposure_{month}_cr'] = (weighted[f'{month}_weighted'] / 100).round(2).to_numpy()
+    result_df['weighted_delta_pct'] = (result_df['weighted_curr_pct'] - result_df['weighted_prev_pct']).round(4)
+    result_df['exposure_change_cr'] = (result_df['exposure_curr_cr'] - result_df['exposure_prev_cr']).round(2)
+    return result_df
+
+def load_month_weights(fund_id, prev_month, curr_month, dirs, filters=None):
+    """
+    Load one fund's weights for two months
+    Returns:
+        tuple of dicts ({stock: weight_pct} for prev_month, same for curr_month);
+        a month without a readable file gives an empty dict
+    """
+    # A stored delta for curr_month against prev_month carries both months' weights
+    delta = load_delta(fund_id, curr_month, dirs, prev_month=prev_month)
+    if delta is not None:
+        delta = apply_holdings_filters(delta, filters)
+        delta = apply_min_weight([delta], filters, key_col='key',
+                                 weight_cols=('prev_weight_pct', 'curr_weight_pct'))[0]
+        dp = delta[delta['action'] != 'entered']
+        dc = delta[delta['action'] != 'exited']
+        return (dict(zip(dp['prev_security_name'], dp['prev_weight_pct'].astype(float))),
+                dict(zip(dc['security_name'], dc['curr_weight_pct'].astype(float))))
+
+    prev_file = os.path.join(dirs['holdings'], fund_id, f"holdings_{prev_month}.csv")
+    curr_file = os.path.join(dirs['holdings'], fund_id, f"holdings_{curr_month}.csv")
+    dfp = dfc = None
+    try:
+        if has_month(fund_id, prev_month, dirs):
+            dfp = read_holdings_file(prev_file, filters)
+    except Exception:
+        dfp = None
+    try:
+        if has_month(fund_id, curr_month, dirs):
+            dfc = read_holdings_file(curr_file, filters)
+    except Exception:
+        dfc = None
+    loaded = [df for df in (dfp, dfc) if df is not None]
+    loaded = iter(apply_min_weight(loaded, filters))
+    dfp = next(loaded) if dfp is not None else None
+    dfc = next(loaded) if dfc is not None else None
+    return (dict(zip(dfp['security_name'], dfp['weight_pct'].astype(float))) if dfp is not None else {},
+            dict(zip(dfc['security_name'], dfc['weight_pct'].astype(float))) if dfc is not None else {})
+
+def comparison_row(stock, avg_prev, avg_curr, funds_increased, funds_decreased):
+    """Build one output row of compare_months"""
+    delta = avg_curr - avg_prev
+    pct_delta = (delta / avg_prev * 100) if avg_prev != 0 else (100.0 if delta > 0 else 0.0)
+    return {
+        'security_name': stock,
+        'avg_prev_pct': round(avg_prev, 4),
+        'avg_curr_pct': round(avg_curr, 4),
+        'delta_pct': round(delta, 4),
+        'pct_change_of_prev': round(pct_delta, 2),
+        'funds_increased': ",".join(sorted(funds_increased)),
+        'funds_decreased': ",".join(sorted(funds_decreased)),
+        'num_funds_increased': len(funds_increased),
+        'num_funds_decreased': len(funds_decreased)
+    }
+
+def stream_month_comparison(prev_month, curr_month, fund_ids, dirs, chunk_size, average_by_holders=False, filters=None,
+                            log=print, weights=None):
+    """
+    Streaming variant of the compare_months aggregation
+    Funds are loaded chunk_size at a time and folded into running per-stock
+    accumulators (weight sums, holder counts and the indices of funds that
+    increased / decreased), so only one chunk of per-fund weights is in memory.
+    Returns:
+        tuple (list of comparison rows as built by comparison_row,
+        month_weighted_totals summed over chunks or None when weights is None)
+    """
+    log = log or (lambda *args, **kwargs: None)
+    total_funds = len(fund_ids)
+    # stock -> [sum_prev, sum_curr, holders_prev, holders_curr, increased fund indices, decreased fund indices]
+    accumulators = {}
+    weighted = None
+
+    for start in range(0, total_funds, chunk_size):
+        records = []
+        for idx in range(start, min(start + chunk_size, total_funds)):
+            prev_weights, curr_weights = load_month_weights(fund_ids[idx], prev_month, curr_month, dirs, filters)
+            for stock in prev_weights.keys() | curr_weights.keys():
+                records.append((idx, stock, prev_weights.get(stock, 0.0), curr_weights.get(stock, 0.0)))
+        if not records:
+            continue
+
+        chunk = pd.DataFrame(records, columns=['fund_idx', 'stock', 'prev', 'curr'])
+        del records
+        chunk['prev_held'] = chunk['prev'] > 0
+        chunk['curr_held'] = chunk['curr'] > 0
+        sums = chunk.groupby('stock')[['prev', 'curr', 'prev_held', 'curr_held']].sum()
+        increased = chunk[chunk['curr'] > chunk['prev']].groupby('stock')['fund_idx'].agg(list)
+        decreased = chunk[chunk['curr'] < chunk['prev']].groupby('stock')['fund_idx'].agg(list)
+        if weights is not None:
+            part = month_weighted_totals(chunk, weights)
+            weighted = part if weighted is None else weighted.add(part, fill_value=0.0)
+
+        for stock, prev_sum, curr_sum, prev_held, curr_held in sums.itertuples():
+            acc = accumulators.setdefault(stock, [0.0, 0.0, 0, 0, [], []])
+            acc[0] += prev_sum
+            acc[1] += curr_sum
+            acc[2] += int(prev_held)
+            acc[3] += int(curr_held)
+        for stock, indices in increased.items():
+            accumulators[stock][4].extend(indices)
+        for stock, indices in decreased.items():
+            accumulators[stock][5].extend(indices)
+        log(f"🔄 Folded {min(start + chunk_size, total_funds)}/{total_funds} funds ({len(accumulators)} stocks)")
+
+    rows = []
+    for stock in sorted(accumulators):
+        sum_prev, sum_curr, holders_prev, holders_curr, increased, decreased = accumulators[stock]
+        if average_by_holders:
+            avg_prev = sum_prev / holders_prev if holders_prev > 0 else 0.0
+            avg_curr = sum_curr / holders_curr if holders_curr > 0 else 0.0
+        else:
+            avg_prev = sum_prev / total_funds if total_funds > 0 else 0.0
+            avg_curr = sum_curr / total_funds if total_funds > 0 else 0.0
+        rows.append(comparison_row(stock, avg_prev, avg_curr,
+                                   [fund_ids[i] for i in increased], [fund_ids[i] for i in decreased]))
+    if weights is not None and weighted is None:
+        weighted = month_weighted_totals(pd.DataFrame(columns=['fund_idx', 'stock', 'prev', 'curr']), weights)
+    return rows, weighted
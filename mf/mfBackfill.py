@@ -0,0 +1,101 @@
+from concurrent.futures import ProcessPoolExecutor
+from helper.dataAPI import *
+from helper.folderAPI import *
+from helper.disclosureAPI import *
+
+DISCLOSURE_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+def _parse_job(job):
+    """Process pool worker: parse one disclosure file, returning errors instead of raising"""
+    file_path, source_dir = job
+    try:
+        fund_id, month, df = parse_disclosure_file(file_path, source_dir)
+        return file_path, fund_id, month, df, None
+    except Exception as e:
+        return file_path, None, None, None, str(e)
+
+def backfill_holdings(source_dir, fund_ids=None, group=None, workers=None):
+    """Import historical portfolio disclosures into the holdings store
+
+    Every .csv/.xlsx/.xls file under source_dir is parsed in a process pool and
+    mapped onto the holdings_YYYY-MM.csv schema, with the month taken from the
+    file. Months already stored for a fund are never overwritten. Missing
+    share_change values are derived from the previous month, all new months
+    are validated in one pass, and the validation report and the catalog are
+    written once per run before the deltas are updated.
+    Args:
+        source_dir: Directory of AMC disclosure files (searched recursively)
+        fund_ids: Optional list of fund ids to import; others are skipped
+        group: Optional group name (holdings always go to the shared store)
+        workers: Number of worker processes (defaults to the CPU count)
+    """
+    dirs = create_directory_structure(group=group)
+    files = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(source_dir)
+        for name in names
+        if name.lower().endswith(DISCLOSURE_EXTENSIONS) and not name.startswith(('.', '~$'))
+    )
+    if not files:
+        print(f"⚠️  No disclosure files found in {source_dir}")
+        return
+
+    print(f"🔄 Parsing {len(files)} disclosure files with {workers or os.cpu_count()} workers")
+    parsed = {}
+    failed = []
+    skipped_funds = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for file_path, fund_id, month, df, error in pool.map(_parse_job, [(f, source_dir) for f in files], chunksize=4):
+            if error:
+                failed.append((file_path, error))
+                continue
+            if fund_ids is not None and fund_id not in fund_ids:
+                skipped_funds.add(fund_id)
+                continue
+            if (fund_id, month) in parsed:
+                failed.append((file_path, f"duplicate disclosure for {fund_id} {month}"))
+                continue
+            parsed[(fund_id, month)] = df
+
+    written = 0
+    existing = 0
+    payloads = {}
+    for fund_id in sorted({fund_id for fund_id, _ in parsed}):
+        fund_dir = os.path.join(dirs["holdings"], fund_id)
+        stored = set(fund_months(fund_id, dirs))
+
+        new_months = sorted(month for fid, month in parsed if fid == fund_id and month not in stored)
+        existing += sum(1 for fid, month in parsed if fid == fund_id and month in stored)
+        # oldest first so each month's share_change sees the month before it (stored or imported)
+        for month in new_months:
+            earlier = sorted(m for m in stored | set(new_months) if m < month)
+            if not earlier:
+                prev_df = None
+            elif earlier[-1] in stored:
+                prev_df = pd.read_csv(os.path.join(fund_dir, f"holdings_{earlier[-1]}.csv"))
+            else:
+                prev_df = payloads[(fund_id, earlier[-1])]
+            payloads[(fund_id, month)] = fill_share_change(parsed[(fund_id, month)], prev_df)
+
+    issues = validate_batch(payloads, dirs)
+    if payloads:
+        save_validation_report(issues, dirs, list(payloads))
+    # the catalog is written once for the batch, then deltas are derived from it
+    batch = []
+    try:
+        for (fund_id, month), holdings in payloads.items():
+            if store_fund_holdings(fund_id, holdings, dirs, month=month,
+                                   issues=fund_month_issues(issues, fund_id, month), batch=batch):
+                written += 1
+    finally:
+        record_stored_batch(batch, dirs)
+
+    print(f"✅ Backfilled {written} fund-months for {len({fid for fid, _ in parsed})} funds")
+    if existing:
+        print(f"⏭️  Skipped {existing} fund-months that were already stored")
+    if skipped_funds:
+        print(f"⏭️  Skipped {len(skipped_funds)} funds outside the selected group: {', '.join(sorted(skipped_funds))}")
+    if failed:
+        print(f"⚠️  {len(failed)} files could not be imported:")
+        for file_path, error in failed:
+            print(f"   {file_path}: {error}")
@@ -1,15 +1,63 @@
 from helper.dataAPI import *
 from helper.folderAPI import *
+from helper.manifestAPI import *
 
-def collect_fund_data(fund_ids, group=None):
-    """Collect and store latest fund holdings data under optional group folder"""
+def collect_fund_data(fund_ids, group=None, force=False, accept=None):
+    """Collect and store latest fund holdings data
+
+    Progress is tracked in a per-month manifest so an interrupted run can be
+    re-run: funds already collected this month (with an unchanged file) are
+    skipped and only missing or failed funds are fetched again. Pass
+    force=True to re-fetch every fund. Each fund is validated and stored as
+    soon as it is fetched; the validation report is written once per run.
+    Holdings go to the shared fund-level store, so each distinct fund is
+    fetched once even when it is listed several times.
+    accept: 'FUND' or 'FUND:YYYY-MM' specs whose weight_sum and row_drop
+    validation failures are accepted (see accept_fund_months), so e.g. a
+    hybrid fund is stored instead of quarantined.
+    """
     dirs = create_directory_structure(group=group)
+    accept_fund_months(accept or [], dirs)
+    fund_ids = list(dict.fromkeys(fund_ids))
+    month = dt.datetime.now().strftime("%Y-%m")
+    manifest = load_manifest(dirs, month)
+
+    skipped = 0
+    failed = []
+    issues = []
+    validated = []
+    try:
+        for fund_id in fund_ids:
+            file_path = os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv")
+            if not force and is_fund_complete(manifest, fund_id, file_path):
+                skipped += 1
+                continue
 
-    for fund_id in fund_ids:
-        try:
-            holdings = get_fund_holdings([fund_id])
-            store_fund_holdings(fund_id, holdings, dirs)
-            print(f"Successfully collected data for fund: {fund_id}")
-        except Exception as e:
-            print(f"Error collecting data for fund {fund_id}: {str(e)}")
+            try:
+                holdings = get_fund_holdings([fund_id])
+                if holdings.empty:
+                    raise ValueError("no holdings returned")
+                # each fund is validated and stored as soon as it is fetched
+                fund_issues = validate_fund_month(fund_id, month, holdings, dirs)
+                issues.append(fund_issues)
+                validated.append((fund_id, month))
+                saved_path = store_fund_holdings(fund_id, holdings, dirs, month=month, issues=fund_issues)
+                if saved_path is None:
+                    raise ValueError("holdings could not be saved")
+                record_fund_status(manifest, fund_id, 'done', file_path=saved_path, rows=len(holdings))
+                print(f"Successfully collected data for fund: {fund_id}")
+            except Exception as e:
+                record_fund_status(manifest, fund_id, 'failed', error=str(e))
+                failed.append(fund_id)
+                print(f"Error collecting data for fund {fund_id}: {str(e)}")
+            # save after every fund so a crash keeps the progress made so far
+            save_manifest(manifest, dirs)
+    finally:
+        # the validation report is rewritten once per run, also when the run is interrupted
+        if validated:
+            save_validation_report(pd.concat(issues, ignore_index=True), dirs, validated)
 
+    if skipped:
+        print(f"⏭️  Skipped {skipped} funds already collected for {month} (use --force to re-fetch)")
+    if failed:
+        print(f"⚠️  {len(failed)} funds failed and will be retried on the next run: {', '.join(failed)}")
@@ -0,0 +1,115 @@
+from mf.mfAverage import *
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+def weight_distribution(fund_ids, group=None, filters=None, fund_name_map=None):
+    """Cross-fund distribution of each security's weight in the latest holdings
+
+    Writes weight_distribution_<timestamp>.csv with, per security, the median,
+    p25/p75, standard deviation and IQR of weight_pct over the funds holding it
+    (holders-only) and over every fund with stored holdings, including funds
+    the filters leave without rows (zero-inclusive, suffix _all), plus the
+    largest holder. See compute_weight_distribution for the side-effect-free
+    variant.
+    """
+    dirs = create_directory_structure(group=group)
+    dateTime = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    distribution = compute_weight_distribution(fund_ids, dirs, filters=filters, fund_name_map=fund_name_map)
+    if distribution is None:
+        return None
+
+    output_file = os.path.join(dirs["analysis"], f"weight_distribution_{dateTime}.csv")
+    distribution.to_csv(output_file, index=False)
+    print(f"\n✅ Saved weight distribution to {output_file}")
+
+    print("\nTop 10 holdings by median weight across all funds:")
+    summary = distribution[['security_name', 'num_funds_holding', 'median_weight_pct_all', 'median_weight_pct',
+                            'p25_weight_pct', 'p75_weight_pct', 'max_weight_pct', 'max_holder']].head(10)
+    print(summary.to_string(index=False))
+    return distribution
+
+def compute_weight_distribution(fund_ids, dirs, filters=None, fund_name_map=None, log=print):
+    """
+    Weight distribution statistics for every security at once
+    The latest holdings are laid out as a fund x security weight matrix. The
+    zero-inclusive quantiles are the same order statistics for every column,
+    so one np.partition selects them for all securities. Holders-only quantiles
+    are taken from the column-sorted matrix with non-holders (NaN) sorted last,
+    at per-column positions given by the holder counts. Both use linear
+    interpolation like np.percentile.
+    Returns:
+        DataFrame sorted by zero-inclusive median weight, or None when no holdings were found
+    """
+    log = log or (lambda *args, **kwargs: None)
+    fund_name_map = fund_name_map or {}
+
+    frames = []
+    loaded = []
+    for fund_id in fund_ids:
+        df = load_latest_holdings(fund_id, dirs, filters, log=log)
+        # a fund left without rows by the filters still counts as a zero in the _all statistics
+        if df is not None:
+            frames.append(df.assign(fund_idx=len(loaded)))
+            loaded.append(fund_id)
+    if not frames:
+        log("❌ No holdings data found")
+        return None
+
+    holdings = pd.concat(frames, ignore_index=True)
+    keys = ['security_name', 'isin', 'sector']
+    grouped = holdings.groupby(keys)
+    security_codes = grouped.ngroup()
+    valid = security_codes.notna().to_numpy()
+    securities = grouped.size().index.to_frame(index=False)
+    if securities.empty:
+        log("❌ No holdings matched the filters")
+        return None
+
+    fund_codes = holdings['fund_idx'].to_numpy()[valid]
+    security_codes = security_codes.to_numpy()[valid].astype(int)
+    num_funds, num_securities = len(loaded), len(securities)
+    matrix = np.zeros((num_funds, num_securities))
+    np.add.at(matrix, (fund_codes, security_codes), holdings['weight_pct'].to_numpy(dtype=float)[valid])
+    held = np.zeros((num_funds, num_securities), dtype=bool)
+    held[fund_codes, security_codes] = True
+    holder_count = held.sum(axis=0)
+    q = np.array(QUANTILES)
+
+    # zero-inclusive: every column has num_funds values
+    pos = q * (num_funds - 1)
+    lo, hi = np.floor(pos).astype(int), np.ceil(pos).astype(int)
+    selected = np.partition(matrix, np.unique(np.concatenate([lo, hi])), axis=0)
+    quantiles_all = selected[lo] + (selected[hi] - selected[lo]) * (pos - lo)[:, None]
+
+    # holders-only: NaN for non-holders sorts to the end of each column
+    values = np.where(held, matrix, np.nan)
+    ordered = np.sort(values, axis=0)
+    pos = q[:, None] * (holder_count - 1)
+    lo, hi = np.floor(pos).astype(int), np.ceil(pos).astype(int)
+    lo_values = np.take_along_axis(ordered, lo, axis=0)
+    hi_values = np.take_along_axis(ordered, hi, axis=0)
+    quantiles_held = lo_values + (hi_values - lo_values) * (pos - lo)
+
+    max_idx = matrix.argmax(axis=0)
+    distribution = securities.copy()
+    distribution['num_funds_holding'] = holder_count
+    distribution['median_weight_pct'] = quantiles_held[1]
+    distribution['p25_weight_pct'] = quantiles_held[0]
+    distribution['p75_weight_pct'] = quantiles_held[2]
+    distribution['iqr_weight_pct'] = quantiles_held[2] - quantiles_held[0]
+    distribution['std_weight_pct'] = np.nanstd(values, axis=0)
+    distribution['median_weight_pct_all'] = quantiles_all[1]
+    distribution['p25_weight_pct_all'] = quantiles_all[0]
+    distribution['p75_weight_pct_all'] = quantiles_all[2]
+    distribution['iqr_weight_pct_all'] = quantiles_all[2] - quantiles_all[0]
+    distribution['std_weight_pct_all'] = matrix.std(axis=0)
+    distribution['max_weight_pct'] = matrix[max_idx, np.arange(num_securities)]
+    distribution['max_holder'] = [fund_name_map.get(loaded[i], loaded[i]) for i in max_idx]
+    distribution['coverage_pct'] = (holder_count / num_funds * 100).round(1)
+
+    stat_columns = [c for c in distribution.columns if c.endswith(('_weight_pct', '_weight_pct_all'))]
+    distribution[stat_columns] = distribution[stat_columns].round(2)
+
+    distribution = distribution.sort_values(['median_weight_pct_all', 'median_weight_pct'], ascending=False)
+    return select_top(distribution, filters, 'median_weight_pct_all')
@@ -0,0 +1,230 @@
+from helper.dataAPI import *
+from helper.folderAPI import *
+from helper.portfolioAPI import *
+import datetime as dt
+import numpy as np
+import pandas as pd
+import os
+
+def calculate_exposure(portfolio_file, group=None, month=None, fund_name_map=None):
+    """Look-through stock, ISIN and sector exposure of a personal portfolio of funds
+
+    Args:
+        portfolio_file: CSV/JSON of fund amounts or units (see load_portfolio)
+        month: 'YYYY-MM' holdings to use; defaults to each fund's latest month
+    Writes exposure_<timestamp>.csv (per ISIN) and exposure_sectors_<timestamp>.csv
+    and prints the top holdings, sectors, concentration and month-over-month
+    change. See compute_exposure for the side-effect-free variant.
+    """
+    dirs = create_directory_structure(group=group)
+    dateTime = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    fund_name_map = fund_name_map or {}
+
+    portfolio = load_portfolio(portfolio_file)
+    result = compute_exposure(portfolio, dirs, month=month)
+    if result is None:
+        return None
+
+    securities_file = os.path.join(dirs["analysis"], f"exposure_{dateTime}.csv")
+    sectors_file = os.path.join(dirs["analysis"], f"exposure_sectors_{dateTime}.csv")
+    result['securities'].to_csv(securities_file, index=False)
+    result['sectors'].to_csv(sectors_file, index=False)
+
+    total = result['total']
+    equity = result['securities']['exposure_amount'].sum()
+    print(f"\n💼 Portfolio ₹{total:,.0f} across {len(portfolio)} funds")
+    for fund_id, used_month in result['months'].items():
+        prev_month = result['prev_months'].get(fund_id)
+        change = f"change against {prev_month}" if prev_month else f"no holdings of {previous_month(used_month)} to compare"
+        print(f"   {fund_name_map.get(fund_id, fund_id)}: holdings of {used_month}, {change}")
+    print(f"   Look-through holdings ₹{equity:,.0f} ({equity / total * 100 if total else 0.0:.1f}%), "
+          f"cash and others ₹{total - equity:,.0f}")
+
+    print("\nTop 10 securities:")
+    print(result['by_name'][['security_name', 'exposure_amount', 'exposure_pct', 'exposure_change', 'num_funds']]
+          .head(10).to_string(index=False))
+    print("\nSectors:")
+    print(result['sectors'][['sector', 'exposure_amount', 'exposure_pct', 'exposure_change']].to_string(index=False))
+
+    c = result['concentration']
+    print(f"\n📐 Concentration: HHI {c['hhi']:.4f} (effective {c['effective_securities']:.1f} securities), "
+          f"top 10 = {c['top10_pct']:.1f}% of the portfolio, sector HHI {c['sector_hhi']:.4f}")
+    print(f"✅ Saved exposure to {securities_file} and {sectors_file}")
+    return result
+
+def build_exposure_panel(fund_ids, dirs, month=None, offset=0):
+    """
+    Sparse (COO) fund x security weight panel of the funds' holdings
+    Args:
+        month: 'YYYY-MM' to use; defaults to each fund's latest stored month
+        offset: 1 to use the calendar month before it (for month-over-month change);
+            funds without that month stored are left out
+    Returns:
+        dict with 'funds' (column order), 'months' (fund_id -> month used),
+        'securities' (DataFrame of key, isin, security_name, sector) and the COO
+        arrays 'fund_codes', 'security_codes' and 'weights' (fraction of the fund)
+    """
+    frames = []
+    funds = []
+    months = {}
+    for fund_id in fund_ids:
+        stored = fund_months(fund_id, dirs)
+        used = month if month is not None else (stored[-1] if stored else None)
+        for _ in range(offset if used else 0):
+            used = previous_month(used)
+        if used not in stored:
+            continue
+        df = pd.read_csv(os.path.join(dirs["holdings"], fund_id, f"holdings_{used}.csv"))
+        frames.append(df.assign(fund_idx=len(funds)))
+        funds.append(fund_id)
+        months[fund_id] = used
+
+    if not frames:
+        return {'funds': [], 'months': {}, 'securities': pd.DataFrame(columns=['key', 'isin', 'security_name', 'sector']),
+                'fund_codes': np.array([], dtype=int), 'security_codes': np.array([], dtype=int),
+                'weights': np.array([], dtype=float)}
+
+    holdings = pd.concat(frames, ignore_index=True)
+    isin = holdings['isin'].fillna('').astype(str).str.strip()
+    holdings['key'] = isin.where(isin != '', holdings['security_name'].astype(str))
+    holdings['isin'] = isin
+    holdings['sector'] = holdings['sector'].fillna('').astype(str).replace('', 'Unclassified')
+    security_codes, _ = pd.factorize(holdings['key'])
+    securities = (holdings.assign(code=security_codes)
+                  .drop_duplicates('code')
+                  .sort_values('code')[['key', 'isin', 'security_name', 'sector']]
+                  .reset_index(drop=True))
+    return {
+        'funds': funds,
+        'months': months,
+        'securities': securities,
+        'fund_codes': holdings['fund_idx'].to_numpy(),
+        'security_codes': security_codes,
+        'weights': pd.to_numeric(holdings['weight_pct'], errors='coerce').fillna(0.0).to_numpy() / 100
+    }
+
+def build_exposure_panels(fund_ids, dirs, month=None):
+    """
+    Current and previous month panels of the funds, built once and reusable
+    by compute_exposure for any number of allocations over these funds
+    Returns:
+        dict with 'current' and 'previous' (see build_exposure_panel)
+    """
+    current = build_exposure_panel(fund_ids, dirs, month=month)
+    previous = build_exposure_panel(current['funds'], dirs, month=month, offset=1)
+    return {'current': current, 'previous': previous}
+
+def portfolio_exposure(panel, amounts):
+    """
+    Exposure per security as one sparse matrix-vector product
+    exposure = W @ amounts with W the security x fund weight matrix in COO form,
+    evaluated with np.bincount; the panel can be reused for many allocations.
+    Args:
+        panel: result of build_exposure_panel
+        amounts: dict fund_id -> amount invested
+    Returns:
+        tuple (numpy vector of exposure per panel security, number of funds contributing to each)
+    """
+    amount_vec = np.array([amounts.get(f, 0.0) for f in panel['funds']], dtype=float)
+    size = len(panel['securities'])
+    contributions = panel['weights'] * amount_vec[panel['fund_codes']]
+    exposure = np.bincount(panel['security_codes'], weights=contributions, minlength=size)
+    num_funds = np.bincount(panel['security_codes'], weights=(contributions > 0).astype(float), minlength=size)
+    return exposure, num_funds.astype(int)
+
+def _hhi(amounts):
+    total = amounts.sum()
+    return float(((amounts / total) ** 2).sum()) if total > 0 else 0.0
+
+def compute_exposure(portfolio, dirs, month=None, log=print, panels=None):
+    """
+    Look-through exposure without writing any files
+    Args:
+        portfolio: DataFrame of fund_id and amount (see load_portfolio)
+        month: 'YYYY-MM' holdings to use; defaults to each fund's latest month
+        panels: result of build_exposure_panels to reuse instead of reading the
+            holdings again (month is then taken from the panels); portfolio
+            funds outside them count as uncovered
+    Returns:
+        dict with 'securities' (per ISIN), 'by_name' (per security name),
+        'sectors', 'concentration', 'months' (fund_id -> month used),
+        'prev_months' (fund_id -> the calendar month before it, for funds
+        that have it stored) and 'total' (portfolio amount); None when no
+        fund has holdings
+    """
+    log = log or (lambda *args, **kwargs: None)
+    amounts = dict(zip(portfolio['fund_id'], portfolio['amount'].astype(float)))
+    fund_ids = list(amounts)
+
+    if panels is None:
+        panels = build_exposure_panels(fund_ids, dirs, month=month)
+    current, previous = panels['current'], panels['previous']
+    if not any(f in current['months'] for f in fund_ids):
+        log("❌ No holdings found for the portfolio's funds")
+        return None
+    missing = [f for f in fund_ids if f not in current['months']]
+    if missing:
+        log(f"⚠️  No holdings{' for ' + month if month else ''} for {', '.join(missing)}; "
+            f"their amount counts as uncovered")
+    # the change is measured against the calendar month before, never across a gap
+    no_previous = [f for f in fund_ids if f in current['months'] and f not in previous['months']]
+    if no_previous:
+        log(f"⚠️  No holdings for the month before the one used for {', '.join(no_previous)}; "
+            f"their exposure change is counted from zero")
+
+    total = float(sum(amounts.values()))
+    exposure, num_funds = portfolio_exposure(current, amounts)
+    prev_exposure, _ = portfolio_exposure(previous, amounts)
+
+    securities = current['securities'].copy()
+    securities['exposure_amount'] = exposure
+    securities['num_funds'] = num_funds
+    prev = pd.Series(prev_exposure, index=previous['securities']['key'].to_numpy()).groupby(level=0).sum()
+    securities['prev_exposure_amount'] = securities['key'].map(prev).fillna(0.0).to_numpy()
+    # securities that were held only in the previous month still show their exit
+    exited = previous['securities'].assign(prev_exposure_amount=prev_exposure)
+    exited = exited[~exited['key'].isin(securities['key']) & (exited['prev_exposure_amount'] > 0)]
+    if not exited.empty:
+        securities = pd.concat([securities, exited.assign(exposure_amount=0.0, num_funds=0)], ignore_index=True)
+    securities = securities[(securities['exposure_amount'] > 0) | (securities['prev_exposure_amount'] > 0)]
+
+    def _finish(df):
+        df = df.copy()
+        df['exposure_pct'] = df['exposure_amount'] / total * 100 if total else 0.0
+        df['exposure_change'] = df['exposure_amount'] - df['prev_exposure_amount']
+        for col in ('exposure_amount', 'prev_exposure_amount', 'exposure_change'):
+            df[col] = df[col].round(2)
+        df['exposure_pct'] = df['exposure_pct'].round(3)
+        return df.sort_values('exposure_amount', ascending=False).reset_index(drop=True)
+
+    by_name = (securities.groupby('security_name', as_index=False)
+               .agg(exposure_amount=('exposure_amount', 'sum'),
+                    prev_exposure_amount=('prev_exposure_amount', 'sum'),
+                    num_funds=('num_funds', 'max')))
+    sectors = (securities.groupby('sector', as_index=False)
+               .agg(exposure_amount=('exposure_amount', 'sum'),
+                    prev_exposure_amount=('prev_exposure_amount', 'sum')))
+
+    securities = _finish(securities)
+    by_name = _finish(by_name)
+    sectors = _finish(sectors)
+
+    concentration = {
+        'hhi': _hhi(by_name['exposure_amount']),
+        'sector_hhi': _hhi(sectors['exposure_amount']),
+        'top10_pct': float(by_name['exposure_amount'].head(10).sum() / total * 100) if total else 0.0,
+        'num_securities': int((by_name['exposure_amount'] > 0).sum())
+    }
+    concentration['effective_securities'] = 1 / concentration['hhi'] if concentration['hhi'] else 0.0
+    concentration['prev_hhi'] = _hhi(by_name['prev_exposure_amount'])
+
+    return {
+        'securities': securities[['key', 'isin', 'security_name', 'sector', 'exposure_amount', 'exposure_pct',
+                                  'prev_exposure_amount', 'exposure_change', 'num_funds']],
+        'by_name': by_name,
+        'sectors': sectors,
+        'concentration': concentration,
+        'months': {f: m for f, m in current['months'].items() if f in amounts},
+        'prev_months': {f: m for f, m in previous['months'].items() if f in amounts},
+        'total': total
+    }
@@ -0,0 +1,73 @@
+from helper.catalogAPI import *
+from helper.folderAPI import *
+from helper.indexAPI import *
+import pandas as pd
+
+def who_holds(query, fund_ids=None, months=6, fund_name_map=None):
+    """Show which funds held a security in each of the last N months
+
+    query is an ISIN or a (partial) security name. The answer comes from the
+    postings index, which is brought up to date with the holdings catalog
+    first (only new or changed fund-months are read).
+    Args:
+        fund_ids: optional list of funds to limit the answer to (e.g. a group)
+        months: number of most recent stored months to show
+    Returns:
+        DataFrame with one row per fund: weight_pct per month, plus the weight
+        and share change from the first to the last month shown; None when
+        the query does not identify exactly one security
+    """
+    dirs = create_directory_structure(create=False)
+    fund_name_map = fund_name_map or {}
+    sync_index(dirs)
+
+    conn = open_index(dirs)
+    try:
+        matches = find_securities(conn, query)
+        if matches.empty:
+            print(f"❌ No security matching '{query}' in the index")
+            return None
+        names = matches['security_name'].str.lower()
+        exact = matches[names == query.strip().lower()]
+        if not exact.empty:
+            matches = exact
+        # one name under several ISINs (e.g. after a split) is still one security,
+        # unless the ISINs belong to different issuers or security types (e.g. equity and NCDs)
+        families = set(matches['isin'].map(isin_family)) - {''}
+        if matches['security_name'].str.lower().nunique() > 1 or len(families) > 1:
+            print(f"⚠️  '{query}' matches {len(matches)} securities, use the ISIN or a more specific name:")
+            for row in matches.head(20).itertuples():
+                print(f"   {row.isin or '-':12}  {row.security_name}  (last held {row.last_month})")
+            return None
+        security = matches.sort_values('last_month').iloc[-1]
+        merged = [i for i in matches['isin'] if i and i != security['isin']]
+
+        catalog = load_catalog(dirs)
+        funds = fund_ids if fund_ids is not None else list(catalog['funds'])
+        stored = sorted({m for f in funds for m in catalog['funds'].get(f, {}).get('months', {})})
+        shown = stored[-months:]
+        postings = security_postings(conn, list(matches['security_key']), shown, fund_ids=fund_ids) if shown else pd.DataFrame()
+    finally:
+        conn.close()
+
+    print(f"\n🔎 {security['security_name']} ({security['isin'] or 'no ISIN'})")
+    if merged:
+        print(f"   Combined with {', '.join(merged)} (same name, issuer and security type)")
+    if postings.empty:
+        print(f"No fund held it in {', '.join(shown) if shown else 'the stored months'}")
+        return None
+
+    weights = (postings.pivot_table(index='fund_id', columns='month', values='weight_pct', aggfunc='sum')
+               .reindex(columns=shown).fillna(0.0))
+    shares = (postings.pivot_table(index='fund_id', columns='month', values='shares', aggfunc='sum')
+              .reindex(columns=shown).fillna(0.0))
+    result = weights.round(2)
+    result['weight_change'] = (weights[shown[-1]] - weights[shown[0]]).round(2)
+    result['shares_change'] = shares[shown[-1]] - shares[shown[0]]
+    result.insert(0, 'fund_name', [fund_name_map.get(f, f) for f in result.index])
+    result = result.sort_values([shown[-1], 'weight_change'], ascending=False)
+
+    held_now = int((weights[shown[-1]] > 0).sum())
+    print(f"Held by {held_now} funds in {shown[-1]} (weight_pct per month):")
+    print(result.to_string())
+    return result
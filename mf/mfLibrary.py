@@ -0,0 +1,118 @@
+"""Side-effect-free Python API over the analysis functions.
+
+Each function reads the holdings store and returns its results in memory
+(pandas DataFrames, or pyarrow Tables with as_arrow=True). Nothing is printed
+or written unless sinks are passed, e.g.
+
+    from mf.mfLibrary import averages
+    from helper.sinkAPI import csv_sink, feather_sink
+
+    df = averages(fund_ids)
+    averages(fund_ids, sinks=[feather_sink("fund_data/small/analysis")])
+"""
+from mf.mfAnalyse import *
+from mf.mfAverage import *
+from mf.mfDistribution import *
+from mf.mfExposure import *
+from helper.sinkAPI import *
+
+def analyze(fund_ids, months=2, base_dir="fund_data", fund_name_map=None, filters=None, workers=None, sinks=None,
+            as_arrow=False):
+    """
+    Share-based trend analysis (see analyze_all_funds) returned in memory
+    Returns:
+        dict of result name -> frame: '<fund_id>_trends' per fund,
+        'consolidated_trends' (funds columns as comma separated strings) and
+        'immediate_sells'
+    """
+    dirs = create_directory_structure(base_dir=base_dir, create=False)
+    result = compute_fund_trends(fund_ids, months, dirs, fund_name_map=fund_name_map, filters=filters, log=_quiet,
+                                 workers=workers)
+
+    results = {f"{fund_id}_trends": trends for fund_id, trends in result['fund_trends'].items()}
+    if result['consolidated'] is not None:
+        results['consolidated_trends'] = consolidated_for_export(result['consolidated'])
+    results['immediate_sells'] = result['immediate_sells']
+    return _finish(results, sinks, as_arrow)
+
+def averages(fund_ids, base_dir="fund_data", average_by_holders=False, filters=None, chunk_size=None,
+             fund_weights=None, sinks=None, as_arrow=False):
+    """
+    Average weight of each stock across funds (see calculate_fund_averages) returned in memory
+    Returns:
+        average holdings frame, or None when no holdings were found
+    """
+    dirs = create_directory_structure(base_dir=base_dir, create=False)
+    avg_holdings, _ = compute_fund_averages(fund_ids, dirs, average_by_holders=average_by_holders,
+                                            filters=filters, chunk_size=chunk_size, log=_quiet,
+                                            fund_weights=fund_weights)
+    if avg_holdings is None:
+        return None
+    return _finish({'average_holdings': avg_holdings}, sinks, as_arrow)['average_holdings']
+
+def distribution(fund_ids, base_dir="fund_data", filters=None, fund_name_map=None, sinks=None, as_arrow=False):
+    """
+    Cross-fund weight distribution per security (see weight_distribution) returned in memory
+    Returns:
+        distribution frame, or None when no holdings were found
+    """
+    dirs = create_directory_structure(base_dir=base_dir, create=False)
+    result = compute_weight_distribution(fund_ids, dirs, filters=filters, fund_name_map=fund_name_map, log=_quiet)
+    if result is None:
+        return None
+    return _finish({'weight_distribution': result}, sinks, as_arrow)['weight_distribution']
+
+def compare(prev_month=None, curr_month=None, fund_ids=None, base_dir="fund_data", average_by_holders=False,
+            filters=None, chunk_size=None, fund_weights=None, sinks=None, as_arrow=False):
+    """
+    Month-over-month comparison of average allocations (see compare_months) returned in memory
+    Returns:
+        comparison frame; sinks receive it as 'compare_<prev>_vs_<curr>'
+    """
+    dirs = create_directory_structure(base_dir=base_dir, create=False)
+    result_df, prev_month, curr_month = compute_month_comparison(
+        prev_month, curr_month, fund_ids, dirs, average_by_holders=average_by_holders,
+        filters=filters, chunk_size=chunk_size, log=_quiet, fund_weights=fund_weights)
+    name = f"compare_{prev_month}_vs_{curr_month}"
+    return _finish({name: result_df}, sinks, as_arrow)[name]
+
+def exposure_panel(fund_ids, base_dir="fund_data", month=None):
+    """
+    Holdings panels of the funds for repeated exposure calls, e.g.
+
+        panel = exposure_panel(fund_ids)
+        results = [exposure(allocation, panel=panel) for allocation in allocations]
+    """
+    dirs = create_directory_structure(base_dir=base_dir, create=False)
+    return build_exposure_panels(fund_ids, dirs, month=month)
+
+def exposure(portfolio, base_dir="fund_data", month=None, sinks=None, as_arrow=False, panel=None):
+    """
+    Look-through exposure of a portfolio (see calculate_exposure) returned in memory
+    Args:
+        portfolio: dict fund_id -> amount, a DataFrame of fund_id and amount, or a portfolio file path
+        panel: result of exposure_panel; only the exposure product then runs per call
+    Returns:
+        dict with 'exposure' (per ISIN), 'exposure_by_name', 'exposure_sectors' and a
+        one-row 'concentration' frame, or None when no fund has holdings
+    """
+    dirs = create_directory_structure(base_dir=base_dir, create=False)
+    if isinstance(portfolio, str):
+        portfolio = load_portfolio(portfolio)
+    elif isinstance(portfolio, dict):
+        portfolio = pd.DataFrame({'fund_id': list(portfolio), 'amount': list(portfolio.values())})
+    result = compute_exposure(portfolio, dirs, month=month, log=_quiet, panels=panel)
+    if result is None:
+        return None
+    return _finish({'exposure': result['securities'], 'exposure_by_name': result['by_name'],
+                    'exposure_sectors': result['sectors'],
+                    'concentration': pd.DataFrame([result['concentration']])}, sinks, as_arrow)
+
+def _quiet(*args, **kwargs):
+    pass
+
+def _finish(results, sinks, as_arrow):
+    emit(results, sinks)
+    if as_arrow:
+        return {name: to_arrow(frame) for name, frame in results.items()}
+    return results
@@ -0,0 +1,46 @@
+from helper.catalogAPI import *
+from helper.folderAPI import *
+
+def show_status(group_map, fund_name_map=None, groups=None, rebuild=False):
+    """Print stored months and data gaps per group from the holdings catalog
+
+    For every group the expected months run from the earliest to the latest
+    month stored for any of its funds; each fund is listed with its coverage
+    and the months it is missing in that range. Pass rebuild=True to rescan
+    the store first (e.g. after files were copied in by hand).
+    """
+    dirs = create_directory_structure(create=False)
+    catalog = rebuild_catalog(dirs) if rebuild else load_catalog(dirs, persist=True)
+    fund_name_map = fund_name_map or {}
+    print(f"📒 Catalog {catalog_path(dirs)} (updated {catalog.get('updated_at', 'unknown')})")
+
+    for group in groups or sorted(group_map):
+        fund_ids = group_map.get(group, [])
+        months_by_fund = {f: sorted(catalog['funds'].get(f, {}).get('months', {})) for f in fund_ids}
+        stored = sorted({m for months in months_by_fund.values() for m in months})
+        if not stored:
+            print(f"\n📦 {group}: {len(fund_ids)} funds, no holdings stored")
+            continue
+
+        expected = month_range(stored[0], stored[-1])
+        gaps = 0
+        print(f"\n📦 {group}: {len(fund_ids)} funds, {stored[0]} to {stored[-1]} ({len(expected)} months)")
+        for fund_id in fund_ids:
+            months = months_by_fund[fund_id]
+            name = fund_name_map.get(fund_id, fund_id)
+            if not months:
+                gaps += 1
+                print(f"   ❌ {fund_id}  {name}: no holdings stored")
+                continue
+            held = set(months)
+            missing = [m for m in expected if m not in held]
+            entries = catalog['funds'][fund_id]['months']
+            last_collected = entries[months[-1]].get('collected_at', '')
+            line = f"{fund_id}  {name}: {len(months)} months, latest {months[-1]} (collected {last_collected})"
+            if missing:
+                gaps += 1
+                print(f"   ⚠️  {line}, missing {', '.join(missing)}")
+            else:
+                print(f"   ✅ {line}")
+        if gaps:
+            print(f"   {gaps} of {len(fund_ids)} funds have gaps")
@@ -0,0 +1,57 @@
+from helper.dataAPI import *
+from helper.folderAPI import *
+
+def validate_store(fund_ids=None, quarantine=False, fund_name_map=None, accept=None):
+    """Validate stored holdings and report (or quarantine) anomalous fund-months
+
+    fund_ids: funds to check (default: every fund in the catalog). All their
+    stored months are stacked into one frame and checked in a single
+    vectorized pass (see validate_holdings), the same checks that run when
+    holdings are stored. The issues replace the checked fund-months' rows in
+    fund_data/validation/validation_report.csv. With quarantine=True the
+    fund-months with errors are moved to fund_data/quarantine/<fund_id>/ and
+    leave the catalog, so analyses no longer read them.
+    accept: 'FUND' or 'FUND:YYYY-MM' specs whose weight_sum and row_drop
+    failures are accepted from now on (hybrid funds, consolidations); their
+    quarantined holdings are stored again first.
+    """
+    dirs = create_directory_structure()
+    fund_name_map = fund_name_map or {}
+    for fund_id, month in accept_fund_months(accept or [], dirs):
+        restored = restore_quarantined(fund_id, dirs, month=None if month == ALL_MONTHS else month)
+        print(f"👍 Accepted weight_sum/row_drop for {fund_name_map.get(fund_id, fund_id)} "
+              f"{'(every month)' if month == ALL_MONTHS else month}"
+              f"{', restored ' + ', '.join(restored) if restored else ''}")
+    fund_ids = fund_ids or catalog_funds(dirs)
+
+    frames = []
+    validated = []
+    for fund_id in fund_ids:
+        for month in fund_months(fund_id, dirs):
+            file_path = os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv")
+            frames.append(pd.read_csv(file_path).assign(fund_id=fund_id, month=month))
+            validated.append((fund_id, month))
+    if not frames:
+        print("❌ No holdings stored for the selected funds")
+        return None
+
+    issues = apply_accepted(validate_holdings(pd.concat(frames, ignore_index=True)), load_accepted(dirs))
+    report_file = save_validation_report(issues, dirs, validated)
+
+    errors = issues[issues['severity'] == ERROR]
+    failed = errors[['fund_id', 'month']].drop_duplicates()
+    print(f"🔍 Checked {len(validated)} fund-months of {len(fund_ids)} funds: "
+          f"{len(failed)} with errors, {int((issues['severity'] == WARNING).sum())} warnings")
+    for issue in issues.itertuples(index=False):
+        icon = "❌" if issue.severity == ERROR else "⚠️ "
+        print(f"   {icon} {fund_name_map.get(issue.fund_id, issue.fund_id)} {issue.month} "
+              f"{issue.check}: {issue.detail}")
+
+    if quarantine:
+        for fund_id, month in failed.itertuples(index=False):
+            target = quarantine_fund_month(fund_id, month, dirs)
+            print(f"🚧 Quarantined {fund_id} {month} to {target}")
+    elif not failed.empty:
+        print("   Run with --quarantine to move the fund-months with errors out of the store")
+    print(f"✅ Saved validation report to {report_file}")
+    return issues
@@ -0,0 +1,141 @@
+from mf.mfAnalyse import *
+from mf.mfAverage import *
+from helper.indexAPI import *
+from helper.watchAPI import *
+import time
+
+def watch_holdings(group_map, considered_months=2, fund_name_map=None, filters=None, debounce=2.0, polling=False,
+                   interval=5.0):
+    """Keep the analyses of the given groups up to date as holdings files land
+
+    group_map: group -> fund ids (None as key for the ungrouped default funds).
+    Watches fund_data/holdings with inotify (or polls every interval seconds),
+    waits until a burst of writes has been quiet for debounce seconds, then
+    re-analyzes only the funds whose files changed and republishes the trend
+    files of those funds, the group's consolidated trends, summary and average
+    holdings. Per-fund results of unchanged funds are reused from memory.
+    Files copied in by hand are added to the catalog (and their deltas stored)
+    first. Runs until interrupted.
+    """
+    fund_name_map = fund_name_map or {}
+    store = create_directory_structure()
+    caches = {group: {} for group in group_map}
+
+    print(f"🔄 Initial analysis of {len(group_map)} group(s)")
+    for group, fund_ids in group_map.items():
+        publish_group(group, fund_ids, fund_ids, considered_months, caches[group], fund_name_map, filters)
+
+    watcher = open_watcher(store["holdings"], polling=polling, interval=interval)
+    print(f"👀 Watching {store['holdings']} ({type(watcher).__name__}); Ctrl+C to stop")
+    try:
+        for paths in debounced_changes(watcher, debounce=debounce):
+            started = time.monotonic()
+            changed = register_changed_files(paths, store)
+            if not changed:
+                continue
+            print(f"\n📥 New holdings for {', '.join(sorted(changed))}")
+            for group, fund_ids in group_map.items():
+                affected = [f for f in fund_ids if f in changed]
+                if not affected:
+                    continue
+                for fund_id in affected:
+                    caches[group].pop(fund_id, None)
+                publish_group(group, fund_ids, affected, considered_months, caches[group], fund_name_map, filters)
+            print(f"✅ Published in {time.monotonic() - started:.1f}s")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+def register_changed_files(paths, dirs):
+    """
+    Bring catalog, index and deltas in line with changed holdings files
+    Files written by store_fund_holdings are already recorded; files whose
+    checksum is unknown to the catalog (copied in by hand) are validated as
+    one batch and recorded here, or quarantined when they fail validation.
+    Returns:
+        set of fund ids with changed holdings
+    """
+    catalog = load_catalog(dirs)
+    changed = set()
+    payloads = {}
+    known = {}
+    for path in sorted(paths):
+        if not os.path.exists(path):
+            continue
+        fund_id = os.path.basename(os.path.dirname(path))
+        month = holdings_month(os.path.basename(path))
+        entry = catalog['funds'].get(fund_id, {}).get('months', {}).get(month)
+        try:
+            if entry is None or entry['checksum'] != file_checksum(path):
+                payloads[(fund_id, month)] = pd.read_csv(path)
+                known[(fund_id, month)] = entry is not None
+                continue
+        except Exception as e:
+            print(f"❌ Could not register {path}: {str(e)}")
+            continue
+        changed.add(fund_id)
+
+    if not payloads:
+        return changed
+    issues = validate_batch(payloads, dirs)
+    save_validation_report(issues, dirs, list(payloads))
+    record_catalog_months(dirs, [(fund_id, month, os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv"),
+                                  len(holdings_df)) for (fund_id, month), holdings_df in payloads.items()])
+    for (fund_id, month), holdings_df in payloads.items():
+        path = os.path.join(dirs["holdings"], fund_id, f"holdings_{month}.csv")
+        try:
+            errors = fund_month_issues(issues, fund_id, month)
+            errors = errors[errors['severity'] == ERROR]
+            if not errors.empty:
+                target = quarantine_fund_month(fund_id, month, dirs)
+                print(f"❌ Quarantined {path} to {target}: {'; '.join(errors['detail'])}")
+                if not known[(fund_id, month)]:
+                    # the fund's stored months are unchanged
+                    continue
+            else:
+                update_index(dirs, fund_id, month, holdings_df)
+                store_fund_delta(fund_id, month, dirs)
+                months = fund_months(fund_id, dirs)
+                if months[-1] != month:
+                    store_fund_delta(fund_id, months[months.index(month) + 1], dirs)
+        except Exception as e:
+            print(f"❌ Could not register {path}: {str(e)}")
+            continue
+        changed.add(fund_id)
+    return changed
+
+def publish_group(group, fund_ids, changed, considered_months, cache, fund_name_map=None, filters=None):
+    """
+    Re-run the analyses of one group after some of its funds changed
+    Only funds missing from cache are analyzed; the consolidation and the
+    averages are recomputed for the whole group. Writes the changed funds'
+    trend files, consolidated_trends/trend_summary, average_holdings and
+    appends the changed funds' immediate sells under the group's analysis folder.
+    """
+    dirs = create_directory_structure(group=group)
+    dateTime = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    label = group or 'default'
+
+    result = compute_fund_trends(fund_ids, considered_months, dirs, fund_name_map=fund_name_map, filters=filters,
+                                 log=None, cache=cache)
+    for fund_id in changed:
+        fund_result = cache.get(fund_id, {})
+        for message in fund_result.get('messages', []):
+            print(message)
+        if fund_id in result['fund_trends']:
+            result['fund_trends'][fund_id].to_csv(os.path.join(dirs["analysis"], f"{fund_id}_trends_{dateTime}.csv"))
+    sells = result['immediate_sells']
+    append_immediate_sells(sells[sells['fund_id'].isin(changed)], dirs.get('analysis'))
+
+    if result['consolidated'] is not None:
+        consolidated_for_export(result['consolidated']).to_csv(
+            os.path.join(dirs["analysis"], f"consolidated_trends_{dateTime}.csv"))
+        write_trend_summary(result['consolidated'], result['period'],
+                            os.path.join(dirs["analysis"], f"trend_summary_{dateTime}.md"))
+
+    avg_holdings, loaded_funds = compute_fund_averages(fund_ids, dirs, filters=filters, log=None)
+    if avg_holdings is not None:
+        avg_holdings.to_csv(os.path.join(dirs["analysis"], f"average_holdings_{dateTime}.csv"))
+    print(f"📦 {label}: re-analyzed {len(changed)} of {len(fund_ids)} funds, "
+          f"consolidated {len(result['fund_trends'])} and averaged {loaded_funds} funds")
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# the modules are imported as helper.* / mf.* from the repository root, like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.folderAPI import create_directory_structure
+
+def holdings_frame(fund_id, rows):
+    """Holdings in the stored schema from (security_name, isin, sector, shares, weight_pct) tuples"""
+    return pd.DataFrame({
+        'fund_id': fund_id,
+        'fund_name': fund_id,
+        'security_name': [r[0] for r in rows],
+        'isin': [r[1] for r in rows],
+        'number_of_shares': [float(r[3]) for r in rows],
+        'share_change': 0.0,
+        'weight_pct': [float(r[4]) for r in rows],
+        'sector': [r[2] for r in rows],
+    }, columns=['fund_id', 'fund_name', 'security_name', 'isin', 'number_of_shares', 'share_change',
+                'weight_pct', 'sector'])
+
+@pytest.fixture
+def dirs(tmp_path):
+    """Directory structure of an empty holdings store"""
+    return create_directory_structure(base_dir=str(tmp_path / "fund_data"))
+
+@pytest.fixture
+def add_holdings(dirs):
+    """Write holdings_<month>.csv of a fund straight into the store (the catalog is built on first read)"""
+    def add(fund_id, month, rows):
+        fund_dir = os.path.join(dirs["holdings"], fund_id)
+        os.makedirs(fund_dir, exist_ok=True)
+        holdings_frame(fund_id, rows).to_csv(os.path.join(fund_dir, f"holdings_{month}.csv"), index=False)
+    return add
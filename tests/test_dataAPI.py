@@ -0,0 +1,42 @@
+import pandas as pd
+
+from conftest import holdings_frame
+from helper.dataAPI import *
+
+def test_delta_actions_and_changes():
+    prev = holdings_frame('FUND_A', [('Alpha', 'INE000A01011', 'Banks', 100, 5.0),
+                                     ('Beta', 'INE000B01011', 'IT', 50, 2.0),
+                                     ('Gamma', 'INE000C01011', 'Auto', 10, 1.0),
+                                     ('Delta', 'INE000D01011', 'Pharma', 7, 0.5)])
+    curr = holdings_frame('FUND_A', [('Alpha', 'INE000A01011', 'Banks', 150, 6.0),
+                                     ('Beta', 'INE000B01011', 'IT', 20, 1.0),
+                                     ('Delta', 'INE000D01011', 'Pharma', 7, 0.6),
+                                     ('Epsilon', 'INE000E01011', 'Metals', 30, 1.5)])
+    delta = compute_holdings_delta(prev, curr, prev_month='2025-01', month='2025-02').set_index('key')
+
+    assert list(delta.reset_index().columns) == DELTA_COLUMNS
+    assert delta['action'].to_dict() == {'INE000A01011': 'increased', 'INE000B01011': 'decreased',
+                                         'INE000C01011': 'exited', 'INE000D01011': 'unchanged',
+                                         'INE000E01011': 'entered'}
+    assert delta.at['INE000A01011', 'share_change'] == 50
+    assert delta.at['INE000A01011', 'weight_change'] == 1.0
+    assert delta.at['INE000C01011', 'curr_shares'] == 0 and delta.at['INE000C01011', 'prev_weight_pct'] == 1.0
+    assert delta.at['INE000E01011', 'prev_shares'] == 0 and delta.at['INE000E01011', 'security_name'] == 'Epsilon'
+    assert (delta['prev_month'] == '2025-01').all() and (delta['month'] == '2025-02').all()
+
+def test_delta_keys_by_isin_across_renames_and_sums_duplicates():
+    prev = holdings_frame('FUND_A', [('Old Name Ltd', 'INE000A01011', 'Banks', 100, 5.0),
+                                     ('No Isin Co', '', 'IT', 10, 1.0)])
+    curr = holdings_frame('FUND_A', [('New Name Ltd', 'INE000A01011', 'Banks', 80, 4.0),
+                                     ('New Name Ltd', 'INE000A01011', 'Banks', 40, 2.0),
+                                     ('Old Name Ltd', 'INE000A01011', 'Banks', 0, 0.0),
+                                     ('No Isin Co', '', 'IT', 10, 1.0)])
+    delta = compute_holdings_delta(prev, curr).set_index('key')
+
+    assert sorted(delta.index) == ['INE000A01011', 'No Isin Co']
+    renamed = delta.loc['INE000A01011']
+    assert renamed['curr_shares'] == 120 and renamed['curr_weight_pct'] == 6.0
+    assert renamed['action'] == 'increased'
+    # named after the largest row of the month, with the older month's name kept alongside
+    assert renamed['security_name'] == 'New Name Ltd' and renamed['prev_security_name'] == 'Old Name Ltd'
+    assert delta.at['No Isin Co', 'action'] == 'unchanged'
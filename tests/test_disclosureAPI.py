@@ -0,0 +1,51 @@
+from helper.disclosureAPI import *
+
+def _write(tmp_path, text, name="INF194KB1AL4/portfolio.csv"):
+    path = tmp_path / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+def test_read_disclosure_table_keeps_rows_wider_than_the_title(tmp_path):
+    path = _write(tmp_path, "Portfolio as on Aug 2025\n"
+                            "SBI Small Cap Fund\n"
+                            "\n"
+                            "Name of the Instrument,ISIN,Industry,Quantity,% to NAV\n"
+                            "HDFC Bank Ltd,INE040A01034,Banks,\"1,000\",5.5\n")
+    raw = read_disclosure_table(path)
+    assert raw.shape == (5, 5)
+    assert raw.iloc[0, 0] == "Portfolio as on Aug 2025"
+    assert raw.iloc[0, 1:].isna().all()
+    assert raw.iloc[4].tolist() == ["HDFC Bank Ltd", "INE040A01034", "Banks", "1,000", "5.5"]
+
+def test_parse_disclosure_file_below_narrow_title_rows(tmp_path):
+    path = _write(tmp_path, "Portfolio as on Aug 2025\n"
+                            "Name of the Instrument,ISIN,Industry,Quantity,% to NAV\n"
+                            "HDFC Bank Ltd,INE040A01034,Banks,\"1,000\",5.5\n"
+                            "ICICI Bank Ltd,INE090A01021,Banks,500,NA\n"
+                            "Total,,,,5.5\n")
+    fund_id, month, df = parse_disclosure_file(path, str(tmp_path))
+    assert (fund_id, month) == ("INF194KB1AL4", "2025-08")
+    assert df['security_name'].tolist() == ["HDFC Bank Ltd", "ICICI Bank Ltd"]
+    assert df['number_of_shares'].tolist() == [1000.0, 500.0]
+    assert df['weight_pct'].tolist() == [5.5, 0.0]
+
+def test_month_from_text_month_names():
+    assert month_from_text("April 2023") == "2023-04"
+    assert month_from_text("Aug-25") == "2025-08"
+    # the day between month and year is not the year
+    assert month_from_text("Portfolio as on Aug 31 2025") == "2025-08"
+    assert month_from_text("Portfolio as on August 31st, 2025") == "2025-08"
+    assert month_from_text("31st August, 2025") == "2025-08"
+
+def test_month_from_text_numeric_dates():
+    assert month_from_text("holdings_2023-04") == "2023-04"
+    assert month_from_text("202304") == "2023-04"
+    assert month_from_text("Portfolio as on 31.08.2025") == "2025-08"
+    assert month_from_text("31/08/2025") == "2025-08"
+    assert month_from_text("2025-08-31") == "2025-08"
+
+def test_month_from_text_rejects_implausible_years():
+    assert month_from_text("August 31") is None
+    assert month_from_text("Sep 2099") is None
+    assert month_from_text("no date here") is None
@@ -0,0 +1,36 @@
+import pytest
+
+from helper.indexAPI import find_securities, isin_family, open_index, sync_index
+
+@pytest.fixture
+def conn(dirs, add_holdings):
+    add_holdings('FUND_A', '2025-01', [
+        ('Multi Commodity Exchange', 'INE745G01035', 'Financial', 100, 2.0),
+        ('Acme Ltd', 'INE001A01036', 'Industrials', 100, 3.0),
+        ('Acme Ltd', 'INE001A07012', 'Debt', 10, 0.5),
+        ('100% Pure Foods', 'INE002B01010', 'FMCG', 10, 1.0),
+        ('Pure_Foods', 'INE003C01010', 'FMCG', 10, 1.0),
+        ('Pureo Foods', 'INE004D01010', 'FMCG', 10, 1.0),
+    ])
+    add_holdings('FUND_A', '2025-02', [
+        ('Multi Commodity Exchange', 'INE745G01043', 'Financial', 500, 2.2),
+    ])
+    sync_index(dirs, log=None)
+    conn = open_index(dirs)
+    yield conn
+    conn.close()
+
+def test_isin_query_combines_split_isins_of_the_same_name(conn):
+    matches = find_securities(conn, 'ine745g01043')
+    assert sorted(matches['isin']) == ['INE745G01035', 'INE745G01043']
+
+def test_isin_query_keeps_other_security_types_of_the_same_name_apart(conn):
+    assert list(find_securities(conn, 'INE001A01036')['isin']) == ['INE001A01036']
+    assert list(find_securities(conn, 'INE001A07012')['isin']) == ['INE001A07012']
+    assert isin_family('INE001A01036') != isin_family('INE001A07012')
+
+def test_name_query_matches_like_wildcards_literally(conn):
+    assert list(find_securities(conn, '100%')['isin']) == ['INE002B01010']
+    assert list(find_securities(conn, 'pure_foods')['isin']) == ['INE003C01010']
+    assert list(find_securities(conn, '%')['isin']) == ['INE002B01010']
+    assert find_securities(conn, 'pure%foods').empty
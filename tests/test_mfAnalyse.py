@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from mf.mfAnalyse import compute_fund_trends, compute_multi_window_trends
+
+@pytest.fixture
+def store(add_holdings):
+    """
+    Three funds with entries, exits and share changes; FUND_C has only the last two
+    months and FUND_B's Alpha is above 1% only in 2025-02 (kept by --min-weight 1 in
+    the 4-month window only)
+    """
+    add_holdings('FUND_A', '2025-01', [('Alpha', 'INE000A01011', 'Banks', 100, 5.0),
+                                       ('Beta', 'INE000B01011', 'IT', 50, 1.0)])
+    add_holdings('FUND_A', '2025-02', [('Alpha', 'INE000A01011', 'Banks', 120, 5.5),
+                                       ('Gamma', 'INE000C01011', 'Auto', 10, 0.4)])
+    add_holdings('FUND_A', '2025-03', [('Alpha', 'INE000A01011', 'Banks', 90, 4.0),
+                                       ('Gamma', 'INE000C01011', 'Auto', 30, 1.5),
+                                       ('Delta', 'INE000D01011', 'Pharma', 5, 0.2)])
+    add_holdings('FUND_A', '2025-04', [('Alpha', 'INE000A01011', 'Banks', 90, 4.2),
+                                       ('Delta', 'INE000D01011', 'Pharma', 25, 0.8)])
+    add_holdings('FUND_B', '2025-01', [('Gamma', 'INE000C01011', 'Auto', 40, 2.0)])
+    add_holdings('FUND_B', '2025-02', [('Gamma', 'INE000C01011', 'Auto', 20, 1.0),
+                                       ('Alpha', 'INE000A01011', 'Banks', 10, 1.2)])
+    add_holdings('FUND_B', '2025-03', [('Alpha', 'INE000A01011', 'Banks', 15, 0.6),
+                                       ('Beta', 'INE000B01011', 'IT', 70, 3.0)])
+    add_holdings('FUND_B', '2025-04', [('Alpha', 'INE000A01011', 'Banks', 30, 0.9),
+                                       ('Beta', 'INE000B01011', 'IT', 60, 2.5)])
+    add_holdings('FUND_C', '2025-03', [('Beta', 'INE000B01011', 'IT', 10, 0.5)])
+    add_holdings('FUND_C', '2025-04', [('Beta', 'INE000B01011', 'IT', 20, 0.9),
+                                       ('Delta', 'INE000D01011', 'Pharma', 5, 0.1)])
+    return ['FUND_A', 'FUND_B', 'FUND_C']
+
+@pytest.mark.parametrize('filters', [None, {'min_weight': 1.0}])
+def test_each_window_matches_analyze_for_that_many_months(dirs, store, filters):
+    windows = [2, 3, 4]
+    multi = compute_multi_window_trends(store, windows, dirs, filters=filters, log=None)
+
+    for w in windows:
+        single = compute_fund_trends(store, w, dirs, filters=filters, log=None)['consolidated']
+        window = multi['consolidated'].loc[multi['consolidated'][f'num_funds_{w}m'] > 0]
+        held = single[single['appearances'] > 0]
+        assert sorted(window.index) == sorted(held.index)
+        for stock in held.index:
+            assert window.at[stock, f'trend_score_{w}m'] == held.at[stock, 'trend_score']
+            assert window.at[stock, f'funds_entered_count_{w}m'] == held.at[stock, 'funds_entered_count']
+            assert window.at[stock, f'funds_exited_count_{w}m'] == held.at[stock, 'funds_exited_count']
+            assert window.at[stock, f'num_funds_{w}m'] == held.at[stock, 'appearances']
+            assert window.at[stock, f'share_change_{w}m'] == pytest.approx(held.at[stock, 'share_change'])
+
+def test_longest_window_records_the_sells_of_analyze(dirs, store):
+    multi = compute_multi_window_trends(store, [2, 4], dirs, log=None)
+    single = compute_fund_trends(store, 4, dirs, log=None)
+    columns = ['fund_id', 'stock', 'action', 'shares_change']
+    pd.testing.assert_frame_equal(multi['immediate_sells'][columns].reset_index(drop=True),
+                                  single['immediate_sells'][columns].reset_index(drop=True),
+                                  check_dtype=False)
+    assert not multi['immediate_sells'].empty
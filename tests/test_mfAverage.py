@@ -0,0 +1,37 @@
+import pytest
+
+from mf.mfAverage import (compute_fund_averages, compute_month_comparison, load_latest_holdings,
+                          stream_average_weightage, stream_month_comparison)
+
+@pytest.mark.parametrize('chunk_size', [None, 1])
+def test_weighted_comparison_divides_by_the_funds_loaded_for_each_month(dirs, add_holdings, chunk_size):
+    # FUND_B has no 2025-01 file, so its weight must not dilute the 2025-01 average
+    add_holdings('FUND_A', '2025-01', [('Alpha', 'INE000A01011', 'Banks', 100, 10.0)])
+    add_holdings('FUND_A', '2025-02', [('Alpha', 'INE000A01011', 'Banks', 100, 10.0)])
+    add_holdings('FUND_B', '2025-02', [('Alpha', 'INE000A01011', 'Banks', 50, 10.0)])
+    weights = {'FUND_A': 100.0, 'FUND_B': 300.0}
+
+    result, _, _ = compute_month_comparison('2025-01', '2025-02', ['FUND_A', 'FUND_B'], dirs, chunk_size=chunk_size,
+                                            log=None, fund_weights=weights)
+    row = result.set_index('security_name').loc['Alpha']
+    assert row['weighted_prev_pct'] == pytest.approx(10.0)
+    assert row['weighted_curr_pct'] == pytest.approx(10.0)
+    assert row['weighted_delta_pct'] == pytest.approx(0.0)
+    assert row['exposure_prev_cr'] == pytest.approx(10.0)
+    assert row['exposure_curr_cr'] == pytest.approx(40.0)
+
+    # the latest month matches average, which divides by the loaded funds' weight too
+    averages, _ = compute_fund_averages(['FUND_A', 'FUND_B'], dirs, log=None, fund_weights=weights)
+    assert averages.set_index('security_name').at['Alpha', 'weighted_avg_weight_pct'] == pytest.approx(
+        row['weighted_curr_pct'])
+
+def test_loaders_accept_log_none(dirs, add_holdings, capsys):
+    add_holdings('FUND_A', '2025-01', [('Alpha', 'INE000A01011', 'Banks', 100, 10.0)])
+
+    assert len(load_latest_holdings('FUND_A', dirs, log=None)) == 1
+    assert load_latest_holdings('FUND_MISSING', dirs, log=None) is None
+    averages, loaded = stream_average_weightage(['FUND_A', 'FUND_MISSING'], dirs, 1, log=None)
+    assert loaded == 1 and list(averages['security_name']) == ['Alpha']
+    rows, _ = stream_month_comparison('2024-12', '2025-01', ['FUND_A'], dirs, 1, log=None)
+    assert [row['security_name'] for row in rows] == ['Alpha']
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,30 @@
+from mf.mfDistribution import *
+
+def test_quantiles_match_numpy_percentile(dirs, add_holdings):
+    add_holdings('A', '2025-01', [('HDFC Bank', 'INE040A01034', 'Banks', 10, 4.0),
+                                  ('Infosys', 'INE009A01021', 'IT', 10, 3.0)])
+    add_holdings('B', '2025-01', [('HDFC Bank', 'INE040A01034', 'Banks', 10, 2.0)])
+    add_holdings('C', '2025-01', [('HDFC Bank', 'INE040A01034', 'Banks', 10, 7.0),
+                                  ('Infosys', 'INE009A01021', 'IT', 10, 1.0)])
+    add_holdings('D', '2025-01', [('TCS', 'INE467B01029', 'IT', 10, 5.0)])
+
+    result = compute_weight_distribution(['A', 'B', 'C', 'D'], dirs, log=None).set_index('security_name')
+    hdfc = result.loc['HDFC Bank']
+    assert hdfc['num_funds_holding'] == 3
+    assert hdfc['median_weight_pct'] == np.percentile([4, 2, 7], 50)
+    assert hdfc['p25_weight_pct'] == round(np.percentile([4, 2, 7], 25), 2)
+    assert hdfc['median_weight_pct_all'] == np.percentile([4, 2, 7, 0], 50)
+    assert hdfc['p75_weight_pct_all'] == round(np.percentile([4, 2, 7, 0], 75), 2)
+    assert hdfc['max_holder'] == 'C'
+    assert hdfc['coverage_pct'] == 75.0
+
+def test_filtered_out_fund_still_counts_as_zero(dirs, add_holdings):
+    add_holdings('A', '2025-01', [('HDFC Bank', 'INE040A01034', 'Banks', 10, 4.0)])
+    add_holdings('B', '2025-01', [('HDFC Bank', 'INE040A01034', 'Banks', 10, 2.0)])
+    add_holdings('C', '2025-01', [('Infosys', 'INE009A01021', 'IT', 10, 3.0)])
+
+    result = compute_weight_distribution(['A', 'B', 'C'], dirs, filters={'sectors': {'banks'}}, log=None)
+    hdfc = result.set_index('security_name').loc['HDFC Bank']
+    # C holds no bank but has stored holdings: three funds, not two
+    assert hdfc['median_weight_pct_all'] == 2.0
+    assert hdfc['coverage_pct'] == round(2 / 3 * 100, 1)
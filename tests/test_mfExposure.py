@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from mf.mfExposure import calculate_exposure, compute_exposure
+
+def portfolio(amounts):
+    return pd.DataFrame({'fund_id': list(amounts), 'amount': list(amounts.values())})
+
+def test_change_is_measured_against_the_calendar_month_before(dirs, add_holdings):
+    # FUND_B skips 2025-02, so its 2025-01 holdings must not serve as "previous"
+    add_holdings('FUND_A', '2025-02', [('Alpha', 'INE000A01011', 'Banks', 100, 40.0)])
+    add_holdings('FUND_A', '2025-03', [('Alpha', 'INE000A01011', 'Banks', 100, 50.0)])
+    add_holdings('FUND_B', '2025-01', [('Alpha', 'INE000A01011', 'Banks', 100, 90.0)])
+    add_holdings('FUND_B', '2025-03', [('Alpha', 'INE000A01011', 'Banks', 100, 10.0)])
+    messages = []
+
+    result = compute_exposure(portfolio({'FUND_A': 1000.0, 'FUND_B': 1000.0}), dirs, log=messages.append)
+    assert result['months'] == {'FUND_A': '2025-03', 'FUND_B': '2025-03'}
+    assert result['prev_months'] == {'FUND_A': '2025-02'}
+    alpha = result['securities'].set_index('isin').loc['INE000A01011']
+    assert alpha['exposure_amount'] == pytest.approx(600.0)
+    assert alpha['prev_exposure_amount'] == pytest.approx(400.0)
+    assert any('FUND_B' in message and 'month before' in message for message in messages)
+
+def test_zero_portfolio_reports_without_dividing_by_zero(dirs, add_holdings, tmp_path, monkeypatch, capsys):
+    add_holdings('FUND_A', '2025-03', [('Alpha', 'INE000A01011', 'Banks', 100, 50.0)])
+    portfolio_file = tmp_path / "portfolio.csv"
+    portfolio({'FUND_A': 0.0}).to_csv(portfolio_file, index=False)
+    # calculate_exposure works on ./fund_data, the store of the dirs fixture
+    monkeypatch.chdir(tmp_path)
+
+    result = calculate_exposure(str(portfolio_file))
+    assert result['total'] == 0.0
+    assert result['securities'].empty
+    assert result['concentration']['top10_pct'] == 0.0
+    assert "Look-through holdings ₹0 (0.0%)" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from conftest import holdings_frame
+from helper.validateAPI import *
+
+def fund_months(*months):
+    """Stacked holdings of FUND_A from (month, rows) pairs, as validate_holdings takes them"""
+    return pd.concat([holdings_frame('FUND_A', rows).assign(month=month) for month, rows in months],
+                     ignore_index=True)
+
+def checks(issues, month):
+    return set(issues.loc[issues['month'] == month, 'check'])
+
+BASE = [('Alpha', 'INE000A01011', 'Banks', 100, 40.0),
+        ('Beta', 'INE000B01011', 'IT', 100, 30.0),
+        ('Gamma', 'INE000C01011', 'Auto', 100, 25.0)]
+
+def test_clean_months_have_no_issues():
+    issues = validate_holdings(fund_months(('2025-01', BASE), ('2025-02', BASE)))
+    assert issues.empty
+    assert list(issues.columns) == VALIDATION_COLUMNS[:-1]
+
+def test_row_level_checks():
+    rows = BASE + [('Delta', 'INE000D01011', 'Pharma', 0, 1.0),      # weight without shares
+                   ('Alpha', 'INE000A01011', 'Banks', 10, 0.0),      # ISIN held twice
+                   ('Beta Old', 'INE000B01011', 'IT', 0, 0.0),       # exit row next to a held ISIN
+                   ('Epsilon', 'INE000E01011', 'Metals', -5, 0.0)]   # negative shares
+    issues = validate_holdings(fund_months(('2025-01', rows)))
+    assert checks(issues, '2025-01') == {'zero_shares_weight', 'duplicate_isin', 'duplicate_isin_exit',
+                                         'missing_values'}
+    assert issues.set_index('check').at['duplicate_isin', 'severity'] == ERROR
+    assert issues.set_index('check').at['duplicate_isin_exit', 'severity'] == WARNING
+
+def test_weight_sum_row_drop_and_split_like_compare_with_the_previous_month():
+    split = [('Alpha', 'INE000A01011', 'Banks', 1000, 40.0)]
+    issues = validate_holdings(fund_months(('2025-01', BASE), ('2025-02', split)))
+    assert checks(issues, '2025-01') == set()
+    # one row of three (row_drop), 40% held (weight_sum), 10x shares at the same weight (split_like)
+    assert checks(issues, '2025-02') == {'weight_sum', 'row_drop', 'split_like'}
+    assert issues.set_index('check').at['row_drop', 'detail'] == "1 rows vs 3 in 2025-01"